@@ -0,0 +1,173 @@
+"""
+Bundle size and first trial of the testing zone
+
+Builds the testing zone of a generated project (`npm run build`) with each of the given main.js files and records
+    - the bytes of the js and css the page loads before anything is shown (the files referenced by index.html),
+    - the bytes of the chunks that are only loaded on demand (plugins imported with import()),
+    - optionally the time until the first jsPsych trial is shown (the first .jspsych-content element, not the first
+      paint of the page shell) and the bytes transferred until then, measured in headless Chromium with a throttled
+      network (needs playwright: pip install playwright && playwright install chromium).
+
+The results are appended to a history file, like the generation benchmark.
+
+Generate a project with a testing zone and install its dependencies once, then run:
+    python benchmarks/bundle_size.py --testing-zone my_project/testing_zone \\
+        --main "{{ cookiecutter.__project_slug }}/example_mains/js_psych_rdk.js"
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+from generation import ROOT, CountingHandler, git_commit, serve
+
+DEFAULT_HISTORY = os.path.join(ROOT, ".benchmarks", "bundle_history.jsonl")
+
+# roughly the connection of a participant on a mobile network ("Fast 3G" in the Chrome dev tools)
+DEFAULT_THROUGHPUT_KBPS = 1600
+DEFAULT_LATENCY_MS = 150
+
+
+def _sizes(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    return len(data), len(gzip.compress(data))
+
+
+def bundle_report(build_dir):
+    """Sizes of the initial and the on demand js/css of a production build
+
+    Args:
+        build_dir (str): The build directory (with index.html and static/)
+
+    Returns:
+        dict: bytes and gzipped bytes of the files index.html loads and of all other chunks, and the number of files
+    """
+    with open(os.path.join(build_dir, "index.html")) as f:
+        index = f.read()
+    initial = {
+        os.path.normpath(src.lstrip("/"))
+        for src in re.findall(r"""<(?:script[^>]*\ssrc|link[^>]*\shref)=["']?([^"' >]+\.(?:js|css))""", index)
+    }
+    report = {"initial_bytes": 0, "initial_gzip_bytes": 0, "lazy_bytes": 0, "lazy_gzip_bytes": 0, "files": 0}
+    for dirpath, _, filenames in os.walk(os.path.join(build_dir, "static")):
+        for name in filenames:
+            if not name.endswith((".js", ".css")):
+                continue
+            path = os.path.join(dirpath, name)
+            size, gzip_size = _sizes(path)
+            kind = "initial" if os.path.relpath(path, build_dir) in initial else "lazy"
+            report[f"{kind}_bytes"] += size
+            report[f"{kind}_gzip_bytes"] += gzip_size
+            report["files"] += 1
+    return report
+
+
+def build(testing_zone, main_js=None):
+    """Production build of the testing zone (with main_js as src/design/main.js), returns the build directory"""
+    design_main = os.path.join(testing_zone, "src", "design", "main.js")
+    backup = design_main + ".bundle-size"
+    if main_js is not None:
+        shutil.copy(design_main, backup)
+        shutil.copy(main_js, design_main)
+    env = dict(os.environ, CI="true", GENERATE_SOURCEMAP="false", BROWSER="none")
+    npm = "npm.cmd" if sys.platform == "win32" else "npm"
+    try:
+        subprocess.run([npm, "run", "build"], cwd=testing_zone, env=env, check=True, stdout=subprocess.DEVNULL)
+    finally:
+        if main_js is not None:
+            os.replace(backup, design_main)
+    return os.path.join(testing_zone, "build")
+
+
+# records when the first jsPsych trial is in the DOM, the shell page of create-react-app is painted long before
+FIRST_TRIAL_SCRIPT = """
+new MutationObserver((mutations, observer) => {
+  if (document.querySelector('.jspsych-content')) {
+    window.__firstTrial = performance.now();
+    observer.disconnect();
+  }
+}).observe(document, {childList: true, subtree: true});
+"""
+
+
+def first_trial(build_dir, throughput_kbps=DEFAULT_THROUGHPUT_KBPS, latency_ms=DEFAULT_LATENCY_MS, timeout_ms=60_000):
+    """Time (ms) until the first jsPsych trial is shown and bytes served until then, None if playwright is not
+    installed"""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        return None
+
+    server = serve(build_dir)
+    CountingHandler.bytes_sent = 0
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch()
+            page = browser.new_page()
+            page.add_init_script(FIRST_TRIAL_SCRIPT)
+            cdp = page.context.new_cdp_session(page)
+            cdp.send("Network.enable")
+            cdp.send("Network.emulateNetworkConditions", {
+                "offline": False,
+                "latency": latency_ms,
+                "downloadThroughput": throughput_kbps * 1024 / 8,
+                "uploadThroughput": throughput_kbps * 1024 / 8,
+            })
+            page.goto(f"http://127.0.0.1:{server.server_address[1]}/")
+            page.wait_for_function("() => window.__firstTrial !== undefined", timeout=timeout_ms)
+            first = page.evaluate("() => window.__firstTrial")
+            transferred = CountingHandler.bytes_sent
+            browser.close()
+        return {"first_trial_ms": first, "first_trial_bytes": transferred}
+    finally:
+        server.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the bundle size and first trial of the testing zone")
+    parser.add_argument("--testing-zone", required=True, help="testing_zone of a generated project (npm installed)")
+    parser.add_argument("--main", action="append", help="main.js to build with (default: the one in the project)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="json lines file the results are appended to")
+    parser.add_argument("--no-trial", action="store_true", help="skip the first trial measurement (in a browser)")
+    parser.add_argument("--throughput-kbps", type=int, default=DEFAULT_THROUGHPUT_KBPS)
+    parser.add_argument("--latency-ms", type=int, default=DEFAULT_LATENCY_MS)
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    for main_js in args.main or [None]:
+        start = time.perf_counter()
+        build_dir = build(args.testing_zone, main_js)
+        name = os.path.basename(main_js) if main_js else "main.js"
+        record = {"main": name, "build_seconds": time.perf_counter() - start}
+        record.update(bundle_report(build_dir))
+        if not args.no_trial:
+            trial = first_trial(build_dir, args.throughput_kbps, args.latency_ms)
+            if trial is None:
+                print("playwright is not installed, the first trial is not measured")
+                args.no_trial = True
+            else:
+                record.update(trial)
+        record.update(timestamp=time.time(), commit=commit)
+        with open(args.history, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+        line = (
+            f"{record['main']:<24} initial {record['initial_bytes']:>9} B ({record['initial_gzip_bytes']} B gzip)  "
+            f"on demand {record['lazy_bytes']:>9} B ({record['files']} files in total)"
+        )
+        if "first_trial_ms" in record:
+            line += f"  first trial {record['first_trial_ms']:.0f} ms after {record['first_trial_bytes']} B"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
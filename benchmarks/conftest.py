@@ -0,0 +1,6 @@
+import os
+import sys
+
+# make the researcher_hub package of the template importable in the benchmarks
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "{{ cookiecutter.__project_slug }}")
+sys.path.insert(0, TEMPLATE_DIR)
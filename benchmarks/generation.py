@@ -0,0 +1,252 @@
+"""
+Generation time of the cookiecutter template
+
+Generates a project for each answer combination without any network access beyond local stand-ins:
+    - GitHub raw content is served from benchmarks/fixtures/raw by a local http server (the GitHub API is pointed
+      at the same server, so the jsPsych examples are rendered from main)
+    - PyPI is replaced by a local wheelhouse (served by the same server as --find-links), the hooks run without
+      installing anything when the answers are given, so it is only needed to measure an older version of the hooks
+    - npm uses a local registry (--npm-registry, e.g. verdaccio) or, by default, shims for npx/npm/firebase that
+      only create the testing_zone directory (and its package.json), so only the hooks are measured
+
+For every combination the wall time (render, pre_gen_project, post_gen_project), the bytes served by the local
+server and the disk usage (temporary venv and generated project) are recorded and appended to a history file.
+A run is flagged as a regression if its total time is more than --threshold slower than the median of the last
+runs of the same combination.
+
+Run the benchmark:
+    python benchmarks/generation.py
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from cookiecutter.main import cookiecutter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "raw")
+DEFAULT_HISTORY = os.path.join(ROOT, ".benchmarks", "generation_history.jsonl")
+
+FIREBASE_PROLIFIC = "autora[experiment-runner-firebase-prolific]"
+
+CHOICES = {
+    "basic": {"advanced": "no"},
+    "advanced": {"advanced": "yes"},
+    "advanced-blank": {
+        "advanced": "yes",
+        "experiment-runners": [FIREBASE_PROLIFIC],
+        "firebase": "yes",
+        "project_type": "Blank",
+    },
+    "advanced-stroop": {
+        "advanced": "yes",
+        "experiment-runners": [FIREBASE_PROLIFIC],
+        "firebase": "yes",
+        "project_type": "JsPsych - Stroop",
+    },
+    "advanced-html-button": {
+        "advanced": "yes",
+        "experiment-runners": [FIREBASE_PROLIFIC],
+        "firebase": "yes",
+        "project_type": "JsPsych - HTML Button",
+    },
+}
+
+SHIMS = {
+    "firebase": '#!/bin/sh\necho "0.0.0-benchmark"\n',
+    "npm": "#!/bin/sh\nexit 0\n",
+    # create-react-app comes after the options of npx (npx --yes create-react-app testing_zone ...)
+    "npx": (
+        '#!/bin/sh\nwhile [ $# -gt 0 ]; do\n'
+        '    if [ "$1" = "create-react-app" ]; then\n'
+        '        mkdir -p "$2/src/design" && echo "{}" > "$2/package.json"; exit 0\n'
+        '    fi\n'
+        '    shift\ndone\n'
+    ),
+}
+
+
+class CountingHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files and counts the bytes sent"""
+
+    bytes_sent = 0
+    lock = threading.Lock()
+
+    def copyfile(self, source, outputfile):
+        data = source.read()
+        with CountingHandler.lock:
+            CountingHandler.bytes_sent += len(data)
+        outputfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory):
+    handler = functools.partial(CountingHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def disk_usage(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for f in filenames:
+            fp = os.path.join(dirpath, f)
+            if not os.path.islink(fp):
+                total += os.path.getsize(fp)
+    return total
+
+
+def write_shims(directory):
+    for name, script in SHIMS.items():
+        path = os.path.join(directory, name)
+        with open(path, "w") as f:
+            f.write(script)
+        os.chmod(path, 0o755)
+
+
+def run_hook(name, project_dir, env):
+    start = time.perf_counter()
+    subprocess.check_call(
+        [sys.executable, os.path.join(ROOT, "hooks", f"{name}.py")], cwd=project_dir, env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def has_testing_zone(answers):
+    """Whether the answers create a testing zone (the basic project always has one)"""
+    return answers["advanced"] == "no" or answers.get("firebase") == "yes"
+
+
+def generate(choice, base_url, npm_registry=None):
+    """Generate a project for one answer combination and return the measurements"""
+    CountingHandler.bytes_sent = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.pop("VIRTUAL_ENV", None)
+        env["AUTORA_RAW_GITHUB_URL"] = f"{base_url}/raw"
+        # the local server has no commits endpoint, so the jsPsych examples are rendered from main and not cached
+        env["AUTORA_GITHUB_API_URL"] = f"{base_url}/api"
+        env["AUTORA_COOKIECUTTER_CACHE"] = os.path.join(tmp, "cache")
+        env["AUTORA_COOKIECUTTER_ANSWERS"] = json.dumps(CHOICES[choice])
+        env["PIP_NO_INDEX"] = "1"
+        env["PIP_FIND_LINKS"] = f"{base_url}/wheelhouse/"
+        if npm_registry is None:
+            bin_dir = os.path.join(tmp, "bin")
+            os.mkdir(bin_dir)
+            write_shims(bin_dir)
+            env["PATH"] = bin_dir + os.pathsep + env["PATH"]
+        else:
+            env["npm_config_registry"] = npm_registry
+
+        start = time.perf_counter()
+        project_dir = cookiecutter(
+            ROOT, no_input=True, extra_context={"project_name": "benchmark"}, output_dir=os.path.join(tmp, "out"),
+            accept_hooks=False,
+        )
+        render = time.perf_counter() - start
+
+        # the hooks run in the same order and directory as in cookiecutter
+        pre_gen = run_hook("pre_gen_project", project_dir, env)
+        venv_bytes = disk_usage(os.path.join(project_dir, "temp"))
+        post_gen = run_hook("post_gen_project", project_dir, env)
+        # the template files are moved into testing_zone/ anyway, but only create-react-app (or the npx shim) writes
+        # package.json. Without it create-react-app was not run and its time is missing from the measurement.
+        if has_testing_zone(CHOICES[choice]):
+            assert os.path.isfile(os.path.join(project_dir, "testing_zone", "package.json")), (
+                f"{choice}: create-react-app did not create the testing_zone"
+            )
+
+        return {
+            "choice": choice,
+            "render_seconds": render,
+            "pre_gen_seconds": pre_gen,
+            "post_gen_seconds": post_gen,
+            "total_seconds": render + pre_gen + post_gen,
+            "network_bytes": CountingHandler.bytes_sent,
+            "venv_bytes": venv_bytes,
+            "project_bytes": disk_usage(project_dir),
+        }
+
+
+def read_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def is_regression(record, history, threshold, window=5):
+    previous = [r["total_seconds"] for r in history if r["choice"] == record["choice"]][-window:]
+    if not previous:
+        return False
+    return record["total_seconds"] > (1 + threshold) * statistics.median(previous)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the generation time of the cookiecutter template")
+    parser.add_argument("--wheelhouse", help="directory with wheels for packages the hooks install (if any)")
+    parser.add_argument("--npm-registry", help="url of a local npm registry (default: shims for npx/npm/firebase)")
+    parser.add_argument("--choice", action="append", choices=sorted(CHOICES), help="default: all combinations")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="json lines file with the previous runs")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown relative to the median")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    # serve the raw content and the wheelhouse from one directory
+    with tempfile.TemporaryDirectory() as root:
+        os.symlink(FIXTURES, os.path.join(root, "raw"))
+        if args.wheelhouse is not None:
+            os.symlink(os.path.abspath(args.wheelhouse), os.path.join(root, "wheelhouse"))
+        server = serve(root)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            history = read_history(args.history)
+            commit = git_commit()
+            regressions = []
+            os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+            for choice in args.choice or CHOICES:
+                record = generate(choice, base_url, args.npm_registry)
+                record.update(timestamp=time.time(), commit=commit, npm_registry=args.npm_registry is not None)
+                if is_regression(record, history, args.threshold):
+                    regressions.append(choice)
+                with open(args.history, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+                print(
+                    f"{choice:<22} total {record['total_seconds']:7.2f}s "
+                    f"(render {record['render_seconds']:.2f}s, pre_gen {record['pre_gen_seconds']:.2f}s, "
+                    f"post_gen {record['post_gen_seconds']:.2f}s)  network {record['network_bytes']} B  "
+                    f"venv {record['venv_bytes']} B  project {record['project_bytes']} B"
+                )
+        finally:
+            server.shutdown()
+
+    if regressions:
+        print(f"Slower than {1 + args.threshold:.2f}x the median of the previous runs: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
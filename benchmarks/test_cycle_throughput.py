@@ -0,0 +1,112 @@
+"""
+Closed-loop throughput of the researcher hub
+
+Each benchmark runs the cycle of one of the example workflows end-to-end: the workflow is imported, so its own
+experimentalist, finalize (acquisition), theorist and streams are measured, only the firebase runner is replaced by
+synthetic participants from autora-synthetic and the number of conditions per cycle is scaled up. Besides the
+timings of pytest-benchmark, the extra info of each benchmark holds the cycles per second, the mean time per stage
+and the peak memory.
+
+Run with:
+    pytest benchmarks --benchmark-autosave
+"""
+
+import importlib.util
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+from autora.experiment_runner.synthetic.psychophysics.stevens_power_law import stevens_power_law
+
+from researcher_hub.history import ModelHistory
+from researcher_hub.synthetic import synthetic_runner
+
+WORKFLOWS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "{{ cookiecutter.__project_slug }}", "example_workflows"
+)
+
+# js_psych_rdk.py is the same workflow as basic.py
+WORKFLOWS = ["basic", "js_psych_stroop", "super_experiment", "sweet_bean"]
+
+# conditions per cycle (the workflows choose 3), cases that don't fit the grid of a workflow are skipped
+CONDITIONS = [3, 100, 1000]
+
+# sweet_bean.py never samples one of its 29 conditions twice, 9 cycles of 3 conditions fit
+CYCLES = [3, 9]
+
+# workflows that need more than the researcher hub
+REQUIRES = {"sweet_bean": "sweetbean"}
+
+
+def load_workflow(name):
+    """Import an example workflow (the study itself only runs when the script is started)"""
+    if name in REQUIRES:
+        pytest.importorskip(REQUIRES[name])
+    spec = importlib.util.spec_from_file_location(f"workflow_{name}", os.path.join(WORKFLOWS_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def prepare_cycle(name, n_conditions, n_cycles):
+    # a fresh import per run, so the grids and caches of the workflow start empty
+    workflow = load_workflow(name)
+    cycle = workflow.cycle
+    # workflows on a grid of allowed values can't choose more conditions than the grid has
+    grid = getattr(workflow, "condition_grid", None)
+    needed = n_conditions * n_cycles if hasattr(workflow, "num_conditions") else n_conditions
+    if grid is not None and needed > grid.size:
+        pytest.skip(f"{name} has {grid.size} conditions, {needed} are needed")
+    if hasattr(cycle.finalize, "num_samples"):
+        cycle.finalize.num_samples = n_conditions
+    else:
+        workflow.num_conditions = n_conditions
+    participants = synthetic_runner(stevens_power_law(), random_state=180)
+    to_experiment = getattr(workflow, "to_experiment", None)
+
+    def experiment_runner(conditions):
+        # the experiments are still built for the participants, the synthetic ones answer the numbers
+        if to_experiment is not None:
+            to_experiment(conditions)
+        return participants(conditions)
+
+    cycle.experiment_runner = experiment_runner
+    # nothing is written to telemetry.jsonl or model_history/
+    cycle.monitor = None
+    cycle.data.models = ModelHistory()
+    return cycle
+
+
+@pytest.mark.parametrize("n_cycles", CYCLES)
+@pytest.mark.parametrize("n_conditions", CONDITIONS)
+@pytest.mark.parametrize("workflow", WORKFLOWS)
+def test_cycle_throughput(benchmark, workflow, n_conditions, n_cycles):
+    # skips before benchmarking if the case doesn't fit the workflow
+    prepare_cycle(workflow, n_conditions, n_cycles)
+    data = benchmark.pedantic(
+        lambda cycle: cycle.run(num_cycles=n_cycles),
+        setup=lambda: ((prepare_cycle(workflow, n_conditions, n_cycles),), {}),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(data.models) == n_cycles
+    assert all(len(c) == n_conditions for c in data.conditions)
+
+    # memory is measured in a separate run, tracemalloc would distort the timings
+    cycle = prepare_cycle(workflow, n_conditions, n_cycles)
+    tracemalloc.start()
+    start = time.perf_counter()
+    cycle.run(num_cycles=n_cycles)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # the experimentalist runs in the background, the cycle only waits for the part that doesn't overlap
+    wall_time = sum(t["waiting"] + t["finalize"] + t["runner"] + t["theorist"] for t in data.timings)
+    benchmark.extra_info["cycles_per_second"] = n_cycles / wall_time
+    benchmark.extra_info["peak_memory_bytes"] = peak
+    benchmark.extra_info["traced_seconds"] = elapsed
+    for stage in data.timings[0]:
+        benchmark.extra_info[f"{stage}_seconds"] = float(np.mean([t[stage] for t in data.timings]))
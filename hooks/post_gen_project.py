@@ -1,107 +1,326 @@
 import subprocess
 import os
-import requests
-from tomlkit import parse
-import inquirer
+import re
+import sys
 import shutil
-import requests
 import textwrap
+import threading
+import time
+import json
+import http.client
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from html.parser import HTMLParser
+
+# The hooks only need the standard library unless a question is asked interactively (then inquirer is imported),
+# so a non-interactive generation needs no virtual environment (see pre_gen_project.py)
+
+# Base URL for raw GitHub content (can be pointed to a local mirror, e.g. for benchmarks)
+RAW_GITHUB_URL = os.environ.get("AUTORA_RAW_GITHUB_URL", "https://raw.githubusercontent.com")
+
+# Answers for the prompts as json ({question name: answer}), if set the hook runs non-interactively
+ANSWERS = json.loads(os.environ.get("AUTORA_COOKIECUTTER_ANSWERS", "null"))
+
+# Base URL of the GitHub API, used to pin the jsPsych examples to a commit
+GITHUB_API_URL = os.environ.get("AUTORA_GITHUB_API_URL", "https://api.github.com")
+
+# Rendered jsPsych examples are cached here per upstream commit
+CACHE_DIR = os.environ.get(
+    "AUTORA_COOKIECUTTER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "autora-cookiecutter")
+)
+
+# firebase-tools is installed once per version into the cache directory instead of globally (an exact version, so
+# the cached install is the same for every generation)
+FIREBASE_TOOLS_VERSION = os.environ.get("AUTORA_FIREBASE_TOOLS_VERSION", "13.35.1")
+
+# Seconds the resolved node/npm/npx/firebase paths and versions are reused
+TOOLCHAIN_TTL = 24 * 60 * 60
+
+# part of the cache path of the rendered examples, bump it when render_main_js changes
+JSPSYCH_RENDER_VERSION = "3"
+
+# example name -> html file in the examples folder of the jsPsych repository (the plugins are detected from the code)
+JSPSYCH_EXAMPLES = {
+    "html-button": "jspsych-html-button-response.html",
+    "reaction-time": "jspsych-serial-reaction-time.html",
+    "multi-choice-survey": "jspsych-survey-multi-choice.html",
+    "multi-select-survey": "jspsych-survey-multi-select.html",
+    "save-trial-parameters": "save-trial-parameters.html",
+    "lexical-decision": "lexical-decision.html",
+    "pause-unpause": "pause-unpause.html",
+    "canvas-slider-response": "jspsych-canvas-slider-response.html",
+}
 
-__sample_experiment_deps = {
-    "html-button": (
-        "jspsych-html-button-response.html",
-        ["jsPsychHtmlButtonResponse from '@jspsych/plugin-html-button-response'"],
-    ),
-    "reaction-time": (
-        "jspsych-serial-reaction-time.html",
-        ["jsPsychSerialReactionTime from '@jspsych/plugin-serial-reaction-time'"],
-    ),
-    "multi-choice-survey": (
-        "jspsych-survey-multi-choice.html",
-        ["jsPsychSurveyMultiChoice from '@jspsych/plugin-survey-multi-choice'"],
-    ),
-    "multi-select-survey": (
-        "jspsych-survey-multi-select.html",
-        ["jsPsychSurveyMultiSelect from '@jspsych/plugin-survey-multi-select'"],
-    ),
-    "save-trial-parameters": (
-        "save-trial-parameters.html",
-        [
-            "jsPsychHtmlKeyboardResponse from '@jspsych/plugin-html-keyboard-response'",
-            "jsPsychHtmlButtonResponse from '@jspsych/plugin-html-button-response'",
-            "jsPsychCanvasKeyboardResponse from '@jspsych/plugin-canvas-keyboard-response'",
-        ],
-    ),
-    "lexical-decision": (
-        "lexical-decision.html",
-        [
-            "jsPsychHtmlKeyboardResponse from '@jspsych/plugin-html-keyboard-response'",
-            "jsPsychHtmlButtonResponse from '@jspsych/plugin-html-button-response'",
-        ],
-    ),
-    "pause-unpause": (
-        "pause-unpause.html",
-        ["jsPsychHtmlKeyboardResponse from '@jspsych/plugin-html-keyboard-response'"],
-    ),
-    "canvas-slider-response": (
-        "jspsych-canvas-slider-response.html",
-        ["jsPsychCanvasSliderResponse from '@jspsych/plugin-canvas-slider-response'"],
-    ),
+# answer of the project type question -> jsPsych example
+JSPSYCH_CHOICES = {
+    "JsPsych - HTML Button": "html-button",
+    "JsPsych - Reaction Time": "reaction-time",
+    "JsPsych - Multi Choice Survey": "multi-choice-survey",
+    "JsPsych - Multi Select Survey": "multi-select-survey",
+    "JsPsych - Save Trial Parameters": "save-trial-parameters",
+    "JsPsych - Lexical Decision": "lexical-decision",
+    "JsPsych - Pause/Unpause": "pause-unpause",
+    "JsPsych - Canvas Slider Response": "canvas-slider-response",
 }
 
 
-def write_to_js(jspsych_example_name: str, output_filepath: str) -> bool:
-    """Scrape js code from jspsych's GitHub examples page and write to an output file
+# *** HTTP *** #
 
-    Args:
-        jspsych_example_name (str): Name of jspsych examples. Must be a key in __sample_experiment_deps variable
-        output_filepath (str): File path to write output js file to
+class Response:
+    """Status code and text of a GET request (the parts of a requests.Response the hooks use)"""
 
-    Returns:
-        bool: True if successful, False otherwise
-    """
-    if jspsych_example_name not in __sample_experiment_deps.keys():
-        print("Please enter a valid jspsych example name")
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
 
-        return False
 
+class Session:
+    """GET requests with the standard library that keep their connections open (like a requests.Session)
+
+    Idle connections are kept per host, so the requests to GitHub share a connection and threads never use the same
+    one at the same time. With a proxy configured the requests go through urllib (without keep-alive).
+    """
+
+    max_redirects = 5
+
+    def __init__(self):
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def get(self, url, headers=None, timeout=30):
+        for _ in range(self.max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            if urllib.request.getproxies().get(parts.scheme) and not urllib.request.proxy_bypass(parts.hostname):
+                return self._urlopen(url, headers, timeout)
+            status, location, text = self._request(parts, headers or {}, timeout)
+            if status not in (301, 302, 303, 307, 308) or not location:
+                return Response(status, text)
+            url = urllib.parse.urljoin(url, location)
+        return Response(status, text)
+
+    def _request(self, parts, headers, timeout):
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        with self._lock:
+            idle = self._idle.get(key)
+            connection = idle.pop() if idle else None
+        # a kept connection may have been closed by the server in the meantime, then a new one is opened once
+        for reused in ([True] if connection is not None else []) + [False]:
+            if not reused:
+                factory = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+                connection = factory(parts.netloc, timeout=timeout)
+            connection.timeout = timeout
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            break
+        if response.will_close:
+            connection.close()
+        else:
+            with self._lock:
+                self._idle.setdefault(key, []).append(connection)
+        charset = response.headers.get_content_charset() or "utf-8"
+        return response.status, response.getheader("Location"), body.decode(charset, errors="replace")
+
+    @staticmethod
+    def _urlopen(url, headers, timeout):
+        request = urllib.request.Request(url, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                charset = response.headers.get_content_charset() or "utf-8"
+                return Response(response.status, response.read().decode(charset, errors="replace"))
+        except urllib.error.HTTPError as e:
+            return Response(e.code, e.read().decode("utf-8", errors="replace"))
+
+
+# shared by all requests of the hook
+HTTP = Session()
+
+
+# *** TOML *** #
+
+_TOML_STRING = r'"(?:[^"\\\n]|\\.)*"|\'[^\'\n]*\''
+
+# key = [strings], the array may span lines and have comments
+_TOML_ARRAY = re.compile(
+    rf"^[ \t]*(?P<key>[A-Za-z0-9_-]+|{_TOML_STRING})[ \t]*=[ \t]*\[(?P<items>(?:\s|,|#[^\n]*|{_TOML_STRING})*)\]", re.M
+)
+
+
+def _toml_string(token):
+    # a basic string has the escapes of json, a literal string none
+    return json.loads(token) if token.startswith('"') else token[1:-1]
+
+
+def _read_optional_dependencies(text):
+    """The [project.optional-dependencies] table of a pyproject.toml (arrays of strings)"""
+    start = re.search(r"^\[project\.optional-dependencies\][ \t]*(?:#.*)?$", text, re.M)
+    if start is None:
+        return {}
+    table = text[start.end():]
+    end = re.search(r"^[ \t]*\[", table, re.M)
+    table = table[:end.start()] if end else table
+    return {
+        _toml_string(m["key"]) if m["key"][0] in "\"'" else m["key"]: [
+            _toml_string(token) for token in re.findall(rf"#[^\n]*|{_TOML_STRING}", m["items"])
+            if not token.startswith("#")
+        ]
+        for m in _TOML_ARRAY.finditer(table)
+    }
+
+
+def parse_toml(text):
+    """Parse a pyproject.toml into dicts and lists
+
+    Uses tomllib (Python 3.11+). Older Pythons only get the [project.optional-dependencies] table, the only part of
+    the file the hooks read.
+    """
     try:
-        response = requests.get(
-            f"https://raw.githubusercontent.com/jspsych/jsPsych/main/examples/{__sample_experiment_deps[jspsych_example_name][0]}"
-        )
-    except Exception as e:
-        print("Error: {e}")
-        return False
+        import tomllib
+    except ImportError:
+        return {"project": {"optional-dependencies": _read_optional_dependencies(text)}}
+    return tomllib.loads(text)
 
-    status = response.status_code
 
-    if status != 200:
-        print(f"Error - Unable to fetch data. Status code {status}")
-        return
+# *** Prompts *** #
 
-    response_text = response.text
+class Question:
+    """A question for prompt, only turned into an inquirer question (and inquirer imported) when it is asked"""
 
-    # Extract js code from between final script tags
-    script_tag_onwards = response_text.split("<script>")[-1]
-    js_script = textwrap.dedent(script_tag_onwards.split("</script>")[0]).strip() + "\n"
-    js_script = textwrap.indent(js_script, "  ")
+    kind = None
 
-    # Get dependencies
-    proj_deps = __sample_experiment_deps[jspsych_example_name][1]
+    def __init__(self, name, message, choices):
+        self.name = name
+        self.message = message
+        self.choices = choices
 
-    output_file_text = ""
-    import_dep_text = ""
-    comment_text = "// To use the jsPsych package first install jspsych using `npm install jspsych`\n"
+    def to_inquirer(self):
+        import inquirer
+
+        return getattr(inquirer, self.kind)(self.name, message=self.message, choices=self.choices)
+
+
+class List(Question):
+    kind = "List"
 
-    # Add import text to output file and comments instructing how to install necessary dependencies
-    for dep in proj_deps:
-        import_dep_text += f"import {dep}\n"
 
-        dep_package_name = dep.split("from ")[1]
-        comment_text += f"// This example uses the '{dep_package_name[17:]} plugin. Install it via `npm install {dep_package_name}`\n"
+class Checkbox(Question):
+    kind = "Checkbox"
+
+
+# *** jsPsych examples *** #
+
+class JsPsychExampleParser(HTMLParser):
+    """Collects the script sources and the inline scripts of a jsPsych example page"""
+
+    def __init__(self):
+        super().__init__()
+        self.sources = []
+        self.scripts = []
+        self._script = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script":
+            src = dict(attrs).get("src")
+            if src:
+                self.sources.append(src)
+            self._script = []
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._script is not None:
+            code = "".join(self._script)
+            if code.strip():
+                self.scripts.append(code)
+            self._script = None
+
+
+def _package_to_identifier(package):
+    # @jspsych/plugin-html-button-response -> jsPsychHtmlButtonResponse
+    name = package.split("/")[-1]
+    if name.startswith("plugin-"):
+        name = name[len("plugin-"):]
+    return "jsPsych" + "".join(part.capitalize() for part in name.split("-"))
+
+
+def _identifier_to_package(identifier):
+    # jsPsychHtmlButtonResponse -> @jspsych/plugin-html-button-response
+    words = re.findall(r"[A-Z][a-z0-9]*", identifier[len("jsPsych"):])
+    name = "-".join(w.lower() for w in words)
+    return f"@jspsych/{name}" if name.startswith("extension-") else f"@jspsych/plugin-{name}"
+
+
+def parse_jspsych_example(html_text):
+    """Extract the experiment code and the plugins it uses from a jsPsych example page
+
+    Args:
+        html_text (str): The html of the example
+
+    Returns:
+        tuple: the code of the inline scripts and the list of plugin packages (in order of first use)
+    """
+    parser = JsPsychExampleParser()
+    parser.feed(html_text)
+    parser.close()
+    code = "\n".join(textwrap.dedent(script).strip() for script in parser.scripts) + "\n"
+
+    packages = []
+    # plugins used in the code, and plugins loaded with a script tag (e.g. ../packages/plugin-x/dist/...)
+    for identifier in re.findall(r"\bjsPsych[A-Z]\w*", code):
+        packages.append(_identifier_to_package(identifier))
+    for src in parser.sources:
+        match = re.search(r"(?:^|/)@?(?:jspsych/)?((?:plugin|extension)-[a-z0-9-]+?)(?:@[^/]*)?(?:/|$)", src)
+        if match:
+            packages.append(f"@jspsych/{match.group(1)}")
+    return code, list(dict.fromkeys(packages))
+
+
+def render_main_js(code, packages):
+    """Render the main.js of the testing zone for the code and plugins of a jsPsych example
+
+    Only the plugins the code uses are imported, plugins that are only loaded with a script tag of the example page
+    are left out of the bundle.
+    """
+    used = [package for package in packages if re.search(rf"\b{_package_to_identifier(package)}\b", code)]
+    comment_text = "// To use the jsPsych package first install jspsych using `npm install jspsych`\n"
+    import_dep_text = ""
+    for package in used:
+        import_dep_text += f"import {_package_to_identifier(package)} from '{package}'\n"
+        comment_text += (
+            f"// This example uses the '{package.split('/')[-1].replace('plugin-', '', 1)}' plugin. "
+            f"Install it via `npm install {package}`\n"
+        )
 
-    # Build output file
-    output_file_text += textwrap.dedent(comment_text)
+    output_file_text = comment_text
     output_file_text += textwrap.dedent(
         """
         // Here is documentation on how to program a jspsych experiment using npm:
@@ -111,19 +330,119 @@ def write_to_js(jspsych_example_name: str, output_filepath: str) -> bool:
         import 'jspsych/css/jspsych.css'
     """
     )
-
     output_file_text += import_dep_text
     output_file_text += "\nconst main = async (id, condition) => {\n"
-    output_file_text += js_script
+    output_file_text += textwrap.indent(code, "  ")
     output_file_text += "} \n\nexport default main\n"
+    return output_file_text
 
-    # Write to file
-    with open(output_filepath, "w") as js_file:
-        js_file.write(output_file_text)
 
+def resolve_jspsych_commit(session=HTTP):
+    """Commit of the main branch of jsPsych, or None if GitHub can't be reached (then main is used uncached)"""
+    try:
+        response = session.get(
+            f"{GITHUB_API_URL}/repos/jspsych/jsPsych/commits/main",
+            headers={"Accept": "application/vnd.github.sha"},
+            timeout=10,
+        )
+    except Exception:
+        return None
+    sha = response.text.strip()
+    if response.status_code != 200 or not re.fullmatch(r"[0-9a-f]{40}", sha):
+        return None
+    return sha
+
+
+def render_jspsych_example(jspsych_example_name, commit=None, session=HTTP):
+    """Fetch, parse and render one jsPsych example (cached per commit)
+
+    Args:
+        jspsych_example_name (str): Name of the example, a key of JSPSYCH_EXAMPLES
+        commit (str): Commit of the jsPsych repository, None for the main branch (not cached)
+        session: Session to reuse connections
+
+    Returns:
+        str: the main.js, or None if the example couldn't be fetched
+    """
+    cache_file = None
+    if commit is not None:
+        cache_file = os.path.join(
+            CACHE_DIR, "jspsych", commit, f"{jspsych_example_name}.v{JSPSYCH_RENDER_VERSION}.js"
+        )
+        if os.path.exists(cache_file):
+            with open(cache_file) as f:
+                return f.read()
+
+    try:
+        response = session.get(
+            f"{RAW_GITHUB_URL}/jspsych/jsPsych/{commit or 'main'}/examples/{JSPSYCH_EXAMPLES[jspsych_example_name]}",
+            timeout=30,
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"Error - Unable to fetch data. Status code {response.status_code}")
+        return None
+
+    main_js = render_main_js(*parse_jspsych_example(response.text))
+    if cache_file is not None:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        # write to a temporary file first, so parallel renders never read a half written file
+        with open(cache_file + f".{os.getpid()}.tmp", "w") as f:
+            f.write(main_js)
+        os.replace(cache_file + f".{os.getpid()}.tmp", cache_file)
+    return main_js
+
+
+def write_to_js(jspsych_example_name: str, output_filepath: str) -> bool:
+    """Render the main.js of a jsPsych example from jspsych's GitHub examples page and write it to a file
+
+    Args:
+        jspsych_example_name (str): Name of jspsych examples. Must be a key in JSPSYCH_EXAMPLES
+        output_filepath (str): File path to write output js file to
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if jspsych_example_name not in JSPSYCH_EXAMPLES:
+        print("Please enter a valid jspsych example name")
+        return False
+
+    main_js = render_jspsych_example(jspsych_example_name, resolve_jspsych_commit())
+    if main_js is None:
+        return False
+    with open(output_filepath, "w") as js_file:
+        js_file.write(main_js)
     return True
 
 
+def render_jspsych_catalog(output_dir, names=None, max_workers=8):
+    """Render the main.js of all (or the given) jsPsych examples in one batch, e.g. for a catalog build
+
+    The commit is resolved once and the examples are fetched in parallel over one session.
+
+    Returns:
+        dict: example name -> path of the rendered main.js (None if it couldn't be rendered)
+    """
+    names = list(names or JSPSYCH_EXAMPLES)
+    os.makedirs(output_dir, exist_ok=True)
+    with Session() as session:
+        commit = resolve_jspsych_commit(session)
+
+        def render(name):
+            main_js = render_jspsych_example(name, commit, session)
+            if main_js is None:
+                return None
+            path = os.path.join(output_dir, f"{name}.js")
+            with open(path, "w") as f:
+                f.write(main_js)
+            return path
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(names, executor.map(render, names)))
+
+
 def clean_up():
     to_remove = os.path.join(os.getcwd(), "temp")
     if os.path.exists(to_remove):
@@ -131,24 +450,48 @@ def clean_up():
         shutil.rmtree(to_remove)
 
 
+def prompt(questions):
+    """Ask the questions with inquirer, or take the answers from ANSWERS when running non-interactively
+
+    Args:
+        questions (list): Questions (List, Checkbox or inquirer questions)
+
+    Returns:
+        dict: answer for each question name
+    """
+    if ANSWERS is None:
+        import inquirer
+
+        return inquirer.prompt([q.to_inquirer() if isinstance(q, Question) else q for q in questions])
+    answers = {}
+    for q in questions:
+        if q.name in ANSWERS:
+            answers[q.name] = ANSWERS[q.name]
+        elif type(q).__name__ == "Checkbox":
+            answers[q.name] = []
+        else:
+            answers[q.name] = q.choices[0]
+    return answers
+
+
 def basic_or_advanced():
     question_1 = [
-        inquirer.List(
+        List(
             "advanced",
             message="Do you want to use advanced features?",
             choices=["yes", "no"],
         )
     ]
-    answer = inquirer.prompt(question_1)
+    answer = prompt(question_1)
     return answer["advanced"] == "yes"
 
 
 def create_autora_hub_requirements(source_branch, requirements_file):
     # TODO: update back to AutoResearch/autora/main branch after merging necessary changes
-    response = requests.get(
-        f"https://raw.githubusercontent.com/varun646/autora/add-all-synthetic/pyproject.toml"
+    response = HTTP.get(
+        f"{RAW_GITHUB_URL}/varun646/autora/add-all-synthetic/pyproject.toml"
     )
-    doc = parse(response.text)
+    doc = parse_toml(response.text)
 
     # Extract the list of dependencies from the 'all' section
     all_deps = doc["project"]["optional-dependencies"]["all"]
@@ -166,14 +509,14 @@ def create_autora_hub_requirements(source_branch, requirements_file):
         lst = doc["project"]["optional-dependencies"][deps]
         if lst != []:
             questions = [
-                inquirer.Checkbox(
+                Checkbox(
                     f"{type}",
                     message=f"Do you want to install {type}",
                     choices=lst,
                 ),
             ]
 
-            additional_deps += inquirer.prompt(questions)[f"{type}"]
+            additional_deps += prompt(questions)[f"{type}"]
 
     # Install packages using pip and the requirements.txt file
     with open(requirements_file, "a") as f:
@@ -183,54 +526,150 @@ def create_autora_hub_requirements(source_branch, requirements_file):
     return "autora[experiment-runner-firebase-prolific]" in additional_deps
 
 
-def setup_basic(requirements_file):
-    if not check_if_firebase_tools_installed():
-        # Install firebase-tools
-        subprocess.call(["npm", "install", "-g", "firebase-tools"], shell=True)
+# *** Scaffolding *** #
+
+# directories with the files of all templates, only the files of the selected template are kept
+TEMPLATE_DIRS = ["example_workflows", "example_mains", "readmes"]
+
+# template -> destination: source, relative to the project directory
+MANIFESTS = {
+    "basic": {
+        "testing_zone/src/design/main.js": "example_mains/basic.js",
+        "researcher_hub/autora_workflow.py": "example_workflows/basic.py",
+        "researcher_hub/README.md": "readmes/README_AUTORA.md",
+        "testing_zone/README.md": "readmes/README_FIREBASE_basic.md",
+    },
+}
+
+
+def example_manifest(example_file):
+    """Files of an example project with the main.js in example_mains/<example_file>.js"""
+    return {
+        "testing_zone/src/design/main.js": f"example_mains/{example_file}.js",
+        # TODO: look into which workflow file to use
+        "researcher_hub/autora_workflow.py": "example_workflows/js_psych_stroop.py",
+        "researcher_hub/README.md": "readmes/README_AUTORA.md",
+        # TODO: look into which README to use
+        # "testing_zone/README.md": f"readmes/README_FIREBASE_{example_file}.md",
+    }
+
 
-    subprocess.call(
-        ["npx", "create-react-app", "testing_zone", "--template", "autora-firebase"]
+def place(source, destination):
+    """Move a template file to its destination (a rename, the file is only copied across file systems)"""
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    try:
+        os.replace(source, destination)
+    except OSError:
+        shutil.move(source, destination)
+
+
+def create_testing_zone():
+    """Create the testing zone with create-react-app (the output is returned to keep it out of the prompts)"""
+    output = ""
+    firebase, firebase_output = ensure_firebase_tools()
+    output += firebase_output
+    npx = toolchain()["npx"]
+    if npx is None:
+        print("Error - npx was not found, Node is required to create the testing zone")
+        return output
+    result = subprocess.run(
+        [npx["path"], "--yes", "create-react-app", "testing_zone", "--template", "autora-firebase"],
+        # npx must not ask to install create-react-app, and never reads the terminal the prompts are using
+        stdin=subprocess.DEVNULL, capture_output=True, text=True,
     )
+    output += result.stdout + result.stderr
+    if result.returncode != 0:
+        print(output)
+        print("Error - Unable to create the testing zone")
+    elif firebase is not None and firebase.startswith(CACHE_DIR):
+        # make the shared firebase-tools available as `npx firebase` in the testing zone
+        link = os.path.join("testing_zone", "node_modules", ".bin", os.path.basename(firebase))
+        os.makedirs(os.path.dirname(link), exist_ok=True)
+        try:
+            if not os.path.lexists(link):
+                os.symlink(firebase, link)
+        except OSError:
+            print(f"firebase-tools is installed at {firebase}")
+    return output
+
+
+def start_in_background(function):
+    """Run a slow step (npm, network) in a background thread, returns its Future"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(function)
+    executor.shutdown(wait=False)
+    return future
+
+
+def start_testing_zone():
+    """Create the testing zone, in the background only if the answers are given (returns a Future either way)
+
+    Interactively the prompts and create-react-app would share the terminal, so it runs in the foreground then.
+    """
+    if ANSWERS is None:
+        print("Creating the testing zone...")
+        future = Future()
+        future.set_result(create_testing_zone())
+        return future
+    return start_in_background(create_testing_zone)
+
+
+def scaffold(files, testing_zone=None):
+    """Put the files of the selected template in place and remove the files of the other templates
+
+    Files for the researcher hub are placed right away, files for the testing zone wait for create-react-app
+    (it needs an empty directory).
+
+    Args:
+        files (dict): destination -> source, relative to the project directory
+        testing_zone (Future): Optional, the background step that creates the testing zone
+    """
+    hub_files = {d: s for d, s in files.items() if not d.startswith("testing_zone/")}
+    zone_files = {d: s for d, s in files.items() if d.startswith("testing_zone/")}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        placed = [executor.submit(place, source, destination) for destination, source in hub_files.items()]
+        if testing_zone is not None:
+            print("Waiting for the testing zone to be created...")
+            testing_zone.result()
+        placed += [executor.submit(place, source, destination) for destination, source in zone_files.items()]
+        for future in placed:
+            future.result()
+
+        # Remove tmps
+        removed = [
+            executor.submit(shutil.rmtree, os.path.join(os.getcwd(), d), ignore_errors=True) for d in TEMPLATE_DIRS
+        ]
+        for future in removed:
+            future.result()
+
+
+def setup_basic(requirements_file):
+    # create-react-app downloads for a while, the files of the researcher hub don't have to wait for it
+    testing_zone = start_in_background(create_testing_zone)
     with open(requirements_file, "a") as f:
         f.write("\nautora")
-    shutil.move(f"example_mains/basic.js", "testing_zone/src/design/main.js")
-    shutil.move(f"example_workflows/basic.py", "researcher_hub/autora_workflow.py")
-    shutil.move(f"readmes/README_AUTORA.md", "researcher_hub/README.md")
-    shutil.move(f"readmes/README_FIREBASE_basic.md", "testing_zone/README.md")
-
-    # Remove tmps
-    to_remove = os.path.join(os.getcwd(), "example_workflows")
-    shutil.rmtree(to_remove)
-    to_remove = os.path.join(os.getcwd(), "example_mains")
-    shutil.rmtree(to_remove)
-    to_remove = os.path.join(os.getcwd(), "readmes")
-    shutil.rmtree(to_remove)
+    scaffold(MANIFESTS["basic"], testing_zone)
 
 
 def create_autora_example_project():
     question_1 = [
-        inquirer.List(
+        List(
             "firebase",
             message="Do you want to set up a firebase experiment? (ATTENTION: Node is required for this feature)",
             choices=["yes", "no"],
         )
     ]
 
-    answer = inquirer.prompt(question_1)
+    answer = prompt(question_1)
 
     if answer["firebase"] == "no":
         return
 
-    if not check_if_firebase_tools_installed():
-        # Install firebase-tools
-        subprocess.call(["npm", "install", "-g", "firebase-tools"], shell=True)
-
-    subprocess.call(
-        ["npx", "create-react-app", "testing_zone", "--template", "autora-firebase"]
-    )
+    # without prompts (answers given) the testing zone is created while the example is rendered
+    testing_zone = start_testing_zone()
 
     questions = [
-        inquirer.List(
+        List(
             "project_type",
             message="What type of project do you want to create?",
             choices=[
@@ -251,7 +690,7 @@ def create_autora_example_project():
         )
     ]
 
-    answers = inquirer.prompt(questions)
+    answers = prompt(questions)
 
     match answers["project_type"]:
         case "JsPsych - Stroop":
@@ -262,50 +701,8 @@ def create_autora_example_project():
             example_file = "super_experiment"
         case "SweetBean":
             example_file = "sweet_bean"
-        case "JsPsych - HTML Button":
-            example_file = "html-button"
-            write_to_js(
-                jspsych_example_name=example_file,
-                output_filepath=f"example_mains/{example_file}.js",
-            )
-        case "JsPsych - Reaction Time":
-            example_file = "reaction-time"
-            write_to_js(
-                jspsych_example_name=example_file,
-                output_filepath=f"example_mains/{example_file}.js",
-            )
-        case "JsPsych - Multi Choice Survey":
-            example_file = "multi-choice-survey"
-            write_to_js(
-                jspsych_example_name=example_file,
-                output_filepath=f"example_mains/{example_file}.js",
-            )
-        case "JsPsych - Multi Select Survey":
-            example_file = "multi-select-survey"
-            write_to_js(
-                jspsych_example_name=example_file,
-                output_filepath=f"example_mains/{example_file}.js",
-            )
-        case "JsPsych - Save Trial Parameters":
-            example_file = "save-trial-parameters"
-            write_to_js(
-                jspsych_example_name=example_file,
-                output_filepath=f"example_mains/{example_file}.js",
-            )
-        case "JsPsych - Lexical Decision":
-            example_file = "lexical-decision"
-            write_to_js(
-                jspsych_example_name=example_file,
-                output_filepath=f"example_mains/{example_file}.js",
-            )
-        case "JsPsych - Pause/Unpause":
-            example_file = "pause-unpause"
-            write_to_js(
-                jspsych_example_name=example_file,
-                output_filepath=f"example_mains/{example_file}.js",
-            )
-        case "JsPsych - Canvas Slider Response":
-            example_file = "canvas-slider-response"
+        case project_type if project_type in JSPSYCH_CHOICES:
+            example_file = JSPSYCH_CHOICES[project_type]
             write_to_js(
                 jspsych_example_name=example_file,
                 output_filepath=f"example_mains/{example_file}.js",
@@ -313,38 +710,128 @@ def create_autora_example_project():
         case _:
             example_file = None
 
-    if example_file != None:
-        shutil.move(
-            f"example_mains/{example_file}.js", "testing_zone/src/design/main.js"
-        )
+    scaffold(example_manifest(example_file) if example_file is not None else {}, testing_zone)
 
-        # TODO: look into which workflow file to use
-        shutil.move(
-            f"example_workflows/js_psych_stroop.py", "researcher_hub/autora_workflow.py"
-        )
-        shutil.move(f"readmes/README_AUTORA.md", "researcher_hub/README.md")
 
-        # TODO: look into which README to use
-        # shutil.move(
-        #     f"readmes/README_FIREBASE_{example_file}.md", "testing_zone/README.md"
-        # )
+# *** Toolchain *** #
 
-    # Remove tmps
-    to_remove = os.path.join(os.getcwd(), "example_workflows")
-    shutil.rmtree(to_remove)
-    to_remove = os.path.join(os.getcwd(), "example_mains")
-    shutil.rmtree(to_remove)
-    to_remove = os.path.join(os.getcwd(), "readmes")
-    shutil.rmtree(to_remove)
+_toolchain = None
 
+TOOLS = ["node", "npm", "npx", "firebase"]
 
-def check_if_firebase_tools_installed():
+
+def _probe(path):
+    # version of a tool, None if it can't be run
     try:
-        # Run the command to check if firebase-tools is installed
-        subprocess.check_output(["firebase", "--version"])
-        return True
-    except subprocess.CalledProcessError:
-        return False
+        result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=120)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    lines = result.stdout.strip().splitlines()
+    return lines[-1].strip() if lines else "unknown"
+
+
+def _executable(name):
+    return name + ".cmd" if sys.platform == "win32" else name
+
+
+def local_firebase_tools():
+    """Path of the firebase-tools installed in the cache directory (it may not exist yet)"""
+    prefix = os.path.join(CACHE_DIR, "firebase-tools", FIREBASE_TOOLS_VERSION)
+    return os.path.join(prefix, "node_modules", ".bin", _executable("firebase"))
+
+
+def toolchain(refresh=()):
+    """Path and version of node, npm, npx and firebase (None for tools that aren't installed)
+
+    The tools are looked up once and cached in the cache directory for TOOLCHAIN_TTL seconds (or until PATH
+    changes). Tools that were missing are looked up again by the next generation, the others are taken from the
+    cache. firebase-tools installed in the cache directory is preferred over a global install.
+
+    Args:
+        refresh (list): Names of the tools to look up again, e.g. after installing one of them
+
+    Returns:
+        dict: tool name -> {"path": ..., "version": ...} or None
+    """
+    global _toolchain
+    if _toolchain is not None and not refresh:
+        return _toolchain
+
+    cache_file = os.path.join(CACHE_DIR, "toolchain.json")
+    search_path = os.environ.get("PATH", "")
+    cached = {"time": time.time(), "tools": {}}
+    try:
+        with open(cache_file) as f:
+            stored = json.load(f)
+        if stored["PATH"] == search_path and time.time() - stored["time"] < TOOLCHAIN_TTL:
+            cached = stored
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    tools = {}
+    for name in TOOLS:
+        entry = cached["tools"].get(name)
+        if name not in refresh and entry is not None and os.path.exists(entry["path"]):
+            tools[name] = entry
+            continue
+        path = shutil.which(name)
+        if name == "firebase" and os.path.exists(local_firebase_tools()):
+            path = local_firebase_tools()
+        version = _probe(path) if path else None
+        tools[name] = {"path": path, "version": version} if version is not None else None
+
+    if tools != cached["tools"]:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_file + f".{os.getpid()}.tmp", "w") as f:
+                # the entries taken from the cache keep their age, so they are still looked up after TOOLCHAIN_TTL
+                json.dump({"PATH": search_path, "time": cached["time"], "tools": tools}, f)
+            os.replace(cache_file + f".{os.getpid()}.tmp", cache_file)
+        except OSError:
+            pass
+    _toolchain = tools
+    return tools
+
+
+def ensure_firebase_tools():
+    """Path of firebase-tools, installed into the cache directory (not globally) if it isn't available
+
+    Returns:
+        tuple: path of firebase (None if it couldn't be installed) and the output of npm
+    """
+    tools = toolchain()
+    if tools["firebase"] is not None:
+        return tools["firebase"]["path"], ""
+    if tools["npm"] is None:
+        print("Error - npm was not found, Node is required to install firebase-tools")
+        return None, ""
+    prefix = os.path.join(CACHE_DIR, "firebase-tools", FIREBASE_TOOLS_VERSION)
+    result = subprocess.run(
+        [tools["npm"]["path"], "install", "--prefix", prefix, f"firebase-tools@{FIREBASE_TOOLS_VERSION}"],
+        capture_output=True, text=True,
+    )
+    output = result.stdout + result.stderr
+    firebase = toolchain(refresh=["firebase"])["firebase"]
+    if result.returncode != 0 or firebase is None:
+        print(output)
+        print("Error - Unable to install firebase-tools")
+        return None, output
+    return firebase["path"], output
+
+
+def check_if_firebase_tools_installed():
+    return toolchain()["firebase"] is not None
+
+
+def report_firebase_tools():
+    """Tell where firebase-tools is, it is linked into the testing zone instead of being installed globally"""
+    firebase = toolchain()["firebase"]
+    if firebase is None:
+        return
+    print(f"firebase-tools {firebase['version']} is installed at {firebase['path']}")
+    print("Run it from the testing_zone folder with: npx firebase <command> (e.g. npx firebase login)")
 
 
 def main():
@@ -357,7 +844,13 @@ def main():
     else:
         setup_basic(requirements_file)
     clean_up()
+    if os.path.isdir("testing_zone"):
+        report_firebase_tools()
 
 
 if __name__ == "__main__":
-    main()
+    # python hooks/post_gen_project.py render-catalog [OUTPUT_DIR] renders all jsPsych examples
+    if sys.argv[1:2] == ["render-catalog"]:
+        render_jspsych_catalog(sys.argv[2] if len(sys.argv) > 2 else "jspsych_catalog")
+    else:
+        main()
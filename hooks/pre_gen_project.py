@@ -1,15 +1,22 @@
+import importlib.util
 import os
 import subprocess
 import sys
 import venv
 
 
-# Check if the required packages are installed, and install them if not
-required_packages = ['requests', 'tomlkit', 'inquirer']
-missing_packages = [pkg for pkg in required_packages if pkg not in sys.modules]
+# post_gen_project.py only needs the standard library (urllib and tomllib), inquirer is imported
+# when the questions are asked interactively. With AUTORA_COOKIECUTTER_ANSWERS set, nothing is installed.
+required_packages = ['inquirer']
 
 
-def setup():
+def missing_packages():
+    if os.environ.get("AUTORA_COOKIECUTTER_ANSWERS"):
+        return []
+    return [pkg for pkg in required_packages if importlib.util.find_spec(pkg) is None]
+
+
+def setup(packages=required_packages):
     # Define the name and location of the virtual environment
     venv_dir = 'temp/venvTmp'
     venv_path = os.path.join(os.getcwd(), venv_dir)
@@ -30,9 +37,11 @@ def setup():
         python_executable = os.path.join(os.environ['VIRTUAL_ENV'], 'bin', 'python')
 
     # Install the dependencies using pip
-    subprocess.check_call([python_executable, "-m", "pip", "install", *required_packages])
+    subprocess.check_call([python_executable, "-m", "pip", "install", *packages])
 
 
 if __name__ == '__main__':
-    # Call the function to run the post-gen script
-    setup()
+    # Only create a virtual environment if the hooks are missing a package
+    packages = missing_packages()
+    if packages:
+        setup(packages)
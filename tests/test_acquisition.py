@@ -0,0 +1,78 @@
+import time
+
+import numpy as np
+from autora.experimentalist.pipeline import make_pipeline
+from sklearn.linear_model import LinearRegression
+
+from researcher_hub.acquisition import acquisition_finalize, acquisition_sampler, novelty
+from researcher_hub.pipeline import PipelinedCycle
+
+POOL = np.linspace(0, 1, 101)
+
+
+def _linear(slope, intercept=0.0):
+    x = np.array([[0.0], [1.0]])
+    return LinearRegression().fit(x, slope * x + intercept)
+
+
+def test_disagreement_picks_where_the_models_differ():
+    # the models cross at x = 0 and disagree most at x = 1
+    models = [_linear(1), _linear(2), _linear(3)]
+    chosen = acquisition_sampler(POOL, 3, models=models)
+    np.testing.assert_allclose(chosen, [1.0, 0.99, 0.98])
+
+
+def test_novelty_and_uncertainty_avoid_observed_conditions():
+    observed = np.array([0.0, 0.1, 0.2, 1.0])
+    assert acquisition_sampler(POOL, 1, reference_conditions=observed, acquisition="novelty")[0] == 0.6
+    chosen = acquisition_sampler(POOL, 1, reference_conditions=observed, acquisition="uncertainty")[0]
+    assert chosen in (0.0, 1.0) or chosen > 0.9
+
+
+def test_novelty_in_several_dimensions():
+    rng = np.random.default_rng(180)
+    candidates, reference = rng.uniform(size=(500, 2)), rng.uniform(size=(40, 2))
+    brute_force = np.sqrt(((candidates[:, None] - reference[None]) ** 2).sum(axis=2)).min(axis=1)
+    np.testing.assert_allclose(novelty(candidates, reference), brute_force)
+
+
+def test_random_choice_without_information():
+    chosen = acquisition_sampler(POOL, 5, rng=np.random.default_rng(180))
+    assert len(set(chosen)) == 5
+    assert acquisition_sampler(list(POOL), 5, rng=np.random.default_rng(180)) == list(chosen)
+
+
+def test_pipeline_step():
+    pipeline = make_pipeline(
+        [lambda: POOL, acquisition_sampler],
+        params={"acquisition_sampler": {"num_samples": 2, "models": [_linear(1), _linear(-1)]}},
+    )
+    np.testing.assert_allclose(pipeline(), [1.0, 0.99])
+
+
+def test_large_pool_is_fast():
+    rng = np.random.default_rng(180)
+    pool, observed = rng.uniform(size=100_000), rng.uniform(size=1000)
+    models = [_linear(s) for s in (1, 1.5, 2, 2.5, 3)]
+    start = time.perf_counter()
+    acquisition_sampler(pool, 3, models=models, reference_conditions=observed,
+                        acquisition={"disagreement": 1, "uncertainty": 1, "novelty": 1})
+    assert time.perf_counter() - start < 1
+
+
+def test_finalize_in_cycle():
+    rng = np.random.default_rng(180)
+
+    def runner(conditions):
+        return 2 * np.asarray(conditions) + 1
+
+    cycle = PipelinedCycle(
+        variables=None,
+        theorist=LinearRegression(),
+        experimentalist=lambda: rng.uniform(size=1000),
+        experiment_runner=runner,
+        finalize=acquisition_finalize(3, {"disagreement": 1, "novelty": 1}, seed=180),
+    )
+    data = cycle.run(num_cycles=3)
+    assert [len(c) for c in data.conditions] == [3, 3, 3]
+    assert np.isclose(data.models[-1].coef_[0].item(), 2)
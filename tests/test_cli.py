@@ -0,0 +1,104 @@
+import os
+import shutil
+
+from tests.conftest import TEMPLATE_DIR
+from researcher_hub.cli import load_state, main
+from researcher_hub.profiling import SamplingProfiler
+
+
+def _config(tmp_path):
+    config = tmp_path / "workflow.json"
+    shutil.copy(os.path.join(TEMPLATE_DIR, "researcher_hub", "workflow.json"), config)
+    return str(config)
+
+
+def test_run_and_resume(tmp_path, capsys):
+    config = _config(tmp_path)
+    assert main(["--config", config, "run", "--runner", "synthetic", "--cycles", "2"]) == 0
+    data = load_state(str(tmp_path / "autora_state.pkl"))
+    assert len(data.models) == 2
+
+    assert main(["--config", config, "resume", "--runner", "synthetic", "--cycles", "2", "--timings"]) == 0
+    resumed = load_state(str(tmp_path / "autora_state.pkl"))
+    assert len(resumed.models) == 4
+    assert len(resumed.timings) == 4
+    # the resumed cycles don't repeat the conditions of the first ones
+    assert not set(resumed.conditions[2].tolist()) & set(data.conditions[0].tolist())
+    assert "Generated 4 models" in capsys.readouterr().out
+
+
+def test_profile_folded(tmp_path):
+    config = _config(tmp_path)
+    output = str(tmp_path / "profile.folded")
+    main(["--config", config, "profile", "--runner", "synthetic", "--format", "folded", "--output", output])
+    with open(output) as f:
+        lines = f.read().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_sampling_profiler_sees_threads():
+    import threading
+    import time
+
+    def busy():
+        end = time.perf_counter() + 0.1
+        while time.perf_counter() < end:
+            pass
+
+    with SamplingProfiler(interval=0.001) as profiler:
+        thread = threading.Thread(target=busy, name="busy")
+        thread.start()
+        thread.join()
+    assert any(stack.startswith("busy;") and "busy (test_cli.py" in stack for stack in profiler.samples)
+
+
+def test_run_does_not_overwrite_a_study(tmp_path, capsys):
+    config = _config(tmp_path)
+    assert main(["--config", config, "run", "--runner", "synthetic", "--cycles", "1"]) == 0
+    assert main(["--config", config, "run", "--runner", "synthetic", "--cycles", "2"]) == 1
+    assert "resume" in capsys.readouterr().err
+    assert len(load_state(str(tmp_path / "autora_state.pkl")).models) == 1
+
+    assert main(["--config", config, "run", "--runner", "synthetic", "--cycles", "2", "--force"]) == 0
+    assert len(load_state(str(tmp_path / "autora_state.pkl")).models) == 2
+
+
+def test_bench_and_profile_leave_the_study_alone(tmp_path):
+    config = _config(tmp_path)
+    assert main(["--config", config, "run", "--runner", "synthetic", "--cycles", "1"]) == 0
+    state = tmp_path / "autora_state.pkl"
+    telemetry = tmp_path / "telemetry.jsonl"
+    before = state.read_bytes(), telemetry.read_bytes()
+
+    assert main(["--config", config, "bench", "--cycles", "2"]) == 0
+    main(["--config", config, "profile", "--runner", "synthetic", "--format", "folded",
+          "--output", str(tmp_path / "profile.folded")])
+    assert (state.read_bytes(), telemetry.read_bytes()) == before
+
+
+def test_quorum_of_the_config_is_exact(tmp_path, monkeypatch):
+    from researcher_hub import cli
+
+    config = cli.load_config(_config(tmp_path))
+    (tmp_path / "firebase_credentials.json").write_text("{}")
+    monkeypatch.setattr(cli, "load", lambda stage, name: lambda **kwargs: kwargs)
+    assert cli.build_runner(config, "firebase")["quorum"] == 2 / 3
+
+
+def test_resumed_grid_skips_observed_conditions_and_stragglers(tmp_path):
+    import numpy as np
+
+    from researcher_hub import cli
+    from researcher_hub.pipeline import CycleData
+    from researcher_hub.samplers import grid_for
+
+    config = cli.load_config(_config(tmp_path))
+    config["variables"]["independent_variables"] = [{"name": "x", "allowed_values": [0, 1, 2, 3, 4]}]
+    config["experimentalist"] = {"name": "grid", "num_samples": 2, "seed": 180}
+    data = CycleData(conditions=[np.array([[0], [1]])], stragglers=np.array([[2]]), timings=[{}])
+    cycle = cli.build_cycle(config, "synthetic", data=data)
+    grid = grid_for(cycle.variables)
+    assert grid.used == 3
+    assert sorted(grid.sample(2, np.random.default_rng(0)).ravel().tolist()) == [3, 4]
@@ -0,0 +1,67 @@
+import os
+import tracemalloc
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from researcher_hub.history import ModelHistory, summarize
+
+
+def _model(slope):
+    x = np.linspace(0, 1, 10).reshape(-1, 1)
+    y = slope * x + 1
+    return LinearRegression().fit(x, y), x, y
+
+
+def test_summary():
+    model, x, y = _model(2)
+    summary = summarize(model, x, y)
+    assert summary["equation"] == "y = 2*x0 + 1"
+    assert np.isclose(summary["coefficients"]["coef"][0][0], 2)
+    assert np.isclose(summary["score"], 1)
+    assert summarize(model)["score"] is None
+
+
+def test_keeps_last_models_and_reloads_spilled(tmp_path):
+    history = ModelHistory(keep_last=2, spill_dir=str(tmp_path))
+    for slope in range(5):
+        history.append(*_model(slope))
+    assert len(history) == 5
+    assert history.in_memory() == [3, 4]
+    assert sorted(os.listdir(tmp_path)) == ["model_0.pkl", "model_1.pkl", "model_2.pkl"]
+    # older models are loaded from disk, but not kept in memory
+    assert np.isclose(history[0].coef_[0].item(), 0)
+    assert history.in_memory() == [3, 4]
+    assert [round(m.coef_[0].item()) for m in history] == [0, 1, 2, 3, 4]
+    assert [round(m.coef_[0].item()) for m in history[-2:]] == [3, 4]
+    assert [s["cycle"] for s in history.summaries] == [0, 1, 2, 3, 4]
+
+
+def test_without_spill_dir_only_summaries_remain():
+    history = ModelHistory(keep_last=1)
+    for slope in range(3):
+        history.append(*_model(slope))
+    assert history[-1] is history[2]
+    with pytest.raises(IndexError):
+        history[0]
+    assert history.summaries[0]["equation"] == "y = 0*x0 + 1"
+
+
+class Heavy:
+    # stands in for a theorist with a large internal state (e.g. BMS), 2 MB each
+    def __init__(self):
+        self.state = np.ones(250_000)
+
+
+def test_memory_is_bounded(tmp_path):
+    def peak(history, n):
+        tracemalloc.start()
+        for _ in range(n):
+            history.append(Heavy())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    bounded = peak(ModelHistory(keep_last=2, spill_dir=str(tmp_path)), 20)
+    assert bounded < 5 * 250_000 * 8
@@ -0,0 +1,112 @@
+import http.server
+import os
+import subprocess
+import sys
+import threading
+import tomllib
+
+import pytest
+
+from hooks import post_gen_project, pre_gen_project
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PYPROJECT = '''
+[project]
+name = "autora"  # a comment
+dynamic = ["version"]
+authors = [{ name = "Autora", email = "autora@example.com" }]
+license = { file = "LICENSE" }
+
+[project.optional-dependencies]
+all = [
+    "autora[all-theorists]",  # the theorists' extras
+    "autora[all-experimentalists]",  # trailing comma
+]
+all-theorists = ["autora-theorist-bms", 'autora-theorist-darts']
+all-experimentalists = []
+"all-runners" = ["autora-experiment-runner-firebase-prolific >= 1.0"]
+
+[tool.setuptools_scm]
+write_to = 'src/autora/_version.py'
+fallback = true
+weight = 1.5
+build.steps = 3
+
+[[tool.mypy.overrides]]
+module = "sklearn.*"
+
+[[tool.mypy.overrides]]
+module = """
+tensorflow"""
+'''
+
+
+def test_optional_dependencies_match_tomllib():
+    table = tomllib.loads(PYPROJECT)["project"]["optional-dependencies"]
+    assert post_gen_project._read_optional_dependencies(PYPROJECT) == table
+    assert post_gen_project.parse_toml(PYPROJECT)["project"]["optional-dependencies"]["all-experimentalists"] == []
+
+
+def test_python_without_tomllib(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tomllib", None)
+    doc = post_gen_project.parse_toml(PYPROJECT)
+    assert doc == {"project": {"optional-dependencies": tomllib.loads(PYPROJECT)["project"]["optional-dependencies"]}}
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address)
+        if self.path == "/moved":
+            self.send_response(301)
+            self.send_header("Location", "/file")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        status, body = (200, b"content") if self.path == "/file" else (404, b"missing")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.connections = set()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_reuses_the_connection(server, monkeypatch):
+    monkeypatch.delenv("http_proxy", raising=False)
+    monkeypatch.delenv("HTTP_PROXY", raising=False)
+    with post_gen_project.Session() as session:
+        responses = [session.get(f"{server}/file") for _ in range(3)] + [session.get(f"{server}/moved")]
+        missing = session.get(f"{server}/other")
+    assert [(r.status_code, r.text) for r in responses] == [(200, "content")] * 4
+    assert (missing.status_code, missing.text) == (404, "missing")
+    assert len(Handler.connections) == 1
+
+
+def test_non_interactive_hooks_need_only_the_standard_library(monkeypatch):
+    code = (
+        "import sys; from hooks import post_gen_project; "
+        "print(sorted(m for m in ('requests', 'tomlkit', 'inquirer') if m in sys.modules))"
+    )
+    out = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT, text=True)
+    assert out.strip() == "[]"
+
+    monkeypatch.setenv("AUTORA_COOKIECUTTER_ANSWERS", "{}")
+    assert pre_gen_project.missing_packages() == []
+    monkeypatch.delenv("AUTORA_COOKIECUTTER_ANSWERS")
+    # inquirer is installed in the test environment
+    assert pre_gen_project.missing_packages() == []
@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from hooks import post_gen_project
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE = os.path.join(
+    ROOT, "benchmarks", "fixtures", "raw", "jspsych", "jsPsych", "main", "examples", "jspsych-html-button-response.html"
+)
+COMMIT = "0123456789abcdef0123456789abcdef01234567"
+
+PAGE = """<!DOCTYPE html>
+<html>
+  <head>
+    <script src="https://unpkg.com/jspsych@7.3.4"></script>
+    <script src="https://unpkg.com/@jspsych/plugin-html-keyboard-response@1.1.3"></script>
+    <script src="../packages/plugin-survey-multi-choice/dist/index.browser.js"></script>
+  </head>
+  <script>
+    // a </div> in a comment and "<script>" in a string don't end the script
+    var jsPsych = initJsPsych();
+    var html = "<script>";
+  </script>
+  <script>
+    jsPsych.run([{type: jsPsychCanvasKeyboardResponse}, {type: jsPsychHtmlKeyboardResponse}]);
+  </script>
+</html>
+"""
+
+
+class Response:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class FakeSession:
+    def __init__(self, commit=COMMIT):
+        self.commit = commit
+        self.urls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+        if "/commits/" in url:
+            return Response(self.commit or "rate limited", 200 if self.commit else 403)
+        with open(EXAMPLE) as f:
+            return Response(f.read())
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(post_gen_project, "CACHE_DIR", str(tmp_path / "cache"))
+
+
+def test_parse_detects_plugins_from_code_and_script_tags():
+    code, packages = post_gen_project.parse_jspsych_example(PAGE)
+    assert packages == [
+        "@jspsych/plugin-canvas-keyboard-response",
+        "@jspsych/plugin-html-keyboard-response",
+        "@jspsych/plugin-survey-multi-choice",
+    ]
+    assert code.startswith("// a </div> in a comment")
+    assert 'var html = "<script>";\njsPsych.run(' in code
+
+
+def test_render_main_js():
+    with open(EXAMPLE) as f:
+        main_js = post_gen_project.render_main_js(*post_gen_project.parse_jspsych_example(f.read()))
+    assert "import jsPsychHtmlButtonResponse from '@jspsych/plugin-html-button-response'\n" in main_js
+    assert "const main = async (id, condition) => {\n  var jsPsych = initJsPsych({\n" in main_js
+    assert main_js.endswith("} \n\nexport default main\n")
+
+
+def test_only_plugins_used_in_the_code_are_imported():
+    main_js = post_gen_project.render_main_js(*post_gen_project.parse_jspsych_example(PAGE))
+    assert "from '@jspsych/plugin-canvas-keyboard-response'" in main_js
+    assert "from '@jspsych/plugin-html-keyboard-response'" in main_js
+    # only loaded with a script tag of the example page
+    assert "survey-multi-choice" not in main_js
+
+
+def test_render_is_cached_per_commit():
+    session = FakeSession()
+    first = post_gen_project.render_jspsych_example("html-button", COMMIT, session)
+    second = post_gen_project.render_jspsych_example("html-button", COMMIT, session)
+    assert first == second
+    assert len(session.urls) == 1
+    assert f"/jspsych/jsPsych/{COMMIT}/examples/" in session.urls[0]
+
+
+def test_main_branch_is_not_cached():
+    session = FakeSession(commit=None)
+    assert post_gen_project.resolve_jspsych_commit(session) is None
+    post_gen_project.render_jspsych_example("html-button", None, session)
+    post_gen_project.render_jspsych_example("html-button", None, session)
+    assert len(session.urls) == 3
+
+
+def test_render_catalog(tmp_path, monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(post_gen_project, "Session", lambda: session)
+    paths = post_gen_project.render_jspsych_catalog(str(tmp_path / "catalog"))
+    assert sorted(paths) == sorted(post_gen_project.JSPSYCH_EXAMPLES)
+    assert all(os.path.exists(p) for p in paths.values())
+    # one commit lookup for the whole batch
+    assert sum("/commits/" in url for url in session.urls) == 1
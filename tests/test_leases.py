@@ -0,0 +1,101 @@
+import threading
+
+from researcher_hub.leases import LocalSession, SlotAllocator
+from researcher_hub.runner import wait_for_observations
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_conditions_are_never_over_assigned():
+    slots = SlotAllocator(3, targets=[1, 2, 1], lease_seconds=10, clock=Clock())
+    leases = [slots.acquire(participant=p) for p in range(4)]
+    assert [lease.condition for lease in leases] == [0, 1, 1, 2]
+    assert slots.acquire(participant=4) is None
+    assert slots.status() == "unavailable"
+
+    for lease in leases:
+        assert slots.complete(lease.id, lease.participant)
+    assert slots.status() == "finished"
+    assert slots.observations == [[0], [1, 2], [3]]
+
+
+def test_expired_leases_are_reclaimed_and_heartbeats_keep_them():
+    clock = Clock()
+    slots = SlotAllocator(2, lease_seconds=10, clock=clock)
+    slow, steady = slots.acquire("slow"), slots.acquire("steady")
+    clock.now = 8
+    assert slots.renew(steady.id)
+    clock.now = 12
+    assert slots.reclaim() == 1
+    assert slots.active == 1 and slots.available == 1
+
+    # the slot of the slow participant is handed out again, their late observation is not recorded
+    retry = slots.acquire("retry")
+    assert retry.condition == slow.condition
+    assert not slots.complete(slow.id, "late")
+    assert not slots.renew(slow.id)
+    assert slots.complete(retry.id, "on time")
+    assert slots.observations[slow.condition] == ["on time"]
+
+
+def test_released_slots_are_handed_out_first():
+    slots = SlotAllocator(3, clock=Clock())
+    first = slots.acquire()
+    assert slots.release(first.id)
+    assert not slots.release(first.id)
+    assert slots.acquire().condition == first.condition
+
+
+def test_renewals_do_not_grow_the_heap():
+    clock = Clock()
+    slots = SlotAllocator(10, lease_seconds=10, clock=clock)
+    leases = [slots.acquire() for _ in range(10)]
+    for step in range(1000):
+        clock.now = step / 100
+        assert slots.renew(leases[step % 10].id)
+    assert len(slots._expiry) <= 4 * 10 + 64 + 1
+
+
+def test_local_session_runs_a_study():
+    session = LocalSession(lease_seconds=60)
+
+    def participant(p):
+        while True:
+            started = session.start("autora", participant=p)
+            if started is None:
+                return
+            lease_id, condition = started
+            session.heartbeat("autora", lease_id)
+            session.finish("autora", lease_id, 2 * condition + 1)
+
+    def send(conditions):
+        session.send_conditions("autora", conditions, targets=[1, 3, 1])
+        workers = [threading.Thread(target=participant, args=(p,)) for p in range(8)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+    observations = wait_for_observations(
+        [0.0, 1.0, 2.0],
+        send=send,
+        check=lambda: session.check_firebase_status("autora", time_out=60),
+        get=lambda: session.get_observations("autora"),
+        sleep_time=0,
+    )
+    assert observations == [1.0, [3.0, 3.0, 3.0], 5.0]
+
+
+def test_local_session_releases_aborted_participants():
+    session = LocalSession()
+    session.send_conditions("autora", [0.1])
+    session.start("autora", participant="p1")
+    assert session.check_firebase_status("autora") == "unavailable"
+    assert session.check_firebase_status("autora", pids_aborted=["p1"]) == "available"
+    assert session.get_observations("autora") == {"0": None}
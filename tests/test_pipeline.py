@@ -0,0 +1,89 @@
+import threading
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from researcher_hub.pipeline import PipelinedCycle, SpeculativeStage
+
+
+def test_speculative_stage_runs_ahead():
+    started = []
+
+    def prepare(cycle):
+        started.append(cycle)
+        return cycle * 10
+
+    stage = SpeculativeStage(prepare)
+    stage.start(0)
+    assert stage.result(0) == 0
+    assert stage.result(1) == 10
+    stage.shutdown()
+    assert started == [0, 1]
+
+
+def test_pipelined_cycle_overlaps_experimentalist_and_runner():
+    rng = np.random.default_rng(seed=180)
+    prepared = threading.Semaphore(0)
+    overlapped = []
+
+    def experimentalist():
+        prepared.release()
+        return rng.uniform(low=0, high=1, size=3)
+
+    def experiment_runner(conditions):
+        # the conditions of this cycle have been taken, so the next experimentalist call can only
+        # happen while the runner is waiting
+        prepared.acquire()
+        overlapped.append(prepared.acquire(timeout=1))
+        prepared.release()
+        return 2 * conditions + 1
+
+    cycle = PipelinedCycle(
+        variables=None,
+        theorist=LinearRegression(),
+        experimentalist=experimentalist,
+        experiment_runner=experiment_runner,
+    )
+    data = cycle.run(num_cycles=3)
+
+    assert overlapped == [True, True, False]
+    assert len(data.models) == 3
+    assert np.isclose(data.models[-1].coef_[0].item(), 2)
+    assert np.isclose(data.models[-1].intercept_.item(), 1)
+
+
+def test_pipelined_cycle_finalize_sees_latest_model():
+    seen = []
+
+    def finalize(candidates, data):
+        seen.append(len(data.models))
+        return candidates[:2]
+
+    cycle = PipelinedCycle(
+        variables=None,
+        theorist=LinearRegression(),
+        experimentalist=lambda: np.arange(5.0),
+        experiment_runner=lambda x: x,
+        finalize=finalize,
+    )
+    data = cycle.run(num_cycles=3)
+
+    assert seen == [0, 1, 2]
+    assert all(len(c) == 2 for c in data.conditions)
+
+
+def test_models_record_the_cycle_they_were_fitted_in():
+    answered = iter([True, False, True])
+
+    def experiment_runner(conditions):
+        # nobody finishes in the second cycle, so it adds no model
+        return 2 * conditions + 1 if next(answered) else [None] * len(conditions)
+
+    cycle = PipelinedCycle(
+        variables=None,
+        theorist=LinearRegression(),
+        experimentalist=lambda: np.arange(3.0),
+        experiment_runner=experiment_runner,
+    )
+    data = cycle.run(num_cycles=3)
+    assert [s["cycle"] for s in data.models.summaries] == [0, 2]
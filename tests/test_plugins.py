@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+import pytest
+
+from tests.conftest import TEMPLATE_DIR
+from researcher_hub import plugins
+from researcher_hub.importtime import import_time, plugin_modules
+
+
+def test_load_imports_on_first_use():
+    plugins.register("theorist", "test_linear", "sklearn.linear_model:LinearRegression")
+    assert ("theorist", "test_linear") not in plugins.loaded()
+    LinearRegression = plugins.load("theorist", "test_linear")
+    assert LinearRegression.__name__ == "LinearRegression"
+    assert plugins.load("theorist", "test_linear") is LinearRegression
+    assert ("theorist", "test_linear") in plugins.loaded()
+
+
+def test_load_unknown_plugin():
+    with pytest.raises(KeyError):
+        plugins.load("theorist", "does_not_exist")
+
+
+def test_hub_modules_import_without_heavy_dependencies():
+    code = (
+        "import sys, researcher_hub.runner, researcher_hub.session, researcher_hub.plugins; "
+        "print(sorted(m for m in ('firebase_admin', 'sklearn', 'sweetpea') if m in sys.modules))"
+    )
+    out = subprocess.check_output([sys.executable, "-c", code], cwd=TEMPLATE_DIR, text=True)
+    assert out.strip() == "[]"
+
+
+def test_import_time():
+    total, heaviest = import_time("json")
+    assert total > 0
+    assert heaviest[0][0] == "json"
+    assert import_time("does_not_exist") == (None, [])
+    assert "sklearn.linear_model" in plugin_modules()
+
+
+def test_plugins_can_load_plugins_while_they_are_imported(tmp_path, monkeypatch):
+    (tmp_path / "nested_plugin.py").write_text(
+        "from researcher_hub import plugins\n"
+        "Regressor = plugins.load('theorist', 'test_inner')\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    plugins.register("theorist", "test_inner", "sklearn.linear_model:LinearRegression")
+    plugins.register("theorist", "test_outer", "nested_plugin:Regressor")
+    assert plugins.load("theorist", "test_outer").__name__ == "LinearRegression"
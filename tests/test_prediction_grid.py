@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from autora.variable import Variable, VariableCollection
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from researcher_hub.acquisition import acquisition_sampler
+from researcher_hub.history import ModelHistory
+from researcher_hub.prediction_grid import PredictionGrid
+
+VARIABLES = VariableCollection(
+    independent_variables=[Variable(name="x", value_range=(0, 1))],
+    dependent_variables=[Variable(name="y")],
+)
+
+
+class CountingModel:
+    """A model that is not linear, so the grid has to call predict"""
+
+    def __init__(self, slope):
+        self.slope = slope
+        self.calls = 0
+
+    def predict(self, x):
+        self.calls += 1
+        return self.slope * np.asarray(x) ** 2
+
+
+def _linear(slope):
+    x = np.array([[0.0], [1.0]])
+    return LinearRegression().fit(x, slope * x)
+
+
+def test_each_model_is_evaluated_once():
+    grid = PredictionGrid(VARIABLES, ensemble=2)
+    history = ModelHistory()
+    models = [CountingModel(s) for s in (1, 2, 3)]
+    for model in models:
+        history.append(model)
+        assert grid.update(history)
+        assert not grid.update(history)
+        grid.predict(np.linspace(0, 1, 1000))
+    assert [m.calls for m in models] == [1, 1, 1]
+
+    np.testing.assert_allclose(grid.predict([[0.5]]), [[0.75]], atol=1e-4)
+    # the last two models disagree by x ** 2 / 2
+    np.testing.assert_allclose(grid.std([[0.0], [1.0]]), [[0.0], [0.5]], atol=1e-4)
+
+
+def test_refitted_model_needs_a_version():
+    grid = PredictionGrid(VARIABLES)
+    model = _linear(1)
+    grid.update(model, version=0)
+    assert grid.std([[0.5]]) is None
+    model.fit(np.array([[0.0], [1.0]]), np.array([[0.0], [2.0]]))
+    assert not grid.update(model, version=0)
+    assert grid.update(model, version=1)
+    np.testing.assert_allclose(grid.predict([[1.0]]), [[2.0]])
+
+
+def test_ensemble_estimators_give_the_uncertainty():
+    rng = np.random.default_rng(180)
+    x = rng.uniform(size=(200, 1))
+    forest = RandomForestRegressor(n_estimators=10, random_state=180).fit(x, x[:, 0] + rng.normal(0, 0.1, 200))
+    grid = PredictionGrid(VARIABLES, resolution=64)
+    grid.update(forest)
+    assert grid.mean.shape == (64, 1)
+    assert np.all(grid.std(x) > 0)
+
+
+def test_several_variables_are_interpolated():
+    variables = VariableCollection(independent_variables=[
+        Variable(name="x1", value_range=(0, 1)), Variable(name="x2", allowed_values=[1, 2, 3]),
+    ])
+    grid = PredictionGrid(variables, resolution=32)
+    assert grid.shape == (32, 3)
+    x = np.array([[0.0, 1.0], [1.0, 1.0], [0.0, 3.0]])
+    grid.update([LinearRegression().fit(x, x[:, 0] + x[:, 1])])
+    np.testing.assert_allclose(grid.predict([[0.25, 2.5], [0.5, 3.0]]), [[2.75], [3.5]])
+
+
+def test_disagreement_reads_the_grid():
+    grid = PredictionGrid(VARIABLES, ensemble=3)
+    grid.update([_linear(1), _linear(2), _linear(3)])
+    chosen = acquisition_sampler(np.linspace(0, 1, 101), 3, models=grid)
+    np.testing.assert_allclose(chosen, [1.0, 0.99, 0.98])
+
+
+def test_empty_grid():
+    grid = PredictionGrid(VARIABLES)
+    grid.update([])
+    assert grid.mean is None
+    with pytest.raises(ValueError):
+        grid.predict([[0.5]])
@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+import pytest
+
+from researcher_hub.projection import Projection
+
+PROJECTION = Projection(["coherence_movement", "correct"], where={"trial_type": "rok"})
+
+
+def _trials(n=24):
+    rng = np.random.default_rng(seed=180)
+    trials = []
+    for i in range(n):
+        trials.append({"trial_type": "html-keyboard-response", "stimulus": "+", "rt": None, "time_elapsed": i})
+        trials.append({
+            "trial_type": "rok", "coherence_movement": float(rng.choice([20, 50, 80])), "correct": bool(i % 3),
+            "rt": 400 + i, "coherent_movement_direction": 0, "coherent_orientation": 180, "movement_speed": 20,
+            "choices": ["j", "f"], "response": "j", "time_elapsed": i, "internal_node_id": f"0.0-{i}.0",
+        })
+    return trials
+
+
+def test_projected_upload_is_parsed_like_the_full_data():
+    trials = _trials()
+    full = json.dumps({"trials": trials})
+    projected = json.dumps(PROJECTION.apply(trials))
+    assert len(projected) * 5 < len(full)
+
+    columns = PROJECTION.parse(projected)
+    expected = PROJECTION.parse(full)
+    assert set(columns) == {"coherence_movement", "correct"}
+    assert len(columns["correct"]) == 24
+    for field in columns:
+        np.testing.assert_array_equal(columns[field], expected[field])
+
+
+def test_fields_are_looked_up_by_name():
+    observation = {"fields": ["correct", "coherence_movement", "rt"], "rows": [[True, 50.0, 300], [False, 80.0, 310]]}
+    columns = PROJECTION.parse(observation)
+    np.testing.assert_array_equal(columns["coherence_movement"], [50.0, 80.0])
+    np.testing.assert_array_equal(columns["correct"], [True, False])
+
+    empty = PROJECTION.parse({"fields": PROJECTION.fields, "rows": []})
+    assert len(empty["correct"]) == 0
+
+
+def test_missing_field():
+    with pytest.raises(KeyError, match="correct"):
+        PROJECTION.parse({"fields": ["coherence_movement"], "rows": [[50.0]]})
@@ -0,0 +1,28 @@
+import inquirer
+
+from hooks import post_gen_project
+
+
+def test_prompt_uses_answers(monkeypatch):
+    monkeypatch.setattr(post_gen_project, "ANSWERS", {"advanced": "yes"})
+    questions = [
+        post_gen_project.List("advanced", message="Advanced?", choices=["yes", "no"]),
+        post_gen_project.List("firebase", message="Firebase?", choices=["yes", "no"]),
+        post_gen_project.Checkbox("theorists", message="Theorists?", choices=["a", "b"]),
+    ]
+    assert post_gen_project.prompt(questions) == {"advanced": "yes", "firebase": "yes", "theorists": []}
+
+
+def test_prompt_accepts_inquirer_questions(monkeypatch):
+    monkeypatch.setattr(post_gen_project, "ANSWERS", {})
+    questions = [
+        inquirer.List("firebase", message="Firebase?", choices=["yes", "no"]),
+        inquirer.Checkbox("theorists", message="Theorists?", choices=["a", "b"]),
+    ]
+    assert post_gen_project.prompt(questions) == {"firebase": "yes", "theorists": []}
+
+
+def test_questions_become_inquirer_questions():
+    question = post_gen_project.Checkbox("theorists", message="Theorists?", choices=["a", "b"]).to_inquirer()
+    assert isinstance(question, inquirer.Checkbox)
+    assert question.name == "theorists"
@@ -0,0 +1,82 @@
+import csv
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+from researcher_hub.history import ModelHistory
+from researcher_hub.report import collect_held_out, metrics, parameters, report_rows, write_report
+
+
+def _history(n, spill_dir=None):
+    rng = np.random.default_rng(180)
+    history = ModelHistory(keep_last=2, spill_dir=spill_dir)
+    for slope in range(n):
+        x = rng.uniform(size=(20, 1))
+        y = slope * x + 1 + rng.normal(scale=0.1, size=(20, 1))
+        history.append(LinearRegression().fit(x, y), x, y)
+    return history
+
+
+def test_parameters_come_from_the_summaries():
+    # keep_last=2 without a spill_dir: the older models are gone, their parameters are not
+    history = _history(5)
+    params = parameters(history)
+    assert params.shape == (5, 2)
+    np.testing.assert_allclose(params[:, 0], range(5), atol=0.2)
+    np.testing.assert_allclose(params[:, 1], 1, atol=0.2)
+
+
+def test_metrics_match_sklearn(tmp_path):
+    history = _history(6, spill_dir=str(tmp_path))
+    x = np.linspace(0, 1, 50).reshape(-1, 1)
+    y = 3 * x + 1
+    fit = metrics(history, x, y)
+    np.testing.assert_allclose(fit["r2"], [m.score(x, y) for m in history])
+    np.testing.assert_allclose(fit["mse"], [np.mean((m.predict(x) - y) ** 2) for m in history])
+    assert np.argmax(fit["r2"]) == 3
+
+
+def test_models_without_coefficients_use_predict():
+    x = np.linspace(0, 1, 10).reshape(-1, 1)
+    y = 2 * x
+    models = [LinearRegression().fit(x, y), DecisionTreeRegressor().fit(x, y.ravel())]
+    params = parameters(models)
+    assert np.isnan(params[1]).all()
+    np.testing.assert_allclose(metrics(models, x, y)["r2"], [1, 1])
+
+
+def test_write_report(tmp_path):
+    history = _history(3)
+    x = np.linspace(0, 1, 10).reshape(-1, 1)
+    write_report(history, str(tmp_path / "report.csv"), x, 2 * x + 1)
+    with open(tmp_path / "report.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["cycle"] for r in rows] == ["0", "1", "2"]
+    assert rows[2]["equation"].startswith("y = ") and "*x0 + " in rows[2]["equation"]
+    assert {"mse", "r2", "p0", "p1", "train_score"} <= set(rows[0])
+
+    write_report(history, str(tmp_path / "report.html"), title="Study <1>")
+    with open(tmp_path / "report.html") as f:
+        page = f.read()
+    assert "Study &lt;1&gt;" in page
+    assert page.count("<tr>") == 4
+
+
+def test_evicted_models_without_coefficients_have_no_fit():
+    history = ModelHistory(keep_last=1)
+    x = np.linspace(0, 1, 10).reshape(-1, 1)
+    for slope in range(3):
+        history.append(DecisionTreeRegressor().fit(x, slope * x.ravel()), cycle=2 * slope)
+    fit = metrics(history, x, x)
+    assert np.isnan(fit["mse"][:2]).all()
+    assert fit["mse"][2] > 0
+    rows = report_rows(history, x, x)
+    assert [(r["model"], r["cycle"]) for r in rows] == [(0, 0), (1, 2), (2, 4)]
+
+
+def test_held_out_conditions_drop_the_unobserved():
+    conditions = np.array([0.1, 0.2, 0.3])
+    held_out, observations = collect_held_out(lambda c: [1.0, None, 3.0], conditions)
+    np.testing.assert_array_equal(held_out, [0.1, 0.3])
+    np.testing.assert_array_equal(observations, [1.0, 3.0])
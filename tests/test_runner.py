@@ -0,0 +1,105 @@
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from researcher_hub.pipeline import PipelinedCycle
+from researcher_hub.runner import wait_for_observations
+
+
+class FakeStudy:
+    """Firestore stand-in where one participant finishes per poll and the last one never does"""
+
+    def __init__(self):
+        self.observations = {}
+        self.polls = 0
+
+    def send(self, conditions):
+        self.conditions = list(conditions)
+        self.observations = {str(i): None for i in range(len(self.conditions))}
+
+    def check(self):
+        self.polls += 1
+        if self.polls < len(self.conditions):
+            key = str(self.polls - 1)
+            self.observations[key] = 2 * self.conditions[self.polls - 1] + 1
+        if all(o is not None for o in self.observations.values()):
+            return "finished"
+        return "unavailable"
+
+    def get(self):
+        return dict(self.observations)
+
+    def runner(self, quorum, deadline=None):
+        def run(conditions):
+            self.polls = 0
+            return wait_for_observations(
+                conditions, self.send, self.check, self.get, sleep_time=0, quorum=quorum, deadline=deadline
+            )
+
+        return run
+
+
+def test_returns_after_quorum():
+    study = FakeStudy()
+    observations = study.runner(quorum=0.5)([1.0, 2.0, 3.0, 4.0])
+    assert observations == [3.0, 5.0, None, None]
+    assert study.polls == 2
+
+
+def test_returns_after_deadline():
+    study = FakeStudy()
+    observations = study.runner(quorum=1.0, deadline=0)([1.0, 2.0, 3.0])
+    assert observations == [3.0, None, None]
+
+
+def test_cycle_fits_partial_data_and_requeues_stragglers():
+    study = FakeStudy()
+    cycle = PipelinedCycle(
+        variables=None,
+        theorist=LinearRegression(),
+        experimentalist=lambda: np.array([1.0, 2.0, 3.0]),
+        experiment_runner=study.runner(quorum=2 / 3),
+    )
+    data = cycle.run(num_cycles=2)
+
+    assert [len(c) for c in data.conditions] == [2, 3]
+    # the straggler of the first cycle keeps its position in the second cycle, the new conditions fill the rest
+    assert data.conditions[1].tolist() == [1.0, 2.0, 3.0]
+    assert data.stragglers == [3.0]
+    assert data.straggler_slots == [3]
+    assert len(data.models) == 2
+    assert np.isclose(data.models[-1].coef_[0].item(), 2)
+
+
+def test_two_thirds_of_three_conditions():
+    study = FakeStudy()
+    observations = study.runner(quorum=2 / 3)([1.0, 2.0, 3.0])
+    assert observations == [3.0, 5.0, None]
+    assert study.polls == 2
+
+
+def test_late_observations_match_their_condition():
+    # observations are stored by position like on firebase: the participant of the straggler of the first cycle
+    # finishes after the conditions of the second cycle were sent
+    batches = iter([np.array([1.0, 2.0, 3.0]), np.array([4.0, 5.0, 6.0])])
+    late = {}
+
+    def experiment_runner(conditions):
+        store = {i: None for i in range(len(conditions))}
+        store.update(late)
+        for i, condition in enumerate(conditions):
+            if not late and i == 2:
+                late[i] = 2 * condition + 1
+            elif store[i] is None:
+                store[i] = 2 * condition + 1
+        return [store[i] for i in range(len(conditions))]
+
+    cycle = PipelinedCycle(
+        variables=None,
+        theorist=LinearRegression(),
+        experimentalist=lambda: next(batches),
+        experiment_runner=experiment_runner,
+    )
+    data = cycle.run(num_cycles=2)
+    x, y = data.stacked()
+    assert sorted(x.ravel().tolist()) == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    np.testing.assert_array_equal(y, 2 * x + 1)
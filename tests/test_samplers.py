@@ -0,0 +1,101 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from autora.experimentalist.grid import pool
+from autora.variable import Variable, VariableCollection
+
+from tests.conftest import TEMPLATE_DIR
+from researcher_hub.cli import load_state, main
+from researcher_hub.samplers import ConditionGrid, grid_sampler, uniform_sampler
+
+
+def _variables(*allowed_values):
+    return VariableCollection(
+        independent_variables=[Variable(name=f"x{i}", allowed_values=v) for i, v in enumerate(allowed_values)]
+    )
+
+
+def test_uniform_sampler():
+    variables = VariableCollection(independent_variables=[
+        Variable(name="x", value_range=(0, 1)), Variable(name="y", allowed_values=[4, 8, 16])])
+    conditions = uniform_sampler(variables, 100, np.random.default_rng(180))
+    assert conditions.shape == (100, 2)
+    assert conditions[:, 1].min() >= 4 and conditions[:, 1].max() <= 16
+
+
+def test_grid_matches_autora_pool():
+    variables = _variables([1, 2, 3], [10, 20], [0.5, 1.5])
+    grid = ConditionGrid(variables)
+    np.testing.assert_array_equal(grid.grid, pool(variables).values)
+    np.testing.assert_array_equal(ConditionGrid(_variables(range(4, 33))).grid, np.arange(4, 33))
+    with pytest.raises(ValueError):
+        ConditionGrid(VariableCollection(independent_variables=[Variable(name="x", value_range=(0, 1))]))
+
+
+def test_sampling_without_replacement_across_cycles():
+    grid = ConditionGrid(_variables(range(4, 33)))
+    rng = np.random.default_rng(180)
+    sampled = np.concatenate([grid.sample(3, rng) for _ in range(9)] + [grid.sample(2, rng)])
+    assert sorted(sampled) == list(range(4, 33))
+    assert grid.remaining == 0
+    with pytest.raises(ValueError):
+        grid.sample(1, rng)
+
+
+def test_index_and_mark_used():
+    grid = ConditionGrid(_variables([1, 2, 3], ["a", "b"]))
+    conditions = grid.conditions([1, 4])
+    assert conditions.tolist() == [[1, "b"], [3, "a"]]
+    np.testing.assert_array_equal(grid.index(conditions), [1, 4])
+    grid.mark_used([1, 4, 4])
+    assert grid.remaining == 4
+    assert not {1, 4} & set(grid.index(grid.sample(4, np.random.default_rng(180))))
+
+
+def test_large_space_is_not_materialized():
+    # 10^12 conditions: neither the grid nor a bitmap fits in memory
+    grid = ConditionGrid(_variables(*[np.linspace(0, 1, 1000)] * 4))
+    conditions = grid.sample(10_000, np.random.default_rng(180))
+    assert conditions.shape == (10_000, 4)
+    assert len(np.unique(grid.index(conditions))) == 10_000
+    assert grid.remaining == 10 ** 12 - 10_000
+
+
+def test_grid_sampler_is_cached_per_variable_collection():
+    variables = _variables(range(5))
+    rng = np.random.default_rng(180)
+    sampled = [c for _ in range(5) for c in grid_sampler(variables, 1, rng)]
+    assert sorted(sampled) == [0, 1, 2, 3, 4]
+    assert len(grid_sampler(_variables(range(5)), 5, rng)) == 5
+
+
+def test_resume_with_grid_sampler(tmp_path):
+    with open(os.path.join(TEMPLATE_DIR, "researcher_hub", "workflow.json")) as f:
+        config = json.load(f)
+    config["variables"]["independent_variables"] = [{"name": "x", "allowed_values": list(range(4, 13))}]
+    config["experimentalist"]["name"] = "grid"
+    with open(tmp_path / "workflow.json", "w") as f:
+        json.dump(config, f)
+
+    main(["--config", str(tmp_path / "workflow.json"), "run", "--runner", "synthetic", "--cycles", "2"])
+    main(["--config", str(tmp_path / "workflow.json"), "resume", "--runner", "synthetic", "--cycles", "1"])
+    conditions = np.concatenate(load_state(str(tmp_path / "autora_state.pkl")).conditions)
+    assert sorted(conditions.tolist()) == sorted(set(conditions.tolist()))
+
+
+def test_exhausting_a_grid_without_bitmap(monkeypatch):
+    # grids above _MAX_BITMAP keep the used conditions in a set, the last ones are chosen from the free list
+    from researcher_hub import samplers
+
+    monkeypatch.setattr(samplers, "_MAX_BITMAP", 8)
+    monkeypatch.setattr(samplers, "_FREE_CHUNK", 4)
+    grid = ConditionGrid(_variables(range(10), range(3)))
+    assert grid._bitmap is None
+    rng = np.random.default_rng(180)
+    sampled = np.concatenate([grid.sample(7, rng) for _ in range(4)] + [grid.sample(2, rng)])
+    assert sorted(grid.index(sampled)) == list(range(30))
+    assert grid.remaining == 0
+    with pytest.raises(ValueError):
+        grid.sample(1, rng)
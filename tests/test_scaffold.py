@@ -0,0 +1,85 @@
+import os
+import threading
+from concurrent.futures import Future
+
+from hooks import post_gen_project
+
+
+def _template(root):
+    for path in ["example_mains/basic.js", "example_mains/sweet_bean.js", "example_workflows/basic.py",
+                 "readmes/README_AUTORA.md", "readmes/README_FIREBASE_basic.md"]:
+        os.makedirs(os.path.dirname(root / path), exist_ok=True)
+        (root / path).write_text(path)
+    os.makedirs(root / "researcher_hub")
+
+
+def test_scaffold_places_the_manifest_and_removes_the_rest(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _template(tmp_path)
+    inode = os.stat(tmp_path / "example_workflows" / "basic.py").st_ino
+    post_gen_project.scaffold(post_gen_project.MANIFESTS["basic"])
+
+    assert (tmp_path / "testing_zone" / "src" / "design" / "main.js").read_text() == "example_mains/basic.js"
+    assert (tmp_path / "testing_zone" / "README.md").read_text() == "readmes/README_FIREBASE_basic.md"
+    assert (tmp_path / "researcher_hub" / "README.md").read_text() == "readmes/README_AUTORA.md"
+    # moved, not copied
+    assert os.stat(tmp_path / "researcher_hub" / "autora_workflow.py").st_ino == inode
+    for directory in post_gen_project.TEMPLATE_DIRS:
+        assert not os.path.exists(tmp_path / directory)
+
+
+def test_hub_files_do_not_wait_for_the_testing_zone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _template(tmp_path)
+    testing_zone = Future()
+    hub_ready = []
+
+    def create_react_app():
+        # create-react-app only finishes once the researcher hub files are in place (or after 5 s)
+        for _ in range(500):
+            if os.path.exists(tmp_path / "researcher_hub" / "README.md"):
+                break
+            threading.Event().wait(0.01)
+        hub_ready.append(os.path.exists(tmp_path / "researcher_hub" / "README.md"))
+        hub_ready.append(not os.path.exists(tmp_path / "testing_zone"))
+        os.makedirs(tmp_path / "testing_zone")
+        testing_zone.set_result("")
+
+    thread = threading.Thread(target=create_react_app)
+    thread.start()
+    post_gen_project.scaffold(post_gen_project.MANIFESTS["basic"], testing_zone)
+    thread.join()
+    assert hub_ready == [True, True]
+    assert (tmp_path / "testing_zone" / "src" / "design" / "main.js").exists()
+
+
+def test_setup_basic_runs_create_react_app_in_the_background(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _template(tmp_path)
+    requirements = tmp_path / "researcher_hub" / "requirements.txt"
+    requirements.write_text("autora-core")
+    started = threading.Event()
+
+    def create_testing_zone():
+        started.set()
+        os.makedirs("testing_zone", exist_ok=True)
+        return ""
+
+    monkeypatch.setattr(post_gen_project, "create_testing_zone", create_testing_zone)
+    post_gen_project.setup_basic(str(requirements))
+    assert started.is_set()
+    assert requirements.read_text() == "autora-core\nautora"
+    assert (tmp_path / "testing_zone" / "src" / "design" / "main.js").exists()
+
+
+def test_testing_zone_only_overlaps_with_non_interactive_runs(monkeypatch):
+    threads = []
+    monkeypatch.setattr(post_gen_project, "create_testing_zone", lambda: threads.append(threading.current_thread()))
+
+    monkeypatch.setattr(post_gen_project, "ANSWERS", None)
+    post_gen_project.start_testing_zone().result()
+    assert threads[-1] is threading.current_thread()
+
+    monkeypatch.setattr(post_gen_project, "ANSWERS", {"firebase": "yes"})
+    post_gen_project.start_testing_zone().result()
+    assert threads[-1] is not threading.current_thread()
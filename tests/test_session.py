@@ -0,0 +1,148 @@
+import time
+
+import pytest
+from google.auth.exceptions import RefreshError
+
+from researcher_hub.session import FirebaseSession, get_session
+
+
+class Snapshot:
+    def __init__(self, ref):
+        self.reference = ref
+
+    def to_dict(self):
+        return None if self.reference.data is None else dict(self.reference.data)
+
+
+class Document:
+    def __init__(self):
+        self.data = None
+        self.collections = {}
+
+    def collection(self, name):
+        return self.collections.setdefault(name, Collection())
+
+    def get(self):
+        return Snapshot(self)
+
+    def set(self, data):
+        self.data = dict(data)
+
+    def update(self, data):
+        self.data.update(data)
+
+    def delete(self):
+        self.data = None
+
+
+class Collection:
+    def __init__(self):
+        self.documents = {}
+
+    def document(self, name):
+        return self.documents.setdefault(name, Document())
+
+    def stream(self):
+        return [Snapshot(d) for d in self.documents.values() if d.data is not None]
+
+
+class Batch:
+    def __init__(self):
+        self.writes = []
+
+    def set(self, ref, data):
+        self.writes.append((ref, data))
+
+    def commit(self):
+        for ref, data in self.writes:
+            ref.set(data)
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.collections = {}
+
+    def collection(self, name):
+        return self.collections.setdefault(name, Collection())
+
+    def batch(self):
+        return Batch()
+
+
+class FakeSession(FirebaseSession):
+    def __init__(self, failures=0):
+        super().__init__({"project_id": "test"})
+        self.store = FakeFirestore()
+        self.connections = 0
+        self.failures = failures
+
+    def _connect(self):
+        self.connections += 1
+        return None, self.store
+
+    def get_observations(self, collection_name):
+        if self.failures:
+            self.failures -= 1
+            return self._call("get_observations", self._raise_refresh_error)
+        return super().get_observations(collection_name)
+
+    @staticmethod
+    def _raise_refresh_error(db):
+        raise RefreshError("token expired")
+
+
+def test_session_reuses_connection():
+    session = FakeSession()
+    session.send_conditions("autora", [0.1, 0.5, [1, 2]])
+    for _ in range(3):
+        assert session.check_firebase_status("autora", time_out=100) == "available"
+    assert session.get_observations("autora") == {"0": None, "1": None, "2": None}
+
+    assert session.connections == 1
+    metrics = session.metrics()
+    assert metrics["connect"]["calls"] == 1
+    assert metrics["check_firebase_status"]["calls"] == 3
+    assert metrics["send_conditions"]["errors"] == 0
+
+
+def test_status_frees_timed_out_slots():
+    session = FakeSession()
+    session.send_conditions("autora", [0.1, 0.5])
+    meta = session.store.collection("autora").document("autora_meta")
+    meta.update({
+        "0": {"start_time": int(time.time()) - 200, "finished": False},
+        "1": {"start_time": int(time.time()), "finished": True},
+    })
+    assert session.check_firebase_status("autora", time_out=100) == "available"
+    assert meta.data["0"]["start_time"] is None
+
+    meta.update({"0": {"start_time": int(time.time()), "finished": False}})
+    assert session.check_firebase_status("autora", time_out=100) == "unavailable"
+    meta.update({"0": {"start_time": int(time.time()), "finished": True}})
+    assert session.check_firebase_status("autora", time_out=100) == "finished"
+
+
+def test_session_reconnects_once_on_refresh_error():
+    session = FakeSession(failures=1)
+    session.send_conditions("autora", [0.1])
+    with pytest.raises(RefreshError):
+        session.get_observations("autora")
+    assert session.connections == 2
+    assert session.metrics()["get_observations"]["errors"] == 2
+
+
+def test_get_session_pools_by_credentials():
+    a = get_session({"project_id": "a", "private_key": "x"})
+    assert get_session({"private_key": "x", "project_id": "a"}) is a
+    assert get_session({"project_id": "b"}) is not a
+
+
+def test_metrics_count_calls_from_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    session = FakeSession()
+    session.send_conditions("autora", [0.1, 0.5])
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: session.get_observations("autora"), range(200)))
+    assert session.metrics()["get_observations"]["calls"] == 200
+    assert session.connections == 1
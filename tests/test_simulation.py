@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from autora.variable import Variable, VariableCollection
+
+from researcher_hub.simulation import StudyDesign, power_analysis, simulate, simulation_runner
+
+
+def exponential_learning(x):
+    return 1 - np.exp(-x[:, 0])
+
+
+def _design(**kwargs):
+    variables = VariableCollection(
+        independent_variables=[Variable(name="x", value_range=(0, 1))],
+        dependent_variables=[Variable(name="y")],
+    )
+    return StudyDesign(variables, ground_truth=exponential_learning, **kwargs)
+
+
+def test_runner_is_vectorized_and_reproducible():
+    conditions = np.linspace(0, 1, 10_000)
+    observations = simulation_runner(exponential_learning, noise=0.1, rng=np.random.default_rng(180))(conditions)
+    assert observations.shape == (10_000,)
+    np.testing.assert_allclose(np.mean(observations - exponential_learning(conditions[:, None])), 0, atol=0.01)
+    np.testing.assert_array_equal(
+        observations,
+        simulation_runner(exponential_learning, noise=0.1, rng=np.random.default_rng(180))(conditions),
+    )
+
+    # the mean of 100 trials has a tenth of the noise
+    averaged = simulation_runner(exponential_learning, noise=0.1, trials=100, rng=np.random.default_rng(180))
+    assert np.std(averaged(conditions) - exponential_learning(conditions[:, None])) == pytest.approx(0.01, rel=0.1)
+
+
+def test_runner_drops_participants():
+    run = simulation_runner(exponential_learning, dropout=0.5, rng=np.random.default_rng(180))
+    observations = run(np.linspace(0, 1, 1000))
+    assert 400 < sum(o is None for o in observations) < 600
+
+
+def test_simulation_is_reproducible_across_workers():
+    design = _design(participants=5, noise=0.1)
+    errors = simulate(design, num_cycles=3, replications=4, seed=180, workers=1)
+    assert errors.shape == (4, 3)
+    assert np.all(errors >= 0)
+    np.testing.assert_array_equal(errors, simulate(design, num_cycles=3, replications=4, seed=180, workers=2))
+
+
+def test_power_grows_with_participants():
+    rows = power_analysis(
+        _design(noise=0.3), participants=[3, 50], num_cycles=2, replications=20, tolerance=0.01, seed=180,
+        workers=1,
+    )
+    assert [(r["participants"], r["cycle"]) for r in rows] == [(3, 0), (3, 1), (50, 0), (50, 1)]
+    assert rows[-1]["power"] > rows[1]["power"]
+    assert rows[-1]["median_error"] < rows[1]["median_error"]
+
+
+def test_design_takes_the_variables_of_the_experiment():
+    from researcher_hub.plugins import load
+
+    with pytest.raises(ValueError, match="2 independent variables"):
+        StudyDesign(_design().variables, ground_truth="exp_learning")
+    design = StudyDesign(load("synthetic_experiment", "exp_learning")().variables, ground_truth="exp_learning")
+    errors = simulate(design, num_cycles=2, replications=1, seed=180, workers=1)
+    assert errors.shape == (1, 2) and np.isfinite(errors).all()
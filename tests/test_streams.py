@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from researcher_hub.pipeline import CycleData, PipelinedCycle
+from researcher_hub.streams import RNGStreams
+
+
+def test_streams_are_reproducible_and_independent():
+    streams = RNGStreams(seed=180)
+    a = streams.generator("experimentalist", cycle=3).uniform(size=5)
+    np.testing.assert_array_equal(a, RNGStreams(seed=180).generator("experimentalist", cycle=3).uniform(size=5))
+
+    others = [
+        streams.generator("experimentalist", cycle=4),
+        streams.generator("experimentalist", cycle=3, participant=1),
+        streams.generator("finalize", cycle=3),
+        RNGStreams(seed=180, study="other").generator("experimentalist", cycle=3),
+        RNGStreams(seed=181).generator("experimentalist", cycle=3),
+    ]
+    for rng in others:
+        assert not np.array_equal(a, rng.uniform(size=5))
+
+
+def test_parallel_sampling_matches_sequential():
+    streams = RNGStreams(seed=180)
+    sequential = [rng.uniform(size=1000) for rng in streams.generators("runner", cycle=2, participants=8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        parallel = list(executor.map(lambda p: streams.generator("runner", 2, p).uniform(size=1000), range(8)))
+    np.testing.assert_array_equal(sequential, parallel)
+
+
+def test_seed_is_kept():
+    streams = RNGStreams()
+    assert isinstance(streams.seed, int)
+    np.testing.assert_array_equal(
+        streams.generator("experimentalist").uniform(size=3),
+        RNGStreams(streams.seed).generator("experimentalist").uniform(size=3),
+    )
+
+
+def _cycle(data, seed=180):
+    return PipelinedCycle(
+        variables=None,
+        theorist=LinearRegression(),
+        experimentalist=lambda rng: rng.uniform(low=0, high=1, size=3),
+        experiment_runner=lambda conditions: 2 * conditions + 1,
+        data=data,
+        streams=RNGStreams(seed),
+    )
+
+
+def test_resumed_study_samples_the_same_conditions():
+    uninterrupted = _cycle(CycleData()).run(num_cycles=4)
+
+    data = _cycle(CycleData()).run(num_cycles=2)
+    assert data.seed == 180
+    resumed = _cycle(data).run(num_cycles=2)
+
+    for a, b in zip(uninterrupted.conditions, resumed.conditions):
+        np.testing.assert_array_equal(a, b)
+
+    with pytest.raises(ValueError, match="seed 180"):
+        _cycle(resumed, seed=181)
@@ -0,0 +1,60 @@
+import json
+import urllib.request
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from researcher_hub.pipeline import PipelinedCycle
+from researcher_hub.telemetry import TelemetryMonitor
+
+
+def _run(monitor, num_cycles=3):
+    rng = np.random.default_rng(seed=180)
+
+    def experiment_runner(conditions):
+        # the last participant of every cycle times out
+        return [2 * c + 1 for c in conditions[:-1]] + [None]
+
+    cycle = PipelinedCycle(
+        variables=None,
+        theorist=LinearRegression(),
+        experimentalist=lambda: rng.uniform(low=0, high=1, size=3),
+        experiment_runner=experiment_runner,
+        monitor=monitor,
+    )
+    return cycle.run(num_cycles=num_cycles)
+
+
+def test_records_every_cycle(tmp_path, capsys):
+    path = tmp_path / "telemetry.jsonl"
+    _run(TelemetryMonitor(str(path)))
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["cycle"] for r in records] == [0, 1, 2]
+    # the timed out condition is re-queued, so every cycle after the first issues one more condition
+    assert [r["conditions_issued"] for r in records] == [3, 4, 4]
+    assert [r["observations_received"] for r in records] == [2, 3, 3]
+    assert [r["participant_timeouts"] for r in records] == [1, 1, 1]
+    assert set(records[0]["durations"]) == {"experimentalist", "waiting", "finalize", "runner", "theorist"}
+    assert records[-1]["model_score"] == 1.0
+    assert records[-1]["memory_bytes"] > 0
+    assert "Generated 3 models" in capsys.readouterr().out
+
+
+def test_openmetrics_endpoint():
+    with TelemetryMonitor(path=None, port=0, verbose=False) as telemetry:
+        _run(telemetry)
+        host, port = telemetry.address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+            body = response.read().decode()
+
+    lines = body.splitlines()
+    assert lines[-1] == "# EOF"
+    samples = dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+    assert samples["autora_cycles_total"] == "3"
+    assert samples["autora_conditions_issued_total"] == "11"
+    assert samples["autora_participant_timeouts_total"] == "3"
+    assert float(samples['autora_stage_seconds_total{stage="runner"}']) >= 0
+    assert float(samples["autora_model_score"]) == 1.0
+    assert telemetry.address is None
@@ -0,0 +1,106 @@
+import os
+import sys
+
+import pytest
+
+from hooks import post_gen_project
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses shell scripts as fake tools")
+
+FAKE_NPM = """#!/bin/sh
+echo "npm $@" >> "$LOG"
+if [ "$1" = "install" ]; then
+    mkdir -p "$3/node_modules/.bin"
+    printf '#!/bin/sh\\necho "firebase $@" >> "$LOG"\\necho 13.0.0\\n' > "$3/node_modules/.bin/firebase"
+    chmod +x "$3/node_modules/.bin/firebase"
+fi
+echo 10.0.0
+"""
+
+
+def _tool(bin_dir, name, script=None):
+    path = bin_dir / name
+    path.write_text(script or f'#!/bin/sh\necho "{name} $@" >> "$LOG"\necho 1.0.0\n')
+    path.chmod(0o755)
+
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name in ["node", "npx"]:
+        _tool(bin_dir, name)
+    _tool(bin_dir, "npm", FAKE_NPM)
+    log = tmp_path / "log"
+    log.write_text("")
+    monkeypatch.setenv("LOG", str(log))
+    # the fake tools come first, the system directories only provide mkdir and chmod
+    monkeypatch.setenv("PATH", os.pathsep.join([str(bin_dir), "/bin", "/usr/bin"]))
+    monkeypatch.setattr(post_gen_project, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(post_gen_project, "_toolchain", None)
+    return bin_dir, log
+
+
+def _calls(log):
+    return log.read_text().splitlines()
+
+
+def test_toolchain_is_probed_once_and_cached(tools, monkeypatch):
+    bin_dir, log = tools
+    _tool(bin_dir, "firebase")
+    first = post_gen_project.toolchain()
+    assert first["npm"] == {"path": str(bin_dir / "npm"), "version": "10.0.0"}
+    assert len(_calls(log)) == 4
+
+    # a new generation reads the cache file instead of running the tools again
+    monkeypatch.setattr(post_gen_project, "_toolchain", None)
+    assert post_gen_project.toolchain() == first
+    assert len(_calls(log)) == 4
+
+    monkeypatch.setattr(post_gen_project, "_toolchain", None)
+    monkeypatch.setattr(post_gen_project, "TOOLCHAIN_TTL", 0)
+    post_gen_project.toolchain()
+    assert len(_calls(log)) == 8
+
+
+def test_missing_tools_are_looked_up_again(tools, monkeypatch):
+    bin_dir, log = tools
+    assert post_gen_project.toolchain()["firebase"] is None
+    assert len(_calls(log)) == 3
+    _tool(bin_dir, "firebase")
+    monkeypatch.setattr(post_gen_project, "_toolchain", None)
+    assert post_gen_project.toolchain()["firebase"]["path"] == str(bin_dir / "firebase")
+    # the tools that were found are taken from the cache
+    assert _calls(log)[3:] == ["firebase --version"]
+
+
+def test_firebase_tools_are_installed_into_the_cache(tools, monkeypatch):
+    bin_dir, log = tools
+    path, _ = post_gen_project.ensure_firebase_tools()
+    assert path == post_gen_project.local_firebase_tools()
+    assert path.startswith(post_gen_project.CACHE_DIR)
+    install = [c for c in _calls(log) if c.startswith("npm install")]
+    assert install == [f"npm install --prefix {os.path.dirname(os.path.dirname(os.path.dirname(path)))} "
+                       f"firebase-tools@{post_gen_project.FIREBASE_TOOLS_VERSION}"]
+
+    # the next generation finds the shared install, even with a global firebase on the PATH
+    _tool(bin_dir, "firebase")
+    monkeypatch.setattr(post_gen_project, "_toolchain", None)
+    assert post_gen_project.ensure_firebase_tools()[0] == path
+    assert len([c for c in _calls(log) if c.startswith("npm install")]) == 1
+
+
+def test_the_installed_firebase_tools_are_reported(tools, capsys):
+    path, _ = post_gen_project.ensure_firebase_tools()
+    capsys.readouterr()
+    post_gen_project.report_firebase_tools()
+    out = capsys.readouterr().out
+    assert path in out
+    assert "npx firebase" in out
+
+
+def test_create_react_app_does_not_prompt(tools, tmp_path, monkeypatch):
+    bin_dir, log = tools
+    monkeypatch.chdir(tmp_path)
+    post_gen_project.create_testing_zone()
+    assert "npx --yes create-react-app testing_zone --template autora-firebase" in _calls(log)
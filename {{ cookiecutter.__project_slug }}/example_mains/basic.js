@@ -4,9 +4,11 @@
 // Here is documentation on how to program a jspsych experiment using npm:
 // https://www.jspsych.org/7.3/tutorials/hello-world/#option-3-using-npm
 
+// The rdk plugin is imported with import(), so it is not part of the page the participant loads first (webpack
+// puts it into its own file) and keeps downloading while the instructions are shown.
+
 import {initJsPsych} from 'jspsych';
 import 'jspsych/css/jspsych.css'
-import jsPsychRdk from '@jspsych-contrib/plugin-rdk';
 import htmlKeyboardResponse from '@jspsych/plugin-html-keyboard-response';
 
 /**
@@ -17,6 +19,7 @@ import htmlKeyboardResponse from '@jspsych/plugin-html-keyboard-response';
  * @returns {Promise<*>} the accuracy in the post-trainging phase relative to the pre-training phase
  */
 const main = async (id, condition) => {
+    const rdk = import('@jspsych-contrib/plugin-rdk')
     const jsPsych = initJsPsych()
 
     // constants
@@ -34,7 +37,7 @@ const main = async (id, condition) => {
 
 
     // For convenience, we first define a function that returns a trial (as sequence of fixation, soa, stimulus and feedback)
-    const trial = (direction, coherence) => {
+    const trial = (jsPsychRdk, direction, coherence) => {
         const stimulus_timeline = []
         // FIXATION
         stimulus_timeline.push(
@@ -124,15 +127,35 @@ const main = async (id, condition) => {
     )
 
 
-// Here we use the condition as coherence
-    let trials = []
-    for (let i = 0; i < NUMBER_OF_TRIALS; i++) {
-        trials = trials.concat(trial(rand_direction(), condition));
+// Here we use the condition as coherence. The trials are made once the rdk plugin is loaded and added to the end of
+// the timeline when the participant gets to them, a loading screen is only shown if the plugin isn't there yet.
+    let trials = null
+    rdk.then(({default: jsPsychRdk}) => {
+        trials = []
+        for (let i = 0; i < NUMBER_OF_TRIALS; i++) {
+            trials = trials.concat(trial(jsPsychRdk, rand_direction(), condition));
+        }
+    }).catch(() => trials = [{
+        type: htmlKeyboardResponse,
+        stimulus: 'The experiment could not be loaded, please reload the page',
+        choices: "NO_KEYS"
+    }])
+    const waiting = () => {
+        if (trials === null) {
+            return true
+        }
+        jsPsych.addNodeToEndOfTimeline({timeline: trials})
+        return false
+    }
+    const loading = {
+        timeline: [{type: htmlKeyboardResponse, stimulus: 'Loading...', choices: "NO_KEYS", trial_duration: 100}],
+        conditional_function: waiting,
+        loop_function: waiting,
     }
 
 
 // this is the timeline: instructions, pretraining, pause, training, pause, posstraining
-    const timeline = [...instructions, ...trials]
+    const timeline = [...instructions, loading]
 
 // run the experiment and wait it to finish
     await jsPsych.run(timeline)
@@ -1,8 +1,12 @@
 import { initJsPsych } from 'jspsych';
-import htmlKeyboardResponse from '@jspsych/plugin-html-keyboard-response';
 
 global.initJsPsych = initJsPsych;
-global.jsPsychHtmlKeyboardResponse = htmlKeyboardResponse
+
+// The plugins the SweetBean experiments can use. Only the ones that appear in the experiment of the condition are
+// downloaded (each import() is its own file), add the plugins of the stimuli you use in your SweetBean experiments
+const plugins = {
+    jsPsychHtmlKeyboardResponse: () => import('@jspsych/plugin-html-keyboard-response'),
+}
 
 /**
  * This is the main function where you program your experiment. For example, you can install jsPsych via node and
@@ -12,6 +16,11 @@ global.jsPsychHtmlKeyboardResponse = htmlKeyboardResponse
  * @returns {Promise<*>} after running the experiment for the subject return the observation in this function, it will be uploaded to autora
  */
 const main = async (id, condition) => {
+    // the experiment of the condition uses the plugins as globals
+    const used = Object.keys(plugins).filter(name => condition.includes(name))
+    const modules = await Promise.all(used.map(name => plugins[name]()))
+    used.forEach((name, i) => global[name] = modules[i].default)
+
     const observation = await eval(condition + "\nrunExperiment();");
     // Here we get the average reaction time
     const rt_array = observation.select('rt')['values']
@@ -24,4 +33,4 @@ const main = async (id, condition) => {
 }
 
 
-export default main
\ No newline at end of file
+export default main
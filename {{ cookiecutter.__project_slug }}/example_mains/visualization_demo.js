@@ -4,22 +4,40 @@
 // Here is documentation on how to program a jspsych experiment using npm:
 // https://www.jspsych.org/7.3/tutorials/hello-world/#option-3-using-npm
 
+// The rok plugin is imported with import(), so it is not part of the page the participant loads first (webpack
+// puts it into its own file) and keeps downloading while the instructions are shown.
+
 import {initJsPsych} from 'jspsych';
 import 'jspsych/css/jspsych.css'
-import jsPsychRok from '@jspsych-contrib/plugin-rok';
 import htmlKeyboardResponse from '@jspsych/plugin-html-keyboard-response';
 
+// keep only the trials and fields the researcher hub needs, everything else jsPsych recorded isn't uploaded
+// (the condition is {blocks: [...], projection: {fields: [...], where: {...}}}, a plain list of blocks uploads all
+// the data, see researcher_hub/projection.py)
+const project = (data, projection) => {
+    const trials = projection.where ? data.filter(projection.where).values() : data.values()
+    return {
+        fields: projection.fields,
+        rows: trials.map(trial => projection.fields.map(field => trial[field] ?? null)),
+    }
+}
+
 /**
  * This is the main function where you program your experiment. Install jsPsych via node and
  * use functions from there
  * @param id this is a number between 0 and number of participants. You can use it for example to counterbalance between subjects
  * @param condition this is a condition (4-32. Here we want to find out how the training length impacts the accuracy in a testing phase)
- * @returns {Promise<*>} the accuracy in the post-trainging phase relative to the pre-training phase
+ * @returns {Promise<*>} the trials and fields the researcher hub asked for (see researcher_hub/projection.py)
  */
 const main = async (id, condition) => {
+    const rok = import('@jspsych-contrib/plugin-rok')
     const jsPsych = initJsPsych()
     condition = JSON.parse(condition)
     console.log(condition)
+    const projection = Array.isArray(condition) ? null : condition.projection
+    if (projection) {
+        condition = condition.blocks
+    }
 
     // constants
     const FIXATION_DURATION = 300
@@ -33,7 +51,7 @@ const main = async (id, condition) => {
         180: 'f',
     }
 
-    const block = (sequence) => {
+    const block = (jsPsychRok, sequence) => {
         return {
             timeline: [
                 {
@@ -110,25 +128,51 @@ const main = async (id, condition) => {
         }
     )
 
-    for (let i=0; i < condition.length; i++) {
-
-        trials.push(block(condition[i]))
-
-        if (i < condition.length-1) {
-            trials.push(
-                {
-                    type: htmlKeyboardResponse,
-                    stimulus: 'You can have a small break.<br>The next block will start when you press >> Space << to continue',
-                    choices: [' ']
-                }
-            )
+    // the blocks are made once the rok plugin is loaded and added to the end of the timeline when the participant
+    // gets to them, a loading screen is only shown if the plugin isn't there yet
+    let blocks = null
+    rok.then(({default: jsPsychRok}) => {
+        blocks = []
+        for (let i = 0; i < condition.length; i++) {
+
+            blocks.push(block(jsPsychRok, condition[i]))
+
+            if (i < condition.length - 1) {
+                blocks.push(
+                    {
+                        type: htmlKeyboardResponse,
+                        stimulus: 'You can have a small break.<br>The next block will start when you press >> Space << to continue',
+                        choices: [' ']
+                    }
+                )
+            }
         }
+    }).catch(() => blocks = [{
+        type: htmlKeyboardResponse,
+        stimulus: 'The experiment could not be loaded, please reload the page',
+        choices: "NO_KEYS"
+    }])
+    const waiting = () => {
+        if (blocks === null) {
+            return true
+        }
+        jsPsych.addNodeToEndOfTimeline({timeline: blocks})
+        return false
+    }
+    const loading = {
+        timeline: [{type: htmlKeyboardResponse, stimulus: 'Loading...', choices: "NO_KEYS", trial_duration: 100}],
+        conditional_function: waiting,
+        loop_function: waiting,
     }
+    trials.push(loading)
 
     // run the experiment and wait it to finish
     await jsPsych.run(trials)
 
-    // return difference between before and after training as observation
+    // return the data of the rok trials as observation
+    if (projection) {
+        return JSON.stringify(project(jsPsych.data.get(), projection))
+    }
     return JSON.stringify(jsPsych.data.get())
 }
 
@@ -7,11 +7,16 @@ Basic Workflow
 """
 
 from autora.variable import VariableCollection, Variable
-from autora.experiment_runner.firebase_prolific import firebase_runner
 from autora.experimentalist.pipeline import make_pipeline
-import numpy as np
 from sklearn.linear_model import LinearRegression
-from autora.workflow.cycle import Cycle
+from researcher_hub.acquisition import acquisition_finalize
+from researcher_hub.history import ModelHistory
+from researcher_hub.pipeline import CycleData, PipelinedCycle
+from researcher_hub.report import collect_held_out, write_report
+from researcher_hub.runner import firebase_partial_runner
+from researcher_hub.samplers import ConditionGrid
+from researcher_hub.streams import RNGStreams
+from researcher_hub.telemetry import TelemetryMonitor
 
 # *** Set up variables *** #
 # independent variable is coherence (0 - 1)
@@ -27,14 +32,22 @@ metadata = VariableCollection(
 theorist = LinearRegression()
 
 # *** Set up the experimentalist *** #
-# Also feel free to set up a more elaborate experimentalist here. This is just a random sampler that samples between 4 and 32 training size
-uniform_random_rng = np.random.default_rng(seed=180)
+# Also feel free to set up a more elaborate experimentalist here. Every training size allowed for x (4 to 32) is a
+# candidate, the acquisition below chooses 3 of them per cycle
+condition_grid = ConditionGrid(metadata)
+# every cycle chooses with its own random stream (see researcher_hub/streams.py), so reruns and resumed studies get
+# the same conditions
+streams = RNGStreams(seed=180)
 
-def uniform_random_sampler():
-    return uniform_random_rng.integers(low=4, high=33, size=3)
 
+def training_sizes():
+    return condition_grid.grid
 
-experimentalist = make_pipeline([uniform_random_sampler])
+
+experimentalist = make_pipeline([training_sizes])
+# Once the theorist is updated, choose the candidates the latest models disagree on the most, preferring
+# candidates far from the conditions that were already observed
+finalize = acquisition_finalize(num_samples=3, acquisition={"disagreement": 1, "novelty": 1}, streams=streams)
 
 # *** Set up the runner *** #
 # Here fill in your own credentials
@@ -55,30 +68,46 @@ firebase_credentials = {
 }
 
 # simple experiment runner that runs the experiment on firebase
-experiment_runner = firebase_runner(
+# it returns once 2 of the 3 conditions are observed or after 10 minutes, so a single slow participant doesn't
+# stall the cycle. The theorist is fitted on what was observed and the rest is re-queued into the next cycle
+experiment_runner = firebase_partial_runner(
     firebase_credentials=firebase_credentials,
     time_out=100,
-    sleep_time=5)
+    sleep_time=5,
+    quorum=2 / 3,
+    deadline=600)
 
 # *** Set up the cycle *** #
-cycle = Cycle(
+# The experimentalist of the next cycle is prepared while the participants work on the current one
+cycle = PipelinedCycle(
     variables=metadata,
     theorist=theorist,
     experimentalist=experimentalist,
     experiment_runner=experiment_runner,
-    monitor=lambda state: print(f"Generated {len(state.models)} models"))
-
-# run the cycle (we will be running 3 cycles with 3 conditions each)
-cycle.run(num_cycles=3)
-
-
-# *** Report the data *** #
-# If you changed the theorist, also change this part
-def report_linear_fit(m: LinearRegression, precision=4):
-    s = f"y = {np.round(m.coef_[0].item(), precision)} x " \
-        f"+ {np.round(m.intercept_.item(), 4)}"
-    return s
-
-
-print(report_linear_fit(cycle.data.models[0]))
-print(report_linear_fit(cycle.data.models[-1]))
\ No newline at end of file
+    finalize=finalize,
+    # only the last 10 models are kept in memory, older ones are moved to model_history/ (summaries stay)
+    data=CycleData(models=ModelHistory(keep_last=10, spill_dir="model_history")),
+    # appends the time per stage, observations, timeouts, score and memory of every cycle to telemetry.jsonl
+    # (pass port=9100 to scrape them from http://127.0.0.1:9100/metrics while the study is running)
+    monitor=TelemetryMonitor("telemetry.jsonl"))
+
+# the study only runs when this script is started, so its stages can be imported (e.g. by the benchmarks)
+if __name__ == "__main__":
+    # run the cycle (we will be running 3 cycles with 3 conditions each)
+    cycle.run(num_cycles=3)
+
+    # *** Report the data *** #
+    # parameters and training score of the model of every cycle. Set collect_held_out_data to True to also send
+    # a few new conditions after the last cycle (one more round for the participants) and report how well every
+    # model predicts them, the data of the cycles can't show that (every model was fitted on it)
+    collect_held_out_data = False
+    if collect_held_out_data:
+        # the acquisition chooses from the whole grid, so the observed conditions are marked as used first
+        condition_grid.mark_used(condition_grid.index(cycle.data.stacked()[0]))
+        held_out_conditions = condition_grid.sample(5, streams.generator("held_out"))
+        conditions, observations = collect_held_out(experiment_runner, held_out_conditions)
+        write_report(cycle.data.models, "report.html", conditions, observations)
+    else:
+        write_report(cycle.data.models, "report.html")
+    print(cycle.data.models.summaries[0]["equation"])
+    print(cycle.data.models.summaries[-1]["equation"])
@@ -18,21 +18,19 @@ import itertools
 import random
 import threading
 
-from sweetpea import Factor, CrossBlock, synthesize_trials, MinimumTrials
-import sweetpea
 import numpy as np
 import time
-import tkinter as tk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-from PIL import Image
-
-from autora.experimentalist.sampler import dissimilarity
-from autora.theorist.bms import BMSRegressor
-from autora.experiment_runner.experimentation_manager.firebase import send_conditions, check_firebase_status, \
-    get_observations
+
 from autora.variable import Variable, VariableCollection
+from researcher_hub.pipeline import SpeculativeStage
+from researcher_hub.plugins import load
+from researcher_hub.prediction_grid import PredictionGrid
+from researcher_hub.projection import Projection
+from researcher_hub.streams import RNGStreams
+
+# The heavy dependencies (sweetpea, the dissimilarity sampler, BMS, firebase and the plotting libraries) are loaded
+# when their stage first runs, so the window opens right away. To see what each of them costs:
+#   python -m researcher_hub.importtime
 
 # Samples before the dissimilarity sampler
 RANDOM_SAMPLES = 50
@@ -41,6 +39,9 @@ BLOCKS = 3
 PARTICIPANTS_PER_CYCLE = 4
 CYCLES = 5
 
+# the data the analysis needs: main.js only uploads these fields of the rok trials instead of everything jsPsych records
+PROJECTION = Projection(["coherence_movement", "correct"], where={"trial_type": "rok"})
+
 # Credentials for firebase
 # (https://console.firebase.google.com/)
 #   -> project -> project settings -> service accounts -> generate new private key
@@ -50,10 +51,15 @@ FIREBASE_CREDENTIALS = {
 
 # define variables
 variables = VariableCollection(
-    independent_variables=[Variable(name="coherence", allowed_values=range(1))],
-    dependent_variables=[Variable(name="accuracy", value_range=range(1))])
+    independent_variables=[Variable(name="coherence", value_range=(0, 1))],
+    dependent_variables=[Variable(name="accuracy", value_range=(0, 1))])
+
+# the theorist's curve is evaluated once per model on a dense grid over the coherences (instead of on the
+# unsorted observed conditions every time it is drawn)
+prediction_grid = PredictionGrid(variables)
 
-uniform_random_rng = np.random.default_rng(seed=180)
+# every cycle samples from its own random stream, so the candidates don't depend on the background thread
+streams = RNGStreams(seed=180)
 
 
 
@@ -103,39 +109,41 @@ def plot(x_points=None, y_points=None, vertical_lines=None, x_graph=None, y_grap
 # ** Sampling the coherences ** #
 
 # get n samples of an 3-tuple
-def run_random_sampler(n):
-    return uniform_random_rng.uniform(low=0, high=1, size=(n, BLOCKS))
+def run_random_sampler(n, rng):
+    return rng.uniform(low=0, high=1, size=(n, BLOCKS))
 
 
 # sample the n most dissimilar 3-tuples in reference to X_ref
 def run_dissimilarity(X, X_ref, n):
-    return dissimilarity.summed_dissimilarity_sampler(X, X_ref, n)
+    summed_dissimilarity_sampler = load("experimentalist", "dissimilarity")
+    return summed_dissimilarity_sampler(X, X_ref, n)
 
 
-# get the CONDITION_PER_PARTICIPANT coherences for a cycle
-def get_coherences(X_ref=None):
-    # on the first cycle return PARTICIPANTS_PER_CYCLE random 3-tuples
+# get the CONDITION_PER_PARTICIPANT coherences for a cycle out of the RANDOM_SAMPLES candidates X_
+def get_coherences(X_, X_ref=None):
+    # on the first cycle return a random 3-tuple
     if X_ref is None or X_ref == []:
-        return run_random_sampler(1)
-    # after the first cycle return the PARTICIPANTS_PER_CYCLE most dissimilar samples out of RANDOM_SAMPLES
-    X_ = run_random_sampler(RANDOM_SAMPLES)
+        return X_[:1]
+    # after the first cycle return the most dissimilar sample out of RANDOM_SAMPLES
     return run_dissimilarity(X_, X_ref, 1)
 
 
 # ** Creating the trial sequencs ** #
 
-# given the coherences, get a list of three trial sequences in sweetPea (https://sites.google.com/view/sweetpea-ai) for each participant
-def get_trial_sequences(coherences):
+# get a list of three trial sequences in sweetPea (https://sites.google.com/view/sweetpea-ai) for each participant
+# (the sequences don't depend on the coherences, so they can be synthesized before the coherences are chosen)
+def synthesize_trial_sequences():
+    sweetpea = load("experimentalist", "sweetpea")
     n = BLOCKS * PARTICIPANTS_PER_CYCLE
 
     # SweetPea: Generate n sequences that are counterbalanced for the movement and orientation
-    direction_mov = Factor('dir_mov', [0, 180])
-    direction_or = Factor('dir_or', [0, 180])
+    direction_mov = sweetpea.Factor('dir_mov', [0, 180])
+    direction_or = sweetpea.Factor('dir_or', [0, 180])
     design = [direction_mov, direction_or]
     crossing = [direction_mov, direction_or]
-    constraints = [MinimumTrials(8)]
-    block = CrossBlock(design, crossing, constraints)
-    _trial_sequences = synthesize_trials(block, n)
+    constraints = [sweetpea.MinimumTrials(8)]
+    block = sweetpea.CrossBlock(design, crossing, constraints)
+    _trial_sequences = sweetpea.synthesize_trials(block, n)
 
     # SweetPea formats the trial_sequences in a way that is inconvenient for jsPsych to read, therefore we reformat:
     # Example:
@@ -146,10 +154,11 @@ def get_trial_sequences(coherences):
     _trial_sequences = [reformat(s) for s in _trial_sequences]
 
     # Here we split the list of trial sequences into blocks for each participant
-    trial_sequences = [_trial_sequences[i:i + BLOCKS] for i in
-                       range(0, len(_trial_sequences), BLOCKS)]
+    return [_trial_sequences[i:i + BLOCKS] for i in range(0, len(_trial_sequences), BLOCKS)]
 
-    # For each trial sequence we want to append the coherence of each block to each trial of that block
+
+# given the coherences, append the coherence of each block to each trial of that block
+def get_trial_sequences(coherences, trial_sequences):
     for participant_list in trial_sequences:
         for i, sequence in enumerate(participant_list):
             for item in sequence:
@@ -160,35 +169,39 @@ def get_trial_sequences(coherences):
 
 
 
+# ** Preparing the next cycle ** #
+
+# everything the experimentalist can do before the theorist is finished: sample the candidate coherences and
+# synthesize the trial sequences (this runs in the background while the participants are working on the current cycle)
+def prepare_cycle(cycle):
+    rng = streams.generator("experimentalist", cycle)
+    return run_random_sampler(RANDOM_SAMPLES, rng), synthesize_trial_sequences()
+
+
+
 # *** PROCESS DATA *** #
 
 # process the raw trial data
 def get_accuracy_from_observations(observations, conditions):
-    accuracies = []
-    # parse the string into an object
-    trials = json.loads(observations)['trials']
+    # only the projected fields of the rok trials are parsed (not instruction, fixation, feedback ...)
+    trials = PROJECTION.parse(observations)
+    coherence_movement = trials["coherence_movement"].astype(float)
+    correct = trials["correct"].astype(bool)
 
+    accuracies = []
     # for each condition calculate the accuracy
     for coherence in conditions:
-        # filter the trials for the rok trials (not instruction, fixation, feedback ...
-        rok_trials = [trial for trial in trials if trial['trial_type'] == 'rok']
         # filter the trials for the ones with the correct coherence (ATTENTION: Here we give a margin since
         # to account for precision loss due to conversions between different data types
-        trials_coherence = [trial for trial in rok_trials if (
-                (trial['coherence_movement'] < coherence * 100 + .1) and (
-                trial['coherence_movement'] > coherence * 100 - .1))]
-        # filter the correct trials
-        rok_trials_correct = [trial for trial in trials_coherence if trial['correct']]
+        trials_coherence = np.abs(coherence_movement - coherence * 100) < .1
         # accuracy is the ratio of correct trials to all trials
-        if len(trials_coherence) > 0:
-            acc = len(rok_trials_correct) / len(trials_coherence)
+        if trials_coherence.any():
+            acc = correct[trials_coherence].mean()
         else:
             # Errorhandling
             print(f'Warning: Something went wrong')
             print('coherence:', coherence)
-            print('rok_trials:', rok_trials)
-            print('trials_coherence:', trials_coherence)
-            print('rok_trials_correct:', rok_trials_correct)
+            print('coherence_movement:', coherence_movement)
             acc = 0
         accuracies.append(acc)
     return accuracies
@@ -197,12 +210,18 @@ def get_accuracy_from_observations(observations, conditions):
 # Your plot function goes here...
 
 def main():
+    import tkinter as tk
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+    from PIL import Image
+
     ## Set up for the experiment
     # All conditions
     conditions_all = []
     observations_all = []
     conditions_flat = None
     observations_flat = None
+    coherences_pred = None
     observations_pred = None
 
     # *** Plotting *** #
@@ -249,22 +268,30 @@ def main():
 
     def experiment():
         # run the experiment (this is done in a different thread to allow for the visualisation to be synchronized
-        nonlocal conditions_all, observations_all, conditions_flat, observations_flat, observations_pred
+        nonlocal conditions_all, observations_all, conditions_flat, observations_flat, coherences_pred, \
+            observations_pred
+        # one firebase connection for the whole experiment (instead of connecting on every poll)
+        firebase = load("experimentation_manager", "firebase")(FIREBASE_CREDENTIALS)
+        # the experimentalist prepares the next cycle while the participants are working on the current one
+        next_cycle = SpeculativeStage(prepare_cycle)
         for c in range(CYCLES):
             print(f'starting cycle {c}')
             # get the coherence list:
             print('experimentalist working...')
-            conditions = get_coherences(conditions_all)
+            candidates, sequences = next_cycle.result(c)
+            if c + 1 < CYCLES:
+                next_cycle.start(c + 1)
+            conditions = get_coherences(candidates, conditions_all)
 
             # get the trial sequences:
-            trial_sequences = get_trial_sequences(conditions[0])
+            trial_sequences = get_trial_sequences(conditions[0], sequences)
 
             # plot the experimentalist
             for i in range(len(conditions[0])):
                 time.sleep(random.random() * 2)
                 plot(
                     x_points=conditions_flat, y_points=observations_flat,
-                    x_graph=conditions_flat, y_graph=observations_pred,
+                    x_graph=coherences_pred, y_graph=observations_pred,
                     vertical_lines=conditions[0][:i + 1],
                     ax=experimentalist_ax, title='Experimentalist',
                     status_ax=status_ax, status_msg='Experimentalist working')
@@ -278,8 +305,9 @@ def main():
 
             canvas.draw()
 
-            # upload the trial sequences to firebase
-            send_conditions('autora', trial_sequences, FIREBASE_CREDENTIALS)
+            # upload the trial sequences to firebase (together with the fields main.js should send back)
+            firebase.send_conditions('autora', [json.dumps({'blocks': blocks, 'projection': PROJECTION.to_dict()})
+                                                for blocks in trial_sequences])
 
             observations = None
             # get all observations/run the online experiment
@@ -288,11 +316,11 @@ def main():
                 # Check if all the conditions are observed.
                 # Set a time out of 100s for participants that started the condition
                 #             but didn't finish (after this time spots are freed)
-                check_firebase = check_firebase_status("autora", FIREBASE_CREDENTIALS, 100)
+                check_firebase = firebase.check_firebase_status("autora", 100)
                 # if the observations are finished, get them as a list of strings
                 if check_firebase == "finished":
-                    _observation = get_observations("autora", FIREBASE_CREDENTIALS)
-                    observations = [_observation[key] for key in sorted(_observation.keys())]
+                    _observation = firebase.get_observations("autora")
+                    observations = [_observation[key] for key in sorted(_observation.keys(), key=int)]
 
             # plot the theorist
             print('theorist working...')
@@ -316,14 +344,16 @@ def main():
             observations_flat = np.array([np.array([x]) for x in _observations_flat])
 
             # data analysis with BMS theorist
+            BMSRegressor = load("theorist", "bms")
             theorist = BMSRegressor(epochs=500)
             theorist.fit(conditions_flat, observations_flat)
-            observations_pred = theorist.predict(conditions_flat)
+            prediction_grid.update(theorist, version=c)
+            coherences_pred, observations_pred = prediction_grid.points, prediction_grid.mean
 
             # plot the result in the theorist
             plot(
                 x_points=conditions_flat, y_points=observations_flat,
-                x_graph=conditions_flat, y_graph=observations_pred,
+                x_graph=coherences_pred, y_graph=observations_pred,
                 vertical_lines=None,
                 ax=theorist_ax, title='Theorist',
                 status_ax=status_ax, status_msg='',
@@ -331,6 +361,9 @@ def main():
 
             canvas.draw()
 
+        next_cycle.shutdown()
+        firebase.close()
+
     # Run your experiment in a separate thread
     threading.Thread(target=experiment).start()
 
@@ -0,0 +1,4 @@
+"""
+Researcher Hub
+    Helpers for running closed-loop AutoRA workflows from the researcher's side
+"""
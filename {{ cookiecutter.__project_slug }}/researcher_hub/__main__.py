@@ -0,0 +1,5 @@
+import sys
+
+from researcher_hub.cli import main
+
+sys.exit(main())
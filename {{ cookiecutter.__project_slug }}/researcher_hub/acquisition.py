@@ -0,0 +1,181 @@
+"""
+Acquisition
+    Choose the conditions that are expected to be most informative from a large pool of candidates.
+
+    Every candidate gets a score, computed for the whole pool at once:
+        disagreement: how much the latest models disagree on the candidate (std of their predictions, read from a
+                      PredictionGrid if one is given, so each model is only evaluated once)
+        uncertainty:  prediction variance of a linear model fitted on the observed conditions (the leverage of
+                      the candidate, in units of the noise variance)
+        novelty:      distance to the nearest condition that was already observed
+    The scores are scaled to [0, 1], weighted, summed and the top `num_samples` candidates are returned.
+
+    The candidate pool does not depend on the models, so it can be prepared by the experimentalist in the background
+    and the selection runs in the `finalize` step of a PipelinedCycle (see acquisition_finalize). acquisition_sampler
+    can also be used as a step of an autora pipeline: make_pipeline([pool, acquisition_sampler]).
+"""
+
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from researcher_hub.prediction_grid import PredictionGrid
+from researcher_hub.report import predictions
+from researcher_hub.streams import RNGStreams
+
+
+def _as_2d(conditions) -> np.ndarray:
+    x = np.asarray(conditions, dtype=float)
+    return x.reshape(len(x), -1)
+
+
+def disagreement(candidates, models) -> np.ndarray:
+    """Standard deviation of the predictions of the models for every candidate (zero with less than two models)
+
+    `models` can also be a PredictionGrid, then the std of its ensemble is interpolated at the candidates.
+    """
+    x = _as_2d(candidates)
+    if isinstance(models, PredictionGrid):
+        std = models.std(x)
+        return np.zeros(len(x)) if std is None else std.mean(axis=1)
+    if len(models) < 2:
+        return np.zeros(len(x))
+    return predictions(models, x).std(axis=0).mean(axis=1)
+
+
+def uncertainty(candidates, reference_conditions) -> np.ndarray:
+    """Leverage of every candidate given the observed conditions (high where a linear fit is least constrained)"""
+    x = _as_2d(candidates)
+    if reference_conditions is None or len(reference_conditions) == 0:
+        return np.zeros(len(x))
+    design = np.column_stack([np.ones(len(reference_conditions)), _as_2d(reference_conditions)])
+    inverse = np.linalg.pinv(design.T @ design)
+    x = np.column_stack([np.ones(len(x)), x])
+    return np.einsum("ij,jk,ik->i", x, inverse, x)
+
+
+def novelty(candidates, reference_conditions) -> np.ndarray:
+    """Euclidean distance of every candidate to the nearest observed condition"""
+    x = _as_2d(candidates)
+    if reference_conditions is None or len(reference_conditions) == 0:
+        return np.zeros(len(x))
+    reference = _as_2d(reference_conditions)
+    if x.shape[1] == 1:
+        # one independent variable: the nearest neighbour is next to the candidate in the sorted conditions
+        reference = np.sort(reference[:, 0])
+        position = np.searchsorted(reference, x[:, 0])
+        left = np.abs(x[:, 0] - reference[np.clip(position - 1, 0, len(reference) - 1)])
+        right = np.abs(reference[np.clip(position, 0, len(reference) - 1)] - x[:, 0])
+        return np.minimum(left, right)
+    # scipy comes with scikit-learn (a dependency of autora), imported here to keep the start up fast
+    from scipy.spatial import cKDTree
+
+    return cKDTree(reference).query(x)[0]
+
+
+ACQUISITIONS = {
+    "disagreement": lambda candidates, models, reference: disagreement(candidates, models),
+    "uncertainty": lambda candidates, models, reference: uncertainty(candidates, reference),
+    "novelty": lambda candidates, models, reference: novelty(candidates, reference),
+}
+
+
+def _scale(score):
+    low, high = score.min(), score.max()
+    return (score - low) / (high - low) if high > low else np.zeros_like(score)
+
+
+def acquisition_sampler(
+    conditions,
+    num_samples: int,
+    models=(),
+    reference_conditions=None,
+    acquisition: Union[str, Dict[str, float]] = "disagreement",
+    rng: Optional[np.random.Generator] = None,
+):
+    """Return the `num_samples` candidates with the highest acquisition score
+
+    Args:
+        conditions: Candidate conditions (one per row, or a flat array for one independent variable)
+        num_samples (int): Number of conditions to return
+        models: The latest fitted models or a PredictionGrid (for "disagreement")
+        reference_conditions: The conditions observed so far (for "uncertainty" and "novelty")
+        acquisition: Name of the score or a dict of score names and their weights
+        rng (np.random.Generator): Picks at random if the scores don't tell the candidates apart (e.g. before
+            the first model was fitted)
+
+    Returns:
+        The chosen candidates, highest score first, in the type of `conditions`
+
+    Examples:
+        >>> pool = np.random.default_rng(180).uniform(size=100_000)
+        >>> acquisition_sampler(pool, 3, models=history[-5:], reference_conditions=observed,
+        ...                     acquisition={"disagreement": 1, "novelty": 0.5})
+    """
+    weights = {acquisition: 1.0} if isinstance(acquisition, str) else acquisition
+    num_samples = min(num_samples, len(conditions))
+    score = np.zeros(len(conditions))
+    for name, weight in weights.items():
+        if name not in ACQUISITIONS:
+            raise KeyError(f"Unknown acquisition '{name}', use one of {sorted(ACQUISITIONS)}")
+        score += weight * _scale(ACQUISITIONS[name](conditions, models, reference_conditions))
+
+    if score.max() == score.min():
+        rng = rng if rng is not None else np.random.default_rng()
+        chosen = rng.choice(len(conditions), size=num_samples, replace=False)
+    else:
+        # argpartition finds the top k in linear time, only those are sorted
+        chosen = np.argpartition(-score, num_samples - 1)[:num_samples]
+        chosen = chosen[np.argsort(-score[chosen])]
+
+    if isinstance(conditions, np.ndarray):
+        return conditions[chosen]
+    if hasattr(conditions, "iloc"):
+        return conditions.iloc[chosen]
+    return [conditions[i] for i in chosen]
+
+
+def acquisition_finalize(
+    num_samples: int,
+    acquisition: Union[str, Dict[str, float]] = "disagreement",
+    last_models: int = 5,
+    seed: Optional[int] = None,
+    streams: Optional[RNGStreams] = None,
+    grid: Optional[PredictionGrid] = None,
+):
+    """`finalize` step for a PipelinedCycle that picks the conditions from the prepared candidates
+
+    Args:
+        num_samples (int): Number of conditions per cycle
+        acquisition: Name of the score or a dict of score names and their weights
+        last_models (int): Number of the latest models that are compared for "disagreement"
+        seed (int): Seed for the random choice while the scores can't tell the candidates apart
+        streams (RNGStreams): Optional, use the "finalize" stream of every cycle instead of one generator seeded with
+            `seed` (reproduces the choices of a resumed study)
+        grid (PredictionGrid): Optional, scores "disagreement" on the grid (its `ensemble` replaces `last_models`)
+            instead of predicting every candidate with every model. The grid is updated here, so plots and other
+            samplers can read the predictions of the latest models from it.
+
+    Examples:
+        >>> cycle = PipelinedCycle(..., finalize=acquisition_finalize(3, {"disagreement": 1, "novelty": 1}))
+    """
+    # not shared with the experimentalist, which draws its candidates on another thread
+    rng = np.random.default_rng(seed)
+
+    def finalize(candidates, data):
+        # the timings of the current cycle are appended after the theorist ran
+        cycle_rng = streams.generator("finalize", len(data.timings)) if streams is not None else rng
+        if grid is not None:
+            grid.update(data.models)
+            models = grid
+        else:
+            models = data.models[-last_models:] if len(data.models) else []
+        reference = data.stacked()[0] if any(len(c) for c in data.conditions) else None
+        return acquisition_sampler(
+            candidates, finalize.num_samples, models=models, reference_conditions=reference, acquisition=acquisition,
+            rng=cycle_rng,
+        )
+
+    # can be changed between cycles (e.g. by the benchmarks, to scale a workflow to more conditions)
+    finalize.num_samples = num_samples
+    return finalize
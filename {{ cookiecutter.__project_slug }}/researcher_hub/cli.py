@@ -0,0 +1,258 @@
+"""
+Command Line Interface
+    Runs the closed loop defined in a workflow config (researcher_hub/workflow.json by default).
+
+    python -m researcher_hub run      [--cycles N] [--runner firebase|synthetic]    start a new study (--force
+                                                                                    replaces a saved state)
+    python -m researcher_hub resume   [--cycles N] [--runner firebase|synthetic]    continue from the saved state
+    python -m researcher_hub bench    [--cycles N]                                  per-stage timings (synthetic runner)
+    python -m researcher_hub profile  [--format cprofile|folded] [--output FILE]    profile a run
+
+    run and resume append the metrics of every cycle to telemetry.jsonl, run, resume and bench serve them in the
+    OpenMetrics format with --metrics-port (see researcher_hub.telemetry).
+
+    The state (conditions, observations, models) is saved after every cycle, so a study that was stopped can be
+    resumed. bench and profile don't save anything, so they never touch the state or telemetry of a study. Heavy
+    dependencies are only loaded by the stages that need them (see researcher_hub.plugins).
+"""
+
+import argparse
+import fractions
+import json
+import os
+import pickle
+import sys
+import time
+
+from researcher_hub.history import ModelHistory
+from researcher_hub.pipeline import CycleData, PipelinedCycle
+from researcher_hub.plugins import load
+from researcher_hub.samplers import grid_for
+from researcher_hub.streams import RNGStreams
+from researcher_hub.telemetry import TelemetryMonitor
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "workflow.json")
+STAGES = ["experimentalist", "waiting", "finalize", "runner", "theorist"]
+
+
+# *** Building the workflow from the config *** #
+
+def load_config(path: str) -> dict:
+    with open(path) as f:
+        config = json.load(f)
+    # relative paths in the config are relative to the config file
+    config["_dir"] = os.path.dirname(os.path.abspath(path))
+    return config
+
+
+def _path(config, path):
+    return os.path.join(config["_dir"], path)
+
+
+def build_variables(config):
+    from autora.variable import Variable, VariableCollection
+
+    def variable(spec):
+        spec = dict(spec)
+        if "value_range" in spec:
+            spec["value_range"] = tuple(spec["value_range"])
+        return Variable(**spec)
+
+    return VariableCollection(
+        independent_variables=[variable(v) for v in config["variables"]["independent_variables"]],
+        dependent_variables=[variable(v) for v in config["variables"]["dependent_variables"]],
+    )
+
+
+def build_runner(config, backend):
+    spec = config["runner"][backend]
+    if backend == "synthetic":
+        experiment = load("synthetic_experiment", spec["experiment"])()
+        return load("runner", "synthetic")(experiment, random_state=spec.get("random_state"))
+    with open(_path(config, spec["credentials"])) as f:
+        firebase_credentials = json.load(f)
+    return load("runner", "firebase")(
+        firebase_credentials=firebase_credentials,
+        time_out=spec["time_out"],
+        sleep_time=spec["sleep_time"],
+        # a fraction like "2/3" is exact, 0.67 of 3 conditions would round up to all of them
+        quorum=float(fractions.Fraction(spec.get("quorum", 1))),
+        deadline=spec.get("deadline"),
+    )
+
+
+def build_cycle(config, backend, data=None, monitor=None):
+    variables = build_variables(config)
+    first_cycle = len(data.timings) if data is not None else 0
+
+    sampling = config["experimentalist"]
+    sampler = load("experimentalist", sampling["name"])
+    # every cycle samples from its own stream, a resumed study continues with the seed it was started with
+    seed = data.seed if data is not None and data.seed is not None else sampling.get("seed")
+    streams = RNGStreams(seed)
+    if sampling["name"] == "grid" and first_cycle > 0:
+        # the grid sampler doesn't sample the conditions of the earlier cycles again, neither the observed ones nor
+        # the stragglers that are re-queued into the next cycle
+        grid = grid_for(variables)
+        for conditions in data.conditions + [data.stragglers]:
+            if len(conditions):
+                grid.mark_used(grid.index(conditions))
+
+    def experimentalist(rng):
+        return sampler(variables, sampling["num_samples"], rng)
+
+    spec = config["theorist"]
+    theorist = load("theorist", spec["name"])(**spec.get("params", {}))
+
+    return PipelinedCycle(
+        variables=variables,
+        theorist=theorist,
+        experimentalist=experimentalist,
+        experiment_runner=build_runner(config, backend),
+        monitor=monitor,
+        data=data,
+        streams=streams,
+    )
+
+
+# *** State *** #
+
+def save_state(data: CycleData, path: str):
+    # write to a temporary file first, so a crash while saving doesn't destroy the last state
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+def load_state(path: str) -> CycleData:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+# *** Reporting *** #
+
+def timing_report(data: CycleData, first_cycle: int = 0) -> str:
+    lines = ["cycle " + " ".join(f"{s:>15}" for s in STAGES)]
+    for c, t in enumerate(data.timings[first_cycle:], start=first_cycle):
+        lines.append(f"{c:>5} " + " ".join(f"{t[s]:>14.3f}s" for s in STAGES))
+    timings = data.timings[first_cycle:]
+    if timings:
+        # the experimentalist runs in the background, the cycle only waits for the part that doesn't overlap
+        wall_time = sum(t["waiting"] + t["finalize"] + t["runner"] + t["theorist"] for t in timings)
+        lines.append(f"{len(timings) / wall_time:.2f} cycles/s")
+    return "\n".join(lines)
+
+
+# *** Commands *** #
+
+def run(config, cycles, backend, resume=False, timings=False, metrics_port=None, persist=True, force=False):
+    """Run the study of the config
+
+    Args:
+        persist (bool): Save the state and the telemetry after every cycle (off for benchmarks and profiles, which
+            must not overwrite the study)
+        force (bool): Start a new study even if a saved state exists (it is overwritten)
+    """
+    state = _path(config, config["state"])
+    history = config.get("history", {})
+    if resume:
+        data = load_state(state)
+    else:
+        if persist and not force and os.path.exists(state):
+            raise FileExistsError(
+                f"{state} holds the state of a study, continue it with resume or pass --force to start over"
+            )
+        # only the last models are kept in memory (and in the saved state), older ones are spilled to disk
+        spill_dir = history.get("spill_dir") if persist else None
+        data = CycleData(models=ModelHistory(
+            keep_last=history.get("keep_last"),
+            spill_dir=_path(config, spill_dir) if spill_dir else None,
+        ))
+    first_cycle = len(data.timings)
+    telemetry_path = config.get("telemetry", {}).get("path") if persist else None
+    telemetry = TelemetryMonitor(_path(config, telemetry_path) if telemetry_path else None, port=metrics_port)
+    if telemetry.address is not None:
+        print(f"Serving metrics at http://{telemetry.address[0]}:{telemetry.address[1]}/metrics")
+
+    def monitor(data):
+        if persist:
+            save_state(data, state)
+        telemetry(data)
+
+    cycle = build_cycle(config, backend, data=data, monitor=monitor)
+    with telemetry:
+        cycle.run(num_cycles=cycles)
+    if timings:
+        print(timing_report(cycle.data, first_cycle))
+    return cycle.data
+
+
+def profile(config, cycles, backend, fmt, output):
+    if fmt == "cprofile":
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.runcall(run, config, cycles, backend, timings=True, persist=False)
+        profiler.dump_stats(output)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+    else:
+        from researcher_hub.profiling import SamplingProfiler
+
+        with SamplingProfiler() as profiler:
+            run(config, cycles, backend, timings=True, persist=False)
+        profiler.write(output)
+    print(f"Profile written to {output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m researcher_hub", description="Run an AutoRA closed loop")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="workflow config (json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, description in [
+        ("run", "start a new study"),
+        ("resume", "continue the study from the saved state"),
+        ("bench", "run with the synthetic runner and report the time per stage"),
+        ("profile", "profile a run"),
+    ]:
+        command = commands.add_parser(name, help=description)
+        command.add_argument("--cycles", type=int, help="number of cycles (default: from the config)")
+        command.add_argument(
+            "--runner", choices=["firebase", "synthetic"], default="synthetic" if name == "bench" else "firebase"
+        )
+        if name in ("run", "resume"):
+            command.add_argument("--timings", action="store_true", help="print the time per stage and cycle")
+        if name == "run":
+            command.add_argument("--force", action="store_true", help="overwrite the saved state of a study")
+        if name != "profile":
+            command.add_argument("--metrics-port", type=int, help="serve the metrics of every cycle on this port")
+        if name == "profile":
+            command.add_argument("--format", choices=["cprofile", "folded"], default="cprofile",
+                                 help="cProfile stats or folded stacks of a sampling profiler (like py-spy)")
+            command.add_argument("--output", help="default: researcher_hub.prof or researcher_hub.folded")
+
+    args = parser.parse_args(argv)
+    config = load_config(args.config)
+    cycles = args.cycles or config["cycles"]
+
+    if args.command == "run":
+        try:
+            run(config, cycles, args.runner, timings=args.timings, metrics_port=args.metrics_port, force=args.force)
+        except FileExistsError as e:
+            print(f"Error - {e}", file=sys.stderr)
+            return 1
+    elif args.command == "resume":
+        run(config, cycles, args.runner, resume=True, timings=args.timings, metrics_port=args.metrics_port)
+    elif args.command == "bench":
+        start = time.perf_counter()
+        run(config, cycles, args.runner, timings=True, metrics_port=args.metrics_port, persist=False)
+        print(f"{time.perf_counter() - start:.2f}s in total")
+    else:
+        output = args.output or ("researcher_hub.prof" if args.format == "cprofile" else "researcher_hub.folded")
+        profile(config, cycles, args.runner, args.format, output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Model History
+    Keeps the models of a long running study without keeping all of them in memory.
+
+    Every model gets a small summary (equation, coefficients, score) that stays in memory. Only the last `keep_last`
+    models are kept as objects, older ones are pickled to `spill_dir` and loaded again when they are accessed (or
+    dropped if there is no spill_dir). A ModelHistory can be used like the list of models of a cycle:
+        history[0], history[-1], len(history), for model in history: ...
+"""
+
+import os
+import pickle
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def _to_list(value):
+    return np.asarray(value, dtype=float).tolist()
+
+
+def _equation(model) -> str:
+    # linear models only have coefficients, everything else (e.g. BMS) prints its equation
+    if hasattr(model, "coef_"):
+        coef = np.atleast_2d(model.coef_)
+        intercept = np.atleast_1d(getattr(model, "intercept_", np.zeros(len(coef))))
+        terms = [
+            " + ".join([f"{c:.4g}*x{i}" for i, c in enumerate(row)] + [f"{b:.4g}"])
+            for row, b in zip(coef, intercept)
+        ]
+        return "; ".join(f"y{j} = {t}" if len(terms) > 1 else f"y = {t}" for j, t in enumerate(terms))
+    return str(model)
+
+
+def summarize(model, conditions=None, observations=None) -> Dict[str, Any]:
+    """Compact, json serializable summary of a fitted model
+
+    Args:
+        model: The fitted theorist
+        conditions: Optional, the data the model was fitted on (to compute the score)
+        observations: Optional, the data the model was fitted on (to compute the score)
+
+    Returns:
+        Dict: equation, coefficients (None if the model has none) and score (None if there is no data or the model
+            can't score)
+    """
+    coefficients = None
+    if hasattr(model, "coef_"):
+        coefficients = {"coef": _to_list(model.coef_), "intercept": _to_list(getattr(model, "intercept_", 0.0))}
+    score = None
+    if conditions is not None and hasattr(model, "score"):
+        try:
+            score = float(model.score(conditions, observations))
+        except Exception:
+            score = None
+    return {"equation": _equation(model), "coefficients": coefficients, "score": score}
+
+
+class ModelHistory:
+    """List of models that keeps only the last `keep_last` in memory
+
+    Args:
+        keep_last (int): Number of models to keep in memory (None keeps all of them)
+        spill_dir (str): Optional, directory the older models are pickled to. Without it older models are dropped
+            and only their summaries remain.
+
+    Examples:
+        >>> history = ModelHistory(keep_last=5, spill_dir="model_history")
+        >>> cycle = PipelinedCycle(..., data=CycleData(models=history))
+        >>> cycle.run(num_cycles=100)
+        >>> history[-1]            # in memory
+        >>> history[0]             # loaded from model_history/model_0.pkl
+        >>> history.summaries[0]["equation"]
+    """
+
+    def __init__(self, keep_last: Optional[int] = None, spill_dir: Optional[str] = None):
+        if keep_last is not None and keep_last < 1:
+            raise ValueError("keep_last has to be at least 1")
+        self.keep_last = keep_last
+        self.spill_dir = os.path.abspath(spill_dir) if spill_dir is not None else None
+        self.summaries: List[Dict[str, Any]] = []
+        self._models: Dict[int, Any] = {}
+
+    def _spill_path(self, index: int) -> str:
+        return os.path.join(self.spill_dir, f"model_{index}.pkl")
+
+    def append(self, model, conditions=None, observations=None, cycle: Optional[int] = None):
+        """Add a model (and its summary); evicts the oldest model in memory if there are more than keep_last
+
+        cycle is the cycle the model was fitted in (defaults to its index, cycles without observations add no model)
+        """
+        index = len(self.summaries)
+        cycle = index if cycle is None else cycle
+        self.summaries.append({"cycle": cycle, **summarize(model, conditions, observations)})
+        self._models[index] = model
+        while self.keep_last is not None and len(self._models) > self.keep_last:
+            oldest = min(self._models)
+            evicted = self._models.pop(oldest)
+            if self.spill_dir is not None:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                with open(self._spill_path(oldest), "wb") as f:
+                    pickle.dump(evicted, f)
+
+    def in_memory(self) -> List[int]:
+        """Indices of the models that are kept in memory"""
+        return sorted(self._models)
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("model index out of range")
+        if index in self._models:
+            return self._models[index]
+        if self.spill_dir is None or not os.path.exists(self._spill_path(index)):
+            raise IndexError(f"model {index} was evicted (set a spill_dir to keep older models on disk)")
+        # not cached again, otherwise iterating over a long history would load everything back into memory
+        with open(self._spill_path(index), "rb") as f:
+            return pickle.load(f)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __repr__(self):
+        return f"ModelHistory({len(self)} models, {len(self._models)} in memory)"
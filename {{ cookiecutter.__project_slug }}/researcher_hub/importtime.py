@@ -0,0 +1,83 @@
+"""
+Import Time Report
+    How long each plugin takes to import in a fresh interpreter (based on `python -X importtime`).
+
+    Run it from the project directory:
+        python -m researcher_hub.importtime
+        python -m researcher_hub.importtime researcher_hub.pipeline sklearn
+"""
+
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from researcher_hub.plugins import PLUGINS
+
+
+def _self_times(code: str) -> Optional[Dict[str, int]]:
+    # self time in microseconds of every module imported by `python -c code`, None if the code fails
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            times[fields[2].strip()] = int(fields[0])
+        except ValueError:
+            continue
+    return times
+
+
+def import_time(module: str, top: int = 5) -> Tuple[Optional[float], List[Tuple[str, float]]]:
+    """Cold import time of a module
+
+    Args:
+        module (str): Name of the module
+        top (int): Number of the most expensive imported packages to return
+
+    Returns:
+        Tuple: total import time in seconds and the `top` most expensive top-level packages with their
+            import time in seconds (None as total if the module can't be imported)
+    """
+    times = _self_times(f"import {module}")
+    if times is None:
+        return None, []
+    # only count what the module imports, not what the interpreter imports on start up
+    startup = _self_times("pass") or {}
+    packages: Dict[str, float] = {}
+    for name, self_us in times.items():
+        if name not in startup:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0.0) + self_us / 1e6
+    heaviest = sorted(packages.items(), key=lambda p: p[1], reverse=True)[:top]
+    return sum(packages.values()), heaviest
+
+
+def report(modules: List[str]) -> str:
+    """Report of the cold import times of the modules, slowest first"""
+    rows = [(module, *import_time(module)) for module in modules]
+    rows.sort(key=lambda r: -1 if r[1] is None else r[1], reverse=True)
+    lines = [f"{'module':<55} {'import [s]':>10}  heaviest packages"]
+    for module, total, heaviest in rows:
+        if total is None:
+            lines.append(f"{module:<55} {'missing':>10}")
+        else:
+            packages = ", ".join(f"{p} {t:.2f}s" for p, t in heaviest)
+            lines.append(f"{module:<55} {total:>10.3f}  {packages}")
+    return "\n".join(lines)
+
+
+def plugin_modules() -> List[str]:
+    """The modules of all registered plugins (and the researcher_hub package itself)"""
+    modules = {"researcher_hub"}
+    for plugins in PLUGINS.values():
+        modules.update(path.partition(":")[0] for path in plugins.values())
+    return sorted(modules)
+
+
+if __name__ == "__main__":
+    print(report(sys.argv[1:] or plugin_modules()))
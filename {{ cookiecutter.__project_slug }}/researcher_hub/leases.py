@@ -0,0 +1,265 @@
+"""
+Leases
+    Conditions are handed out to participants as leases that expire unless the participant renews them.
+
+    check_firebase_status frees the slots of participants that didn't finish by scanning every condition against a
+    fixed timeout on every poll. With thousands of participants that scan is the slow part of a poll, and a slot that
+    is freed while its participant is still working can be handed out twice. A SlotAllocator instead keeps
+        - a free list of slots (one per observation a condition still needs), so a participant gets a condition in
+          O(1) and a condition is never given to more participants than it needs observations,
+        - the expiry times of the leases in a min-heap, so reclaiming expired slots costs O(log n) per slot and
+          nothing for the leases that are still running. Renewing a lease (a heartbeat of the client) pushes the new
+          expiry, the outdated entry is skipped when it reaches the top.
+
+    LocalSession serves the allocator with the interface of the firebase session (send_conditions,
+    check_firebase_status, get_observations), so the runners work with it unchanged, e.g. for simulated participants
+    or to test a study without firebase:
+
+        >>> session = LocalSession(lease_seconds=100)
+        >>> observations = wait_for_observations(
+        ...     conditions,
+        ...     send=lambda c: session.send_conditions("autora", c),
+        ...     check=lambda: session.check_firebase_status("autora"),
+        ...     get=lambda: session.get_observations("autora"),
+        ... )
+
+    while every participant calls start, heartbeat and finish (see LocalSession).
+"""
+
+import collections
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+
+class Lease:
+    """A condition handed out to a participant until `expires` (in the clock of the allocator)"""
+
+    __slots__ = ("id", "condition", "participant", "expires")
+
+    def __init__(self, id: int, condition: int, participant: Any, expires: float):
+        self.id = id
+        self.condition = condition
+        self.participant = participant
+        self.expires = expires
+
+    def __repr__(self):
+        return f"Lease(id={self.id}, condition={self.condition}, participant={self.participant!r})"
+
+
+class SlotAllocator:
+    """Hands out the slots of the conditions of a cycle as leases
+
+    Args:
+        num_conditions (int): Number of conditions
+        targets: Observations needed per condition, one number for all conditions or one per condition
+        lease_seconds (float): Seconds a lease lasts without a heartbeat
+        clock (Callable): Returns the current time in seconds (time.monotonic)
+
+    Examples:
+        >>> slots = SlotAllocator(3, targets=[1, 2, 1], lease_seconds=100)
+        >>> lease = slots.acquire(participant="p1")
+        >>> slots.renew(lease.id)          # heartbeat of the client
+        True
+        >>> slots.complete(lease.id, 0.8)
+        True
+        >>> slots.status()
+        'available'
+    """
+
+    def __init__(
+        self,
+        num_conditions: int,
+        targets: Union[int, Sequence[int]] = 1,
+        lease_seconds: float = 100,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.targets = [targets] * num_conditions if isinstance(targets, int) else list(targets)
+        if len(self.targets) != num_conditions:
+            raise ValueError(f"Got {len(self.targets)} targets for {num_conditions} conditions")
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self.observations = [[] for _ in range(num_conditions)]
+        # one entry per missing observation, in the order of the conditions
+        self._free = collections.deque(i for i, target in enumerate(self.targets) for _ in range(target))
+        self._leases: Dict[int, Lease] = {}
+        self._expiry = []
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    # *** Participants *** #
+
+    def acquire(self, participant: Any = None) -> Optional[Lease]:
+        """Lease a slot of the next condition that needs an observation, None if all slots are leased"""
+        with self._lock:
+            self._reclaim()
+            if not self._free:
+                return None
+            lease = Lease(next(self._ids), self._free.popleft(), participant, self.clock() + self.lease_seconds)
+            self._leases[lease.id] = lease
+            heapq.heappush(self._expiry, (lease.expires, lease.id))
+            return lease
+
+    def renew(self, lease_id: int) -> bool:
+        """Extend a lease by lease_seconds, False if it already expired (its slot may be given to someone else)"""
+        with self._lock:
+            self._reclaim()
+            lease = self._leases.get(lease_id)
+            if lease is None:
+                return False
+            lease.expires = self.clock() + self.lease_seconds
+            heapq.heappush(self._expiry, (lease.expires, lease.id))
+            self._compact()
+            return True
+
+    def complete(self, lease_id: int, observation: Any) -> bool:
+        """Record the observation of a lease, False (and nothing is recorded) if the lease expired"""
+        with self._lock:
+            self._reclaim()
+            lease = self._leases.pop(lease_id, None)
+            if lease is None:
+                return False
+            self.observations[lease.condition].append(observation)
+            return True
+
+    def release(self, lease_id: int) -> bool:
+        """Give the slot of a lease back right away (e.g. the participant aborted)"""
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+            if lease is None:
+                return False
+            self._free.appendleft(lease.condition)
+            return True
+
+    # *** Expiry *** #
+
+    def _reclaim(self) -> int:
+        now = self.clock()
+        reclaimed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, lease_id = heapq.heappop(self._expiry)
+            lease = self._leases.get(lease_id)
+            # completed, released or renewed since this entry was pushed
+            if lease is None or lease.expires != expires:
+                continue
+            del self._leases[lease_id]
+            # the slot was waited for the longest, so it is handed out first
+            self._free.appendleft(lease.condition)
+            reclaimed += 1
+        return reclaimed
+
+    def _compact(self):
+        # renewals leave outdated entries behind, rebuild the heap once they dominate it
+        if len(self._expiry) > 4 * len(self._leases) + 64:
+            self._expiry = [(lease.expires, lease.id) for lease in self._leases.values()]
+            heapq.heapify(self._expiry)
+
+    def reclaim(self) -> int:
+        """Free the slots of all expired leases, returns how many were freed"""
+        with self._lock:
+            return self._reclaim()
+
+    # *** Status *** #
+
+    @property
+    def active(self) -> int:
+        """Number of leases that are running"""
+        return len(self._leases)
+
+    @property
+    def available(self) -> int:
+        """Number of slots that can be leased"""
+        return len(self._free)
+
+    def leases(self):
+        """The running leases"""
+        with self._lock:
+            return list(self._leases.values())
+
+    def status(self) -> str:
+        """Status like check_firebase_status: available, unavailable (all missing observations are leased) or finished"""
+        with self._lock:
+            self._reclaim()
+            if self._free:
+                return "available"
+            return "unavailable" if self._leases else "finished"
+
+
+class LocalSession:
+    """In-process stand-in for the firebase session, conditions are handed out by a SlotAllocator per collection
+
+    The researcher hub uses the methods of the firebase session, participants (threads, simulated participants or
+    a local server) call start, heartbeat and finish.
+
+    Args:
+        lease_seconds (float): Seconds a participant has to finish (or send a heartbeat), the time_out of
+            check_firebase_status overrides it
+        clock (Callable): Returns the current time in seconds (time.monotonic)
+
+    Examples:
+        >>> session = LocalSession()
+        >>> session.send_conditions("autora", [0.1, 0.5], targets=2)
+        >>> lease_id, condition = session.start("autora", participant="p1")
+        >>> session.finish("autora", lease_id, 0.8)
+        True
+    """
+
+    def __init__(self, lease_seconds: float = 100, clock: Callable[[], float] = time.monotonic):
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self.slots: Dict[str, SlotAllocator] = {}
+        self.conditions: Dict[str, list] = {}
+
+    # *** Researcher hub *** #
+
+    def send_conditions(self, collection_name: str, conditions, targets: Union[int, Sequence[int]] = 1):
+        """Replace the conditions of the collection (earlier leases and observations are dropped)"""
+        conditions = conditions.tolist() if hasattr(conditions, "tolist") else list(conditions)
+        self.conditions[collection_name] = conditions
+        self.slots[collection_name] = SlotAllocator(len(conditions), targets, self.lease_seconds, self.clock)
+
+    def get_observations(self, collection_name: str) -> dict:
+        """Observations with the index of the condition as (string) key, None until the condition reached its target
+        (a list of the observations for targets above one)"""
+        slots = self.slots[collection_name]
+        return {
+            str(i): (observed if target > 1 else observed[0]) if len(observed) >= target else None
+            for i, (observed, target) in enumerate(zip(slots.observations, slots.targets))
+        }
+
+    def check_firebase_status(self, collection_name: str, time_out=None, pids_aborted=()) -> str:
+        """Status of the study: "available", "unavailable" (all conditions are running) or "finished"
+
+        Expired leases are reclaimed from the expiry heap, the leases of aborted participants are released.
+        """
+        slots = self.slots[collection_name]
+        if time_out is not None:
+            slots.lease_seconds = time_out
+        if pids_aborted:
+            for lease in slots.leases():
+                if lease.participant in pids_aborted:
+                    slots.release(lease.id)
+        return slots.status()
+
+    # *** Participants *** #
+
+    def start(self, collection_name: str, participant: Any = None):
+        """Lease a condition, returns the lease id and the condition (None if there is none to give out)"""
+        lease = self.slots[collection_name].acquire(participant)
+        if lease is None:
+            return None
+        return lease.id, self.conditions[collection_name][lease.condition]
+
+    def heartbeat(self, collection_name: str, lease_id: int) -> bool:
+        """Renew the lease, False if it expired (the participant should stop)"""
+        return self.slots[collection_name].renew(lease_id)
+
+    def finish(self, collection_name: str, lease_id: int, observation: Any) -> bool:
+        """Upload the observation, False if the lease expired and the observation was not recorded"""
+        return self.slots[collection_name].complete(lease_id, observation)
+
+    def abort(self, collection_name: str, lease_id: int) -> bool:
+        """Give the condition back"""
+        return self.slots[collection_name].release(lease_id)
@@ -0,0 +1,228 @@
+"""
+Pipelined Cycle
+    Overlaps the experimentalist of cycle N+1 with the data collection of cycle N.
+
+    A closed loop normally runs experimentalist, experiment runner and theorist strictly one after the other,
+    so all local compute sits idle while participants are working on the website. Here the experimentalist is
+    split in two parts:
+        prepare:  everything that does not depend on the newest model (candidate pools, trial sequences,
+                  compiled stimuli). This runs one cycle ahead on a background thread.
+        finalize: the (cheap) selection of the conditions from the prepared candidates once the theorist
+                  has been updated.
+
+    Runners may return None for conditions that were not observed in time (see runner.firebase_partial_runner).
+    The theorist is then fitted on the observed conditions and the others are re-queued into the next cycle at
+    the same position, so an observation that arrives after the runner returned is matched to the right condition.
+"""
+
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from researcher_hub.history import ModelHistory
+from researcher_hub.streams import RNGStreams
+
+
+class SpeculativeStage:
+    """Run a stage one cycle ahead on a background thread
+
+    Args:
+        prepare (Callable): Function that takes the cycle number and returns the prepared work for that cycle
+    """
+
+    def __init__(self, prepare: Callable[[int], Any]):
+        self.prepare = prepare
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = {}
+
+    def start(self, cycle: int):
+        """Start preparing `cycle` in the background (does nothing if it has already been started)"""
+        if cycle not in self._futures:
+            self._futures[cycle] = self._executor.submit(self.prepare, cycle)
+
+    def result(self, cycle: int):
+        """Wait for the prepared work of `cycle` and return it (starts it first if necessary)"""
+        self.start(cycle)
+        return self._futures.pop(cycle).result()
+
+    def shutdown(self):
+        """Cancel everything that was prepared but not used and stop the background thread"""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._executor.shutdown(wait=True)
+
+
+@dataclass
+class CycleData:
+    """Conditions, observations and models collected by a PipelinedCycle
+
+    conditions and observations hold one entry per cycle with the observed conditions only, stragglers holds
+    the conditions that were not observed in the last cycle and are re-queued into the next one, at the positions in
+    straggler_slots (their positions in the last cycle, so late observations still match them). timings holds
+    the seconds spent in each stage per cycle ("experimentalist" runs in the background, "waiting" is the part of
+    it the cycle actually had to wait for). models is a ModelHistory, pass one with `keep_last` for long studies.
+    seed is the seed of the RNGStreams of the study (if it uses them), so a resumed study continues the same streams.
+    """
+
+    conditions: List[Any] = field(default_factory=list)
+    observations: List[Any] = field(default_factory=list)
+    models: ModelHistory = field(default_factory=ModelHistory)
+    stragglers: List[Any] = field(default_factory=list)
+    straggler_slots: List[int] = field(default_factory=list)
+    timings: List[Dict[str, float]] = field(default_factory=list)
+    seed: Optional[int] = None
+
+    def stacked(self):
+        """All observed conditions and observations so far, as the arrays of arrays the theorist is fitted on"""
+        return _stack(self.conditions), _stack(self.observations)
+
+
+def _stack(values):
+    # the theorist expects an array of arrays with one row per condition
+    return np.concatenate([np.asarray(v).reshape(len(v), -1) for v in values if len(v) > 0])
+
+
+def _take(values, indices):
+    if isinstance(values, np.ndarray):
+        return values[indices]
+    return [values[i] for i in indices]
+
+
+def _requeue(stragglers, slots, conditions):
+    # a straggler keeps its position (the id of the condition on firebase), so the observation of a participant who
+    # is still working on it when the next cycle starts is recorded for the same condition. The new conditions fill
+    # the other positions, stragglers whose position is taken or out of range go last.
+    if not stragglers:
+        return conditions
+    total = len(stragglers) + len(conditions)
+    order = [None] * total
+    moved = []
+    slots = list(slots) + [total] * (len(stragglers) - len(slots))
+    for i, slot in enumerate(slots[:len(stragglers)]):
+        if slot < total and order[slot] is None:
+            order[slot] = i
+        else:
+            moved.append(i)
+    rest = iter(list(range(len(stragglers), total)) + moved)
+    order = [i if i is not None else next(rest) for i in order]
+    if isinstance(conditions, np.ndarray):
+        return np.concatenate([np.asarray(stragglers), conditions])[order]
+    return _take(list(stragglers) + list(conditions), order)
+
+
+class PipelinedCycle:
+    """Closed loop where the experimentalist for the next cycle is prepared while the runner is waiting
+
+    Args:
+        variables: The VariableCollection of the study
+        theorist: sklearn compatible theorist, it is fitted on all conditions and observations collected so far
+        experimentalist (Callable): Called with no arguments (e.g. an autora pipeline) to prepare the candidate
+            conditions for a cycle. Runs on a background thread one cycle ahead, so it must not depend on the
+            latest model. With `streams` it is called with the generator of the cycle as `rng` instead.
+        experiment_runner (Callable): Takes the conditions and returns the observations (None for conditions
+            that were not observed)
+        finalize (Callable): Optional, takes the prepared candidates and the CycleData and returns the
+            conditions for the runner. Use this for model dependent selection. Defaults to using all candidates.
+        monitor (Callable): Optional, called with the CycleData after every cycle
+        data (CycleData): Optional, data of earlier cycles to continue from (e.g. when resuming a study)
+        streams (RNGStreams): Optional, gives the experimentalist of every cycle its own generator, so the conditions
+            don't depend on threads or on whether the study was resumed
+
+    Examples:
+        >>> cycle = PipelinedCycle(variables, theorist, experimentalist, experiment_runner)
+        >>> cycle.run(num_cycles=3)
+        >>> cycle.data.models[-1]
+    """
+
+    def __init__(
+        self,
+        variables,
+        theorist,
+        experimentalist: Callable[[], Any],
+        experiment_runner: Callable[[Any], Any],
+        finalize: Optional[Callable[[Any, CycleData], Any]] = None,
+        monitor: Optional[Callable[[CycleData], None]] = None,
+        data: Optional[CycleData] = None,
+        streams: Optional[RNGStreams] = None,
+    ):
+        self.variables = variables
+        self.theorist = theorist
+        self.experimentalist = experimentalist
+        self.experiment_runner = experiment_runner
+        self.finalize = finalize
+        self.monitor = monitor
+        self.data = data if data is not None else CycleData()
+        self.streams = streams
+        if streams is not None:
+            if self.data.seed is not None and self.data.seed != streams.seed:
+                raise ValueError(f"The data was collected with seed {self.data.seed}, not {streams.seed}")
+            self.data.seed = streams.seed
+
+    def _prepare(self, cycle):
+        start = time.perf_counter()
+        if self.streams is not None:
+            candidates = self.experimentalist(rng=self.streams.generator("experimentalist", cycle))
+        else:
+            candidates = self.experimentalist()
+        return candidates, time.perf_counter() - start
+
+    def run(self, num_cycles: int = 1):
+        """Run `num_cycles` cycles and return the CycleData"""
+        stage = SpeculativeStage(self._prepare)
+        # cycles are numbered from the start of the study, also when it is resumed
+        first_cycle = len(self.data.timings)
+        try:
+            for c in range(first_cycle, first_cycle + num_cycles):
+                start = time.perf_counter()
+                candidates, experimentalist_time = stage.result(c)
+                waiting_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                if self.finalize is not None:
+                    conditions = self.finalize(candidates, self.data)
+                else:
+                    conditions = candidates
+                conditions = _requeue(self.data.stragglers, self.data.straggler_slots, conditions)
+                finalize_time = time.perf_counter() - start
+
+                # prepare the next cycle while the participants are working on this one
+                if c + 1 < first_cycle + num_cycles:
+                    stage.start(c + 1)
+
+                start = time.perf_counter()
+                observations = self.experiment_runner(conditions)
+                runner_time = time.perf_counter() - start
+
+                observed = [i for i, o in enumerate(observations) if o is not None]
+                missing = [i for i, o in enumerate(observations) if o is None]
+                self.data.conditions.append(_take(conditions, observed))
+                self.data.observations.append(_take(observations, observed))
+                self.data.stragglers = list(_take(conditions, missing))
+                self.data.straggler_slots = missing
+
+                # fit on whatever was observed so far (there is nothing new to learn from if nobody finished)
+                start = time.perf_counter()
+                if observed:
+                    x, y = self.data.stacked()
+                    self.theorist.fit(x, y)
+                    self.data.models.append(copy.deepcopy(self.theorist), x, y, cycle=c)
+                theorist_time = time.perf_counter() - start
+
+                self.data.timings.append({
+                    "experimentalist": experimentalist_time,
+                    "waiting": waiting_time,
+                    "finalize": finalize_time,
+                    "runner": runner_time,
+                    "theorist": theorist_time,
+                })
+
+                if self.monitor is not None:
+                    self.monitor(self.data)
+        finally:
+            stage.shutdown()
+        return self.data
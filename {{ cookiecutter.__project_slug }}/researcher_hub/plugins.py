@@ -0,0 +1,84 @@
+"""
+Plugins
+    Lazy-loading registry for the parts of a workflow.
+
+    Theorists, experimentalists and runners pull in heavy dependencies (sklearn, BMS, sweetpea, firebase-admin, ...).
+    Importing all of them when the workflow starts makes every start slow, even if only a dry run or a status query
+    is wanted. Plugins are registered by their import path instead and only imported when a stage first asks for
+    them. See researcher_hub.importtime for a report of what each plugin costs to import.
+"""
+
+import importlib
+import threading
+
+# stage -> name -> "module:attribute" (or just "module" to load the whole module)
+PLUGINS = {
+    "experimentalist": {
+        "uniform": "researcher_hub.samplers:uniform_sampler",
+        "grid": "researcher_hub.samplers:grid_sampler",
+        "dissimilarity": "autora.experimentalist.sampler.dissimilarity:summed_dissimilarity_sampler",
+        "pipeline": "autora.experimentalist.pipeline:make_pipeline",
+        "sweetpea": "sweetpea",
+        "sweetbean": "sweetbean",
+    },
+    "theorist": {
+        "linear_regression": "sklearn.linear_model:LinearRegression",
+        "bms": "autora.theorist.bms:BMSRegressor",
+    },
+    "runner": {
+        "firebase": "researcher_hub.runner:firebase_partial_runner",
+        "synthetic": "researcher_hub.synthetic:synthetic_runner",
+    },
+    "experimentation_manager": {
+        "firebase": "researcher_hub.session:get_session",
+        "local": "researcher_hub.leases:LocalSession",
+    },
+    "synthetic_experiment": {
+        "stevens_power_law": "autora.experiment_runner.synthetic.psychophysics.stevens_power_law:stevens_power_law",
+        "weber_fechner_law": "autora.experiment_runner.synthetic.psychophysics.weber_fechner_law:weber_fechner_law",
+        "exp_learning": "autora.experiment_runner.synthetic.psychology.exp_learning:exp_learning",
+    },
+}
+
+_loaded = {}
+# reentrant: a plugin may load another plugin while it is imported
+_lock = threading.RLock()
+
+
+def register(stage: str, name: str, path: str):
+    """Register a plugin by its import path ("module:attribute" or "module"), nothing is imported here
+
+    Examples:
+        >>> register("theorist", "darts", "autora.theorist.darts:DARTSRegressor")
+    """
+    PLUGINS.setdefault(stage, {})[name] = path
+    _loaded.pop((stage, name), None)
+
+
+def load(stage: str, name: str):
+    """Import the plugin on first use and return it (later calls return the cached plugin)
+
+    Examples:
+        >>> BMSRegressor = load("theorist", "bms")
+        >>> theorist = BMSRegressor(epochs=500)
+    """
+    key = (stage, name)
+    if key not in _loaded:
+        try:
+            path = PLUGINS[stage][name]
+        except KeyError:
+            raise KeyError(f"No plugin '{name}' registered for stage '{stage}'") from None
+        module_name, _, attribute = path.partition(":")
+        # imports hold the import lock anyway, this only keeps two threads from resolving the same plugin twice
+        with _lock:
+            if key not in _loaded:
+                plugin = importlib.import_module(module_name)
+                if attribute:
+                    plugin = getattr(plugin, attribute)
+                _loaded[key] = plugin
+    return _loaded[key]
+
+
+def loaded():
+    """The (stage, name) of all plugins that have been imported so far"""
+    return sorted(_loaded)
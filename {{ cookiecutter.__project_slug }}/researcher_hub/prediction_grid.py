@@ -0,0 +1,159 @@
+"""
+Prediction Grid
+    Predictions of the latest models on a dense grid over the domain of the independent variables, computed once per
+    model and read by plots, reports and samplers through interpolation.
+
+    Plotting a model by predicting on the (scattered, unsorted) training conditions, and scoring candidates by
+    predicting on every candidate again, evaluates the same model over and over. For theorists like BMS, whose
+    expressions are evaluated in Python, that is the slow part of a cycle. A PredictionGrid evaluates every new model
+    once on a regular grid (linear models in one vectorized pass, see researcher_hub.report.predictions), keeps the
+    result until the models change, and answers all other queries by interpolating on the grid:
+
+        >>> grid = PredictionGrid(variables)
+        >>> grid.update(cycle.data.models)          # only models that weren't evaluated yet are evaluated
+        >>> ax.plot(grid.points, grid.mean)         # sorted, dense curve of the latest model
+        >>> grid.predict(candidates), grid.std(candidates)
+
+    The uncertainty is the spread of an ensemble: the last `ensemble` models of the history, or, with a single model,
+    the estimators of an sklearn ensemble (estimators_). Without an ensemble std is None.
+"""
+
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from researcher_hub.report import predictions
+from researcher_hub.samplers import _bounds
+
+
+def _axis(variable, resolution: int) -> np.ndarray:
+    # discrete variables with few values are evaluated exactly at their values
+    if variable.value_range is None and variable.allowed_values is not None:
+        values = np.unique(np.asarray(variable.allowed_values, dtype=float))
+        if len(values) <= resolution:
+            return values
+    low, high = _bounds(variable)
+    return np.linspace(low, high, resolution)
+
+
+def _as_2d(conditions) -> np.ndarray:
+    x = np.asarray(conditions, dtype=float)
+    return x.reshape(len(x), -1)
+
+
+class PredictionGrid:
+    """Caches the predictions of the latest models on a regular grid over the independent variables
+
+    Args:
+        variables: VariableCollection of the study (continuous variables need a value_range or allowed_values)
+        resolution (int): Grid points per independent variable, reduced for many variables so that the grid has at
+            most `max_points` points
+        max_points (int): Upper bound for the number of grid points
+        ensemble (int): Number of the latest models whose predictions are kept for the uncertainty
+
+    Examples:
+        >>> from autora.variable import Variable, VariableCollection
+        >>> grid = PredictionGrid(VariableCollection(independent_variables=[Variable(name="x", value_range=(0, 1))]))
+        >>> grid.points.shape
+        (256, 1)
+    """
+
+    def __init__(self, variables, resolution: int = 256, max_points: int = 2 ** 16, ensemble: int = 5):
+        ivs = variables.independent_variables
+        resolution = max(2, min(resolution, int(max_points ** (1 / len(ivs)))))
+        self.axes = [_axis(v, resolution) for v in ivs]
+        self.shape = tuple(len(a) for a in self.axes)
+        self.points = np.stack(np.meshgrid(*self.axes, indexing="ij"), axis=-1).reshape(-1, len(ivs))
+        self.ensemble = ensemble
+        self.version = None
+        # model index -> predictions on the grid, for the last `ensemble` models
+        self._evaluated: Dict[int, np.ndarray] = {}
+        self._mean = None
+        self._std = None
+        self._lock = threading.Lock()
+
+    def update(self, models, version=None) -> bool:
+        """Evaluate the models that changed since the last update
+
+        Args:
+            models: ModelHistory or list of all fitted models (the last one is the current model, pass the whole
+                history rather than a slice), or a single model
+            version: Optional, identifies the models. Defaults to the number of models, which is enough for an
+                append-only history; pass e.g. the cycle number if a single model is refitted in place.
+
+        Returns:
+            bool: True if the grid was evaluated again
+        """
+        single = hasattr(models, "predict")
+        if single:
+            models = [models]
+            version = version if version is not None else id(models[0])
+        version = version if version is not None else len(models)
+        with self._lock:
+            if version == self.version:
+                return False
+            if single:
+                # a new model in place of the old one, earlier predictions belong to other models
+                self._evaluated = {}
+            latest = range(max(0, len(models) - self.ensemble), len(models))
+            missing = [i for i in latest if i not in self._evaluated]
+            if missing:
+                y = predictions([models[i] for i in missing], self.points)
+                self._evaluated.update(zip(missing, y))
+            self._evaluated = {i: self._evaluated[i] for i in latest}
+
+            members = np.stack([self._evaluated[i] for i in latest]) if len(latest) else None
+            if members is not None and len(members) < 2:
+                members = self._estimators(models[-1], members)
+            self._mean = members[-1] if members is not None else None
+            self._std = members.std(axis=0) if members is not None and len(members) > 1 else None
+            self.version = version
+            return True
+
+    def _estimators(self, model, members):
+        # the estimators of an ensemble model (e.g. a random forest) are the ensemble
+        estimators = getattr(model, "estimators_", None)
+        if estimators is None or len(estimators) < 2:
+            return members
+        spread = np.stack([np.asarray(e.predict(self.points), dtype=float).reshape(len(self.points), -1)
+                           for e in estimators])
+        # the model's own prediction stays the mean
+        return np.concatenate([spread, members])
+
+    @property
+    def mean(self) -> Optional[np.ndarray]:
+        """Predictions of the current model on the grid points, shape (points, dependent variables)"""
+        return self._mean
+
+    @property
+    def uncertainty(self) -> Optional[np.ndarray]:
+        """Standard deviation of the ensemble on the grid points (None without an ensemble)"""
+        return self._std
+
+    def _interpolate(self, values, conditions) -> np.ndarray:
+        x = _as_2d(conditions)
+        if len(self.axes) == 1:
+            axis = self.axes[0]
+            if len(axis) == 1:
+                return np.repeat(values[:1], len(x), axis=0)
+            return np.stack([np.interp(x[:, 0], axis, values[:, o]) for o in range(values.shape[1])], axis=1)
+        # scipy comes with scikit-learn (a dependency of autora), imported here to keep the start up fast
+        from scipy.interpolate import RegularGridInterpolator
+
+        interpolator = RegularGridInterpolator(
+            self.axes, values.reshape(*self.shape, -1), bounds_error=False, fill_value=None
+        )
+        return interpolator(x)
+
+    def predict(self, conditions) -> np.ndarray:
+        """Predictions of the current model for any conditions, interpolated on the grid"""
+        if self._mean is None:
+            raise ValueError("The grid has no model yet, call update first")
+        return self._interpolate(self._mean, conditions)
+
+    def std(self, conditions) -> Optional[np.ndarray]:
+        """Ensemble standard deviation for any conditions, interpolated on the grid (None without an ensemble)"""
+        if self._std is None:
+            return None
+        return self._interpolate(self._std, conditions)
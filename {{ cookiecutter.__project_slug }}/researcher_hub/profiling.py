@@ -0,0 +1,71 @@
+"""
+Profiling
+    Sampling profiler that writes folded stacks, the text format of py-spy (`py-spy record --format raw`) that
+    flamegraph.pl, speedscope and inferno read. Unlike cProfile it also sees the background threads (e.g. the
+    experimentalist of a PipelinedCycle) and barely slows the workflow down.
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+
+
+class SamplingProfiler:
+    """Sample the stacks of all threads every `interval` seconds
+
+    Args:
+        interval (float): Seconds between two samples
+
+    Examples:
+        >>> with SamplingProfiler(interval=0.005) as profiler:
+        ...     cycle.run(num_cycles=3)
+        >>> profiler.write("profile.folded")
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def write(self, path: str):
+        """Write the samples as folded stacks (one `frame;frame;frame count` line per distinct stack)"""
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
@@ -0,0 +1,68 @@
+"""
+Projection
+    Declares which parts of the jsPsych data a study needs, so participants only upload those.
+
+    jsPsych records every trial with all its parameters (stimuli, timings, plugin internals, ...), while the analysis
+    usually reads a handful of fields of one trial type. A Projection is sent to the testing zone together with the
+    condition, main.js keeps only the matching trials and fields before the upload, and the researcher hub parses the
+    result straight into columns:
+        {"fields": ["coherence_movement", "correct"], "rows": [[50, true], [80, false], ...]}
+
+    Observations that were uploaded without a projection (the full `jsPsych.data.get()`) are still parsed.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class Projection:
+    """Fields (and trials) of the jsPsych data a study needs
+
+    Args:
+        fields (List[str]): Fields of the trials to upload
+        where (Dict): Optional, only upload the trials with these values (e.g. {"trial_type": "rok"})
+
+    Examples:
+        >>> projection = Projection(["coherence_movement", "correct"], where={"trial_type": "rok"})
+        >>> firebase.send_conditions("autora", [json.dumps({"blocks": b, "projection": projection.to_dict()})
+        ...                                     for b in blocks])
+        >>> columns = projection.parse(observation)
+        >>> columns["correct"].mean()
+    """
+
+    def __init__(self, fields: List[str], where: Optional[Dict[str, Any]] = None):
+        self.fields = list(fields)
+        self.where = dict(where or {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The projection as it is sent to main.js"""
+        return {"fields": self.fields, "where": self.where}
+
+    def _matches(self, trial) -> bool:
+        return all(trial.get(key) == value for key, value in self.where.items())
+
+    def apply(self, trials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Project a list of trials like main.js does before the upload"""
+        rows = [[trial.get(f) for f in self.fields] for trial in trials if self._matches(trial)]
+        return {"fields": self.fields, "rows": rows}
+
+    def parse(self, observation) -> Dict[str, np.ndarray]:
+        """Columns of the projected fields of an observation
+
+        Args:
+            observation: The uploaded data as a json string or parsed, either projected ({"fields", "rows"}) or the
+                full jsPsych data ({"trials": [...]}), which is projected here
+
+        Returns:
+            Dict: field -> np.ndarray with one value per trial
+        """
+        data = json.loads(observation) if isinstance(observation, (str, bytes)) else observation
+        if "rows" not in data:
+            data = self.apply(data["trials"])
+        missing = [f for f in self.fields if f not in data["fields"]]
+        if missing:
+            raise KeyError(f"The observation has no {missing} (was it uploaded with another projection?)")
+        columns = list(zip(*data["rows"])) or [()] * len(data["fields"])
+        return {f: np.array(columns[data["fields"].index(f)]) for f in self.fields}
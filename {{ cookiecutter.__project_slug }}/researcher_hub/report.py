@@ -0,0 +1,192 @@
+"""
+Report
+    How the theory evolved over the cycles: the parameters of every model and how well it fits held-out data.
+
+    The parameters are taken from the model summaries (see researcher_hub.history), so models that were spilled to
+    disk are not loaded again. Linear models (everything with coef_ and intercept_) are evaluated in one vectorized
+    pass over all models, only other theorists fall back to calling predict model by model.
+"""
+
+import csv
+import html
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from researcher_hub.history import ModelHistory, summarize
+
+
+def _summaries(models) -> List[Dict]:
+    if isinstance(models, ModelHistory):
+        return models.summaries
+    return [summarize(m) for m in models]
+
+
+def _linear(summary):
+    coefficients = summary.get("coefficients")
+    if coefficients is None:
+        return None
+    coef = np.atleast_2d(np.asarray(coefficients["coef"], dtype=float))
+    intercept = np.broadcast_to(np.asarray(coefficients["intercept"], dtype=float), (coef.shape[0],))
+    return coef, intercept
+
+
+def parameters(models) -> np.ndarray:
+    """Parameters of all models as one array
+
+    Args:
+        models: ModelHistory or list of fitted models
+
+    Returns:
+        np.ndarray: one row per model with the coefficients followed by the intercepts (NaN for models without
+            coefficients, rows are padded with NaN if the models have a different number of parameters)
+    """
+    rows = []
+    for summary in _summaries(models):
+        linear = _linear(summary)
+        rows.append(np.empty(0) if linear is None else np.concatenate([linear[0].ravel(), linear[1]]))
+    table = np.full((len(rows), max((len(r) for r in rows), default=0)), np.nan)
+    for i, row in enumerate(rows):
+        table[i, :len(row)] = row
+    return table
+
+
+def predictions(models, conditions) -> np.ndarray:
+    """Predictions of all models for the conditions, shape (models, conditions, dependent variables)
+
+    Models without coefficients that were evicted from a ModelHistory without spill_dir are predicted as NaN.
+    """
+    x = np.asarray(conditions, dtype=float).reshape(len(conditions), -1)
+    summaries = _summaries(models)
+    linear = [_linear(s) for s in summaries]
+    shapes = [l[0].shape for l in linear if l is not None]
+    n_out = shapes[0][0] if shapes else None
+
+    # models with the same linear form are predicted together
+    vectorized = [i for i, l in enumerate(linear) if l is not None and l[0].shape == (n_out, x.shape[1])]
+    predicted = {}
+    if vectorized:
+        coef = np.stack([linear[i][0] for i in vectorized])
+        intercept = np.stack([linear[i][1] for i in vectorized])
+        y = np.einsum("mof,sf->mso", coef, x) + intercept[:, None, :]
+        predicted.update(zip(vectorized, y))
+    for i in range(len(summaries)):
+        if i in predicted:
+            continue
+        try:
+            model = models[i]
+        except IndexError:
+            # evicted from a ModelHistory without spill_dir, only its summary is left
+            predicted[i] = None
+            continue
+        predicted[i] = np.asarray(model.predict(x), dtype=float).reshape(len(x), -1)
+    n_out = next((p.shape[1] for p in predicted.values() if p is not None), 1)
+    return np.stack([
+        predicted[i] if predicted[i] is not None else np.full((len(x), n_out), np.nan) for i in range(len(summaries))
+    ])
+
+
+def metrics(models, conditions, observations) -> Dict[str, np.ndarray]:
+    """Mean squared error and R^2 of every model on the (held-out) data
+
+    Returns:
+        Dict: "mse" and "r2", each an array with one value per model (R^2 is averaged over the dependent
+            variables like sklearn's score)
+    """
+    if len(_summaries(models)) == 0:
+        return {"mse": np.empty(0), "r2": np.empty(0)}
+    y_pred = predictions(models, conditions)
+    y = np.asarray(observations, dtype=float).reshape(y_pred.shape[1], -1)
+    residuals = ((y_pred - y) ** 2).sum(axis=1)
+    total = ((y - y.mean(axis=0)) ** 2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(total > 0, 1 - residuals / total, np.nan).mean(axis=1)
+    return {"mse": residuals.sum(axis=1) / y.size, "r2": r2}
+
+
+def report_rows(models, conditions=None, observations=None) -> List[Dict]:
+    """One row per model with the cycle it was fitted in, the equation, parameters and (if data is given) the fit on
+    that data"""
+    summaries = _summaries(models)
+    params = parameters(models)
+    fit = metrics(models, conditions, observations) if conditions is not None else None
+    rows = []
+    for i, summary in enumerate(summaries):
+        row = {"model": i, "cycle": summary.get("cycle", i), "equation": summary["equation"],
+               "train_score": summary.get("score")}
+        if fit is not None:
+            row["mse"] = float(fit["mse"][i])
+            row["r2"] = float(fit["r2"][i])
+        row.update({f"p{j}": float(p) for j, p in enumerate(params[i])})
+        rows.append(row)
+    return rows
+
+
+def collect_held_out(experiment_runner, conditions):
+    """Observe conditions no model was fitted on, to evaluate the models on held-out data
+
+    The observations of the cycles are the training data of the models, scoring the models on them only shows how
+    well each model fits its own training data. The conditions are sent to the participants like the conditions of a
+    cycle, so this costs one more round of data collection.
+
+    Args:
+        experiment_runner (Callable): The runner of the study
+        conditions: Conditions that were not used in any cycle
+
+    Returns:
+        tuple: the observed conditions and their observations (conditions that were not observed are left out)
+
+    Examples:
+        >>> conditions, observations = collect_held_out(experiment_runner, uniform_sampler(variables, 10, rng))
+        >>> write_report(cycle.data.models, "report.html", conditions, observations)
+    """
+    observations = experiment_runner(conditions)
+    observed = [i for i, o in enumerate(observations) if o is not None]
+    if isinstance(conditions, np.ndarray):
+        return conditions[observed], np.asarray([observations[i] for i in observed])
+    return [conditions[i] for i in observed], [observations[i] for i in observed]
+
+
+def _format(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def write_report(models, path: str, conditions=None, observations=None, title: Optional[str] = None):
+    """Write the report of all cycles as csv or html (chosen by the extension of `path`)
+
+    Args:
+        models: ModelHistory or list of fitted models
+        path (str): File to write, ending in .csv or .html
+        conditions: Optional, held-out conditions to evaluate every model on
+        observations: Optional, the observations for the held-out conditions
+        title (str): Optional, title of the html report
+
+    Examples:
+        >>> conditions, observations = collect_held_out(experiment_runner, held_out_conditions)
+        >>> write_report(cycle.data.models, "report.html", conditions, observations)
+    """
+    rows = report_rows(models, conditions, observations)
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows({k: _format(row.get(k)) for k in columns} for row in rows)
+        return
+
+    title = html.escape(title or "AutoRA report")
+    header = "".join(f"<th>{html.escape(c)}</th>" for c in columns)
+    body = "\n".join(
+        "<tr>" + "".join(f"<td>{html.escape(_format(row.get(c)))}</td>" for c in columns) + "</tr>" for row in rows
+    )
+    with open(path, "w") as f:
+        f.write(
+            f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>{title}</title>\n"
+            "<style>table { border-collapse: collapse; } th, td { border: 1px solid #ccc; padding: 4px 8px; }"
+            "</style>\n</head>\n<body>\n"
+            f"<h1>{title}</h1>\n<table>\n<tr>{header}</tr>\n{body}\n</table>\n</body>\n</html>\n"
+        )
@@ -0,0 +1,102 @@
+"""
+Partial Firebase Runner
+    Experiment runner that doesn't wait for the slowest participant.
+
+    The firebase runner of autora only returns when every condition is finished, so a single slow participant
+    stalls the whole cycle. This runner returns as soon as a quorum of the conditions is observed or a deadline
+    has passed. Conditions without an observation are returned as None: the PipelinedCycle fits the theorist on
+    the observed conditions and re-queues the others into the next cycle.
+"""
+
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from researcher_hub.plugins import load
+
+
+def _to_list(conditions):
+    # firestore only accepts plain python types
+    if hasattr(conditions, "tolist"):
+        return conditions.tolist()
+    return list(conditions)
+
+
+def wait_for_observations(
+    conditions,
+    send: Callable[[Any], None],
+    check: Callable[[], str],
+    get: Callable[[], Dict[str, Any]],
+    sleep_time: float = 5,
+    quorum: float = 1.0,
+    deadline: Optional[float] = None,
+) -> List[Any]:
+    """Send the conditions and poll for observations until a quorum is reached or the deadline has passed
+
+    Args:
+        conditions: The conditions to send
+        send (Callable): Uploads the conditions
+        check (Callable): Returns the status of the study ("finished" once everything is observed). It is also
+            responsible for freeing the slots of participants that timed out.
+        get (Callable): Returns the observations as a dictionary with the index of the condition as (string) key
+            and None for conditions that are not observed yet
+        sleep_time (float): Seconds between two polls
+        quorum (float): Fraction of the conditions that need to be observed before returning
+        deadline (float): Optional, return after this many seconds with whatever is observed
+
+    Returns:
+        List: One observation per condition (None if the condition was not observed)
+    """
+    n = len(conditions)
+    # the tolerance keeps float fractions like 2 / 3 of 3 conditions at 2
+    needed = math.ceil(quorum * n - 1e-6)
+    start = time.time()
+    send(conditions)
+    while True:
+        time.sleep(sleep_time)
+        status = check()
+        _observations = get() or {}
+        observations = [_observations.get(str(i)) for i in range(n)]
+        observed = sum(o is not None for o in observations)
+        if status == "finished" or observed >= needed:
+            return observations
+        if deadline is not None and time.time() - start >= deadline:
+            return observations
+
+
+def firebase_partial_runner(
+    firebase_credentials: dict,
+    time_out: float,
+    sleep_time: float,
+    quorum: float = 1.0,
+    deadline: Optional[float] = None,
+    collection_name: str = "autora",
+):
+    """Firebase runner that returns after a quorum or a deadline (see `wait_for_observations`)
+
+    Args:
+        firebase_credentials (dict): Credentials of the firebase service account
+        time_out (float): Seconds after which a participant that started but didn't finish frees the slot
+        sleep_time (float): Seconds between two polls
+        quorum (float): Fraction of the conditions that need to be observed before returning
+        deadline (float): Optional, return after this many seconds with whatever is observed
+        collection_name (str): Name of the firestore collection used by the testing zone
+
+    Returns:
+        Callable: experiment runner that takes the conditions and returns the observations
+    """
+
+    def run(conditions):
+        # one connection for all polls and cycles (firebase-admin is only imported when the runner first runs)
+        session = load("experimentation_manager", "firebase")(firebase_credentials)
+        return wait_for_observations(
+            conditions,
+            send=lambda c: session.send_conditions(collection_name, _to_list(c)),
+            check=lambda: session.check_firebase_status(collection_name, time_out),
+            get=lambda: session.get_observations(collection_name),
+            sleep_time=sleep_time,
+            quorum=quorum,
+            deadline=deadline,
+        )
+
+    return run
@@ -0,0 +1,198 @@
+"""
+Samplers
+    Experimentalists that sample conditions from the independent variables of a VariableCollection.
+"""
+
+import numpy as np
+
+
+def _bounds(variable):
+    if variable.value_range is not None:
+        return variable.value_range
+    values = np.asarray(variable.allowed_values, dtype=float)
+    return values.min(), values.max()
+
+
+def uniform_sampler(variables, num_samples: int, rng: np.random.Generator):
+    """Sample conditions uniformly from the value range of each independent variable
+
+    Args:
+        variables: VariableCollection of the study (variables without a value_range use the range of their
+            allowed_values)
+        num_samples (int): Number of conditions
+        rng (np.random.Generator): Random number generator
+
+    Returns:
+        np.ndarray: one condition per row (a flat array if there is only one independent variable)
+
+    Examples:
+        >>> from autora.variable import Variable, VariableCollection
+        >>> variables = VariableCollection(independent_variables=[Variable(name="x", value_range=(0, 1))])
+        >>> uniform_sampler(variables, 3, np.random.default_rng(180)).shape
+        (3,)
+    """
+    low, high = np.array([_bounds(v) for v in variables.independent_variables], dtype=float).T
+    conditions = rng.uniform(low=low, high=high, size=(num_samples, len(low)))
+    return conditions[:, 0] if len(low) == 1 else conditions
+
+
+# spaces with more conditions than this keep the used conditions in a set instead of a bitmap (2**30 bits = 128 MB)
+_MAX_BITMAP = 2 ** 30
+
+# positions checked at a time when the free conditions of a set-backed grid are listed
+_FREE_CHUNK = 2 ** 20
+
+
+class ConditionGrid:
+    """All combinations of the allowed values of the independent variables, sampled without replacement
+
+    The allowed values are read from the VariableCollection once. Conditions are computed from their index in the
+    Cartesian product when they are needed, so even spaces too large to hold in memory can be sampled. A bitmap
+    remembers which conditions were already used, so later cycles never repeat a condition.
+
+    Args:
+        variables: VariableCollection, every independent variable needs allowed_values
+
+    Examples:
+        >>> from autora.variable import Variable, VariableCollection
+        >>> grid = ConditionGrid(VariableCollection(independent_variables=[
+        ...     Variable(name="x1", allowed_values=[1, 2]), Variable(name="x2", allowed_values=[3, 4])]))
+        >>> grid.grid
+        array([[1, 3],
+               [1, 4],
+               [2, 3],
+               [2, 4]])
+        >>> grid.sample(3, np.random.default_rng(180)).shape
+        (3, 2)
+        >>> grid.remaining
+        1
+    """
+
+    def __init__(self, variables):
+        self.values = []
+        for variable in variables.independent_variables:
+            if variable.allowed_values is None:
+                raise ValueError(f"Variable '{variable.name}' has no allowed_values, a grid needs discrete values")
+            self.values.append(np.asarray(variable.allowed_values))
+        self.shape = tuple(len(v) for v in self.values)
+        self.size = int(np.prod(self.shape, dtype=object))
+        self.used = 0
+        self._grid = None
+        if self.size <= _MAX_BITMAP:
+            self._bitmap = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+            self._used_set = None
+        else:
+            self._bitmap = None
+            self._used_set = set()
+
+    @property
+    def remaining(self) -> int:
+        """Number of conditions that have not been used yet"""
+        return self.size - self.used
+
+    @property
+    def grid(self) -> np.ndarray:
+        """All conditions, one per row (a flat array for one independent variable); built on first access"""
+        if self._grid is None:
+            self._grid = self.conditions(np.arange(self.size))
+        return self._grid
+
+    def conditions(self, indices) -> np.ndarray:
+        """The conditions at the given positions of the Cartesian product"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(self.values) == 1:
+            return self.values[0][indices]
+        positions = np.unravel_index(indices, self.shape)
+        columns = [values[p] for values, p in zip(self.values, positions)]
+        if all(np.issubdtype(c.dtype, np.number) for c in columns):
+            return np.column_stack(columns)
+        # numbers and strings mixed: keep every value as it is instead of turning everything into strings
+        conditions = np.empty((len(indices), len(columns)), dtype=object)
+        for i, column in enumerate(columns):
+            conditions[:, i] = column
+        return conditions
+
+    def index(self, conditions) -> np.ndarray:
+        """Positions of the conditions in the Cartesian product (the inverse of `conditions`)"""
+        conditions = np.asarray(conditions).reshape(len(conditions), len(self.values))
+        positions = []
+        for column, values in zip(conditions.T, self.values):
+            lookup = {v: i for i, v in enumerate(values.tolist())}
+            positions.append([lookup[v] for v in column.tolist()])
+        return np.ravel_multi_index(positions, self.shape).astype(np.int64)
+
+    def _is_used(self, indices):
+        if self._bitmap is None:
+            return np.array([i in self._used_set for i in indices.tolist()], dtype=bool)
+        return (self._bitmap[indices >> 3] >> (indices & 7).astype(np.uint8)) & 1 == 1
+
+    def mark_used(self, indices):
+        """Mark the conditions at the given positions as used (e.g. conditions of a resumed study)"""
+        indices = np.unique(np.asarray(indices, dtype=np.int64))
+        indices = indices[~self._is_used(indices)]
+        if self._bitmap is None:
+            self._used_set.update(indices.tolist())
+        else:
+            np.bitwise_or.at(self._bitmap, indices >> 3, (1 << (indices & 7)).astype(np.uint8))
+        self.used += len(indices)
+
+    def _free(self) -> np.ndarray:
+        # positions of the unused conditions, only called when few of them are left
+        if self._bitmap is not None:
+            used = np.unpackbits(self._bitmap, count=self.size, bitorder="little")
+            return np.flatnonzero(used == 0)
+        # the set holds the used positions, the free ones are found chunk by chunk until all of them are seen
+        free = []
+        found = 0
+        for start in range(0, self.size, _FREE_CHUNK):
+            chunk = np.arange(start, min(start + _FREE_CHUNK, self.size), dtype=np.int64)
+            chunk = chunk[~self._is_used(chunk)]
+            free.append(chunk)
+            found += len(chunk)
+            if found == self.remaining:
+                break
+        return np.concatenate(free)
+
+    def sample(self, num_samples: int, rng: np.random.Generator) -> np.ndarray:
+        """Sample conditions that were not used in earlier calls and mark them as used
+
+        Raises:
+            ValueError: if fewer than `num_samples` unused conditions are left
+        """
+        if num_samples > self.remaining:
+            raise ValueError(f"Only {self.remaining} unused conditions left, {num_samples} requested")
+        if self.remaining >= 4 * num_samples:
+            # most of the grid is free: draw indices and drop the used ones and duplicates
+            chosen = np.empty(0, dtype=np.int64)
+            while len(chosen) < num_samples:
+                draw = rng.integers(0, self.size, size=2 * (num_samples - len(chosen)) + 8)
+                chosen = np.concatenate([chosen, draw[~self._is_used(draw)]])
+                _, first = np.unique(chosen, return_index=True)
+                chosen = chosen[np.sort(first)]
+            chosen = chosen[:num_samples]
+        else:
+            # nearly exhausted: choose from the list of free conditions
+            chosen = rng.choice(self._free(), size=num_samples, replace=False)
+        self.mark_used(chosen)
+        return self.conditions(chosen)
+
+
+# the grid of a VariableCollection is built once and shared by all calls of grid_sampler
+_grids = {}
+
+
+def grid_for(variables) -> ConditionGrid:
+    """The cached ConditionGrid of a VariableCollection"""
+    key = id(variables)
+    if key not in _grids or _grids[key][0] is not variables:
+        _grids[key] = (variables, ConditionGrid(variables))
+    return _grids[key][1]
+
+
+def grid_sampler(variables, num_samples: int, rng: np.random.Generator):
+    """Sample conditions from the allowed values of the independent variables, never repeating a condition
+
+    Same arguments as uniform_sampler. The ConditionGrid of `variables` is cached, so conditions used in an earlier
+    cycle are not sampled again.
+    """
+    return grid_for(variables).sample(num_samples, rng)
@@ -0,0 +1,211 @@
+"""
+Firebase Session
+    One long-lived, authenticated firestore client per set of credentials.
+
+    The functions of the autora firebase experimentation manager initialize a firebase app from the credentials
+    and delete it again on every call, so a polling loop pays for the app set up and the authentication every few
+    seconds. A FirebaseSession keeps the app and the client for the whole study, re-authenticates if the token
+    can't be refreshed and keeps track of how many calls were made and how long they took.
+
+    firebase-admin is only imported when the first call connects.
+
+    It uses the same documents as the experimentation manager (autora_meta, autora_in/conditions and
+    autora_out/observations), so it works with the testing zone as is.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _fingerprint(firebase_credentials: dict) -> str:
+    return hashlib.sha256(json.dumps(firebase_credentials, sort_keys=True).encode()).hexdigest()
+
+
+def _to_db_value(value):
+    # firestore only stores plain python types, nested sequences are stored as json (like the experimentation manager)
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    if isinstance(value, (bool, int, float, str, dict)) or value is None:
+        return value
+    return json.dumps(value)
+
+
+class FirebaseSession:
+    """Long-lived connection to the firestore database of a study
+
+    Args:
+        firebase_credentials (dict): Credentials of the firebase service account
+
+    Examples:
+        >>> session = get_session(firebase_credentials)
+        >>> session.send_conditions("autora", [.1, .5, .9])
+        >>> session.check_firebase_status("autora", time_out=100)
+        'available'
+        >>> session.metrics()["check_firebase_status"]["calls"]
+        1
+    """
+
+    def __init__(self, firebase_credentials: dict):
+        self.firebase_credentials = firebase_credentials
+        self.name = f"researcher_hub-{_fingerprint(firebase_credentials)[:16]}"
+        self._app = None
+        self._db = None
+        # guards the connection and the metrics, which are updated from the threads of the runner (reentrant, the
+        # connect is recorded while the connection is being set up)
+        self._lock = threading.RLock()
+        self._metrics = {}
+
+    # *** Connection *** #
+
+    def _connect(self):
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        app = firebase_admin.initialize_app(credentials.Certificate(self.firebase_credentials), name=self.name)
+        return app, firestore.client(app=app)
+
+    def _disconnect(self):
+        if self._app is not None:
+            import firebase_admin
+
+            firebase_admin.delete_app(self._app)
+        self._app = None
+        self._db = None
+
+    @property
+    def db(self):
+        """The firestore client (initialized on first use)"""
+        with self._lock:
+            if self._db is None:
+                start = time.perf_counter()
+                self._app, self._db = self._connect()
+                self._record("connect", time.perf_counter() - start)
+        return self._db
+
+    def close(self):
+        """Delete the firebase app (the next call connects again)"""
+        with self._lock:
+            self._disconnect()
+
+    def _record(self, operation, seconds, error=False):
+        with self._lock:
+            m = self._metrics.setdefault(
+                operation, {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            m["calls"] += 1
+            m["errors"] += int(error)
+            m["total_seconds"] += seconds
+            m["max_seconds"] = max(m["max_seconds"], seconds)
+
+    def _call(self, operation, fn):
+        # time the call and reconnect once if the access token can't be refreshed anymore
+        from google.api_core.exceptions import Unauthenticated
+        from google.auth.exceptions import RefreshError
+
+        for attempt in range(2):
+            start = time.perf_counter()
+            try:
+                result = fn(self.db)
+            except (RefreshError, Unauthenticated):
+                self._record(operation, time.perf_counter() - start, error=True)
+                if attempt == 1:
+                    raise
+                self.close()
+            else:
+                self._record(operation, time.perf_counter() - start)
+                return result
+
+    def metrics(self) -> dict:
+        """Number of calls, errors and latency (total and max in seconds) per operation"""
+        with self._lock:
+            return {operation: dict(m) for operation, m in self._metrics.items()}
+
+    # *** Experimentation manager *** #
+
+    def send_conditions(self, collection_name: str, conditions):
+        """Upload a new set of conditions and reset the observations and the meta data"""
+
+        def send(db):
+            col = db.collection(collection_name)
+            doc_in = col.document("autora_in")
+            doc_out = col.document("autora_out")
+            for d in doc_in.collection("conditions").stream():
+                d.reference.delete()
+            for d in doc_out.collection("observations").stream():
+                d.reference.delete()
+            col.document("autora_meta").set(
+                {str(i): {"start_time": None, "finished": False} for i in range(len(conditions))}
+            )
+            # one round trip per batch instead of two per condition (firestore allows 500 writes per batch)
+            batch = db.batch()
+            for i, condition in enumerate(conditions):
+                batch.set(doc_in.collection("conditions").document(str(i)), {str(i): _to_db_value(condition)})
+                batch.set(doc_out.collection("observations").document(str(i)), {str(i): None})
+                if i % 250 == 249:
+                    batch.commit()
+                    batch = db.batch()
+            batch.commit()
+
+        return self._call("send_conditions", send)
+
+    def get_observations(self, collection_name: str) -> dict:
+        """Observations with the index of the condition as (string) key (None if not observed yet)"""
+
+        def get(db):
+            observations = {}
+            for d in db.collection(collection_name).document("autora_out").collection("observations").stream():
+                observations.update(d.to_dict())
+            return observations
+
+        return self._call("get_observations", get)
+
+    def check_firebase_status(self, collection_name: str, time_out=None, pids_aborted=()) -> str:
+        """Status of the study: "available", "unavailable" (all conditions are running) or "finished"
+
+        Slots of participants that aborted or didn't finish within `time_out` seconds are freed. This scans every
+        condition, the lease protocol of researcher_hub.leases avoids that for studies run with a LocalSession.
+        """
+
+        def check(db):
+            doc_meta = db.collection(collection_name).document("autora_meta")
+            meta_data = doc_meta.get().to_dict() or {}
+            now = int(time.time())
+            finished = True
+            available = False
+            freed = {}
+            for key, value in meta_data.items():
+                if value["finished"]:
+                    continue
+                if value["start_time"] is None:
+                    available = True
+                elif value.get("pId") in pids_aborted or (
+                    time_out is not None and now - value["start_time"] > time_out
+                ):
+                    freed[key] = {"start_time": None, "finished": False, "pId": None}
+                    available = True
+                else:
+                    finished = False
+            # all freed slots in one write instead of one round trip per slot
+            if freed:
+                doc_meta.update(freed)
+            if available:
+                return "available"
+            if finished:
+                return "finished"
+            return "unavailable"
+
+        return self._call("check_firebase_status", check)
+
+
+def get_session(firebase_credentials: dict) -> FirebaseSession:
+    """Return the session for these credentials (it is created on the first call and reused afterwards)"""
+    key = _fingerprint(firebase_credentials)
+    with _sessions_lock:
+        if key not in _sessions:
+            _sessions[key] = FirebaseSession(firebase_credentials)
+        return _sessions[key]
@@ -0,0 +1,253 @@
+"""
+Simulation
+    Power analysis of a study design with simulated participants, before any recruitment budget is spent.
+
+    simulation_runner answers all conditions of a cycle with one vectorized evaluation of a ground truth (a numpy
+    function like `lambda x: 1 - np.exp(-x)` or an autora-synthetic experiment) plus noise, so thousands of simulated
+    participants per cycle cost milliseconds. simulate runs many independent replications of the closed loop in
+    parallel processes, and power_analysis reports for every number of participants per cycle and every cycle how
+    close the model gets to the ground truth and how often it is within a tolerance:
+
+        >>> variables = load("synthetic_experiment", "exp_learning")().variables   # the two variables it takes
+        >>> design = StudyDesign(variables, ground_truth="exp_learning", noise=0.05)
+        >>> for row in power_analysis(design, participants=[5, 10, 20], num_cycles=10, replications=200):
+        ...     print(row)
+
+    Every replication samples from its own RNGStreams, so the results are reproducible for a seed, independent of
+    the number of worker processes.
+"""
+
+import dataclasses
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from researcher_hub.pipeline import PipelinedCycle
+from researcher_hub.plugins import load
+from researcher_hub.report import metrics
+from researcher_hub.samplers import uniform_sampler
+from researcher_hub.streams import RNGStreams
+from researcher_hub.synthetic import dependent_variables
+
+
+def _experiment(ground_truth):
+    # the autora-synthetic experiment behind a ground truth (None for a numpy function)
+    if isinstance(ground_truth, str):
+        return load("synthetic_experiment", ground_truth)()
+    return ground_truth if hasattr(ground_truth, "ground_truth") else None
+
+
+def _ground_truth_function(ground_truth) -> Callable[[np.ndarray], np.ndarray]:
+    # plugin name of an autora-synthetic experiment, an experiment, or a numpy function of the conditions
+    experiment = _experiment(ground_truth)
+    if experiment is not None:
+        dvs = [v.name for v in experiment.variables.dependent_variables]
+        return lambda x: dependent_variables(experiment.ground_truth(x), dvs, len(x))
+    return ground_truth
+
+
+def _rows(conditions) -> np.ndarray:
+    x = np.asarray(conditions, dtype=float)
+    return x.reshape(len(x), -1)
+
+
+def simulation_runner(
+    ground_truth,
+    noise: float = 0.0,
+    trials: int = 1,
+    dropout: float = 0.0,
+    rng: Optional[np.random.Generator] = None,
+):
+    """Experiment runner where every condition is answered by a simulated participant
+
+    Args:
+        ground_truth: Function of the conditions (one row per condition) that returns the true observations, an
+            autora-synthetic experiment, or the name of one (see researcher_hub.plugins)
+        noise (float): Standard deviation of the gaussian noise of a single trial
+        trials (int): Trials per participant, the observation is their mean
+        dropout (float): Probability that a participant doesn't finish in time (returns None like the firebase
+            runner, so the condition is re-queued)
+        rng (np.random.Generator): Generator for the noise and the dropouts
+
+    Returns:
+        Callable: experiment runner that takes the conditions and returns the observations
+
+    Examples:
+        >>> run = simulation_runner(lambda x: 1 - np.exp(-x), noise=0.1, rng=np.random.default_rng(180))
+        >>> run(np.linspace(0, 1, 10_000)).shape
+        (10000,)
+    """
+    function = _ground_truth_function(ground_truth)
+    rng = rng if rng is not None else np.random.default_rng()
+
+    def run(conditions):
+        x = _rows(conditions)
+        y = np.asarray(function(x), dtype=float).reshape(len(x), -1)
+        if noise:
+            # the mean of `trials` noisy trials, drawn for all participants at once
+            y = y + rng.normal(0, noise / np.sqrt(trials), size=y.shape)
+        observations = y.ravel() if y.shape[1] == 1 else y
+        if not dropout:
+            return observations
+        finished = rng.random(len(x)) >= dropout
+        return [o if f else None for o, f in zip(observations, finished)]
+
+    return run
+
+
+@dataclasses.dataclass
+class StudyDesign:
+    """A closed-loop study to simulate
+
+    The fields are sent to the worker processes, so use plugin names or module level functions and classes (no
+    lambdas) when simulating with more than one worker.
+
+    Args:
+        variables: The VariableCollection of the study (the independent variables need a value_range for the
+            default sampler). With a synthetic experiment as ground truth, use its own variables
+            (experiment.variables), the number of independent variables has to match.
+        ground_truth: See simulation_runner
+        participants (int): Participants (conditions) per cycle
+        noise (float): Standard deviation of the noise of a single trial
+        trials (int): Trials per participant
+        dropout (float): Probability that a participant doesn't finish in time
+        theorist: Plugin name of the theorist or a class that is instantiated for every replication
+        sampler (Callable): Experimentalist with the signature of researcher_hub.samplers.uniform_sampler
+        evaluation_conditions (int): Number of conditions the models are compared with the ground truth on
+    """
+
+    variables: Any
+    ground_truth: Union[str, Callable]
+    participants: int = 10
+    noise: float = 0.0
+    trials: int = 1
+    dropout: float = 0.0
+    theorist: Union[str, Callable] = "linear_regression"
+    sampler: Callable = uniform_sampler
+    evaluation_conditions: int = 1000
+
+    def __post_init__(self):
+        experiment = _experiment(self.ground_truth)
+        if experiment is None:
+            return
+        expected = [v.name for v in experiment.variables.independent_variables]
+        got = len(self.variables.independent_variables)
+        if got != len(expected):
+            raise ValueError(
+                f"The ground truth takes {len(expected)} independent variables ({', '.join(expected)}), the design "
+                f"has {got}. Use the variables of the experiment (experiment.variables)."
+            )
+
+
+def replicate(design: StudyDesign, num_cycles: int, replication: int = 0, seed: Optional[int] = None) -> np.ndarray:
+    """Run one replication of the study and return the error of the model after every cycle
+
+    Returns:
+        np.ndarray: mean squared error between the model of each cycle and the ground truth on the evaluation
+            conditions (NaN while nothing was observed yet)
+    """
+    streams = RNGStreams(seed, study=f"replication {replication}")
+    theorist = load("theorist", design.theorist) if isinstance(design.theorist, str) else design.theorist
+    runner = simulation_runner(
+        design.ground_truth, noise=design.noise, trials=design.trials, dropout=design.dropout,
+        rng=streams.generator("runner"),
+    )
+    models_after_cycle = []
+    cycle = PipelinedCycle(
+        variables=design.variables,
+        theorist=theorist(),
+        experimentalist=lambda rng: design.sampler(design.variables, design.participants, rng),
+        experiment_runner=runner,
+        monitor=lambda data: models_after_cycle.append(len(data.models)),
+        streams=streams,
+    )
+    data = cycle.run(num_cycles=num_cycles)
+
+    x = _rows(uniform_sampler(design.variables, design.evaluation_conditions, streams.generator("evaluation")))
+    truth = np.asarray(_ground_truth_function(design.ground_truth)(x), dtype=float).reshape(len(x), -1)
+    errors = metrics(data.models, x, truth)["mse"]
+    return np.array([errors[n - 1] if n else np.nan for n in models_after_cycle])
+
+
+def _replicate(args):
+    return replicate(*args)
+
+
+def simulate(
+    design: StudyDesign,
+    num_cycles: int,
+    replications: int,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """Run independent replications of the study in parallel processes
+
+    Args:
+        design (StudyDesign): The study
+        num_cycles (int): Cycles per replication
+        replications (int): Number of replications
+        seed (int): Seed of the simulation (replication i uses the streams of study "replication i"), fresh
+            entropy if None
+        workers (int): Number of processes (default: one per core), 1 runs everything in this process
+
+    Returns:
+        np.ndarray: the errors of shape (replications, num_cycles), see replicate
+    """
+    seed = RNGStreams(seed).seed
+    return _run_all([(design, num_cycles, r, seed) for r in range(replications)], workers).reshape(replications, -1)
+
+
+def _run_all(tasks, workers):
+    if workers == 1:
+        return np.array([_replicate(task) for task in tasks])
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # a few replications per task keep the overhead of sending the design small
+        chunksize = max(1, len(tasks) // (4 * workers))
+        return np.array(list(executor.map(_replicate, tasks, chunksize=chunksize)))
+
+
+def power_analysis(
+    design: StudyDesign,
+    participants: Sequence[int],
+    num_cycles: int,
+    replications: int = 100,
+    tolerance: float = 0.01,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> List[Dict[str, float]]:
+    """Error and power of the design for different numbers of participants per cycle
+
+    Args:
+        design (StudyDesign): The study, its `participants` is replaced by each of `participants`
+        participants: Numbers of participants per cycle to compare
+        num_cycles (int): Cycles per replication
+        replications (int): Replications per number of participants
+        tolerance (float): A replication succeeds once the mean squared error of its model is at most this
+        seed (int): Seed of the simulation
+        workers (int): Number of processes (default: one per core)
+
+    Returns:
+        List[Dict]: one row per number of participants and cycle with the median error and the power (the fraction
+            of replications that succeeded)
+    """
+    # the same replications (streams) for every number of participants
+    seed = RNGStreams(seed).seed
+    tasks = [
+        (dataclasses.replace(design, participants=p), num_cycles, r, seed)
+        for p in participants for r in range(replications)
+    ]
+    errors = _run_all(tasks, workers).reshape(len(participants), replications, num_cycles)
+    rows = []
+    for p, e in zip(participants, errors):
+        within = np.nan_to_num(e, nan=np.inf) <= tolerance
+        for c in range(num_cycles):
+            rows.append({
+                "participants": p,
+                "cycle": c,
+                "median_error": float(np.nanmedian(e[:, c])) if not np.isnan(e[:, c]).all() else float("nan"),
+                "power": float(within[:, c].mean()),
+            })
+    return rows
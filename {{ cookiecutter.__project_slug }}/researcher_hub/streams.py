@@ -0,0 +1,56 @@
+"""
+RNG Streams
+    Independent random number generators for every (study, stage, cycle, participant), derived from one seed.
+
+    A single generator that is shared by all samplers changes with every draw, so the conditions depend on the order
+    in which threads (e.g. the experimentalist of a PipelinedCycle, which runs one cycle ahead) happen to draw from
+    it, and a resumed study can only reproduce the conditions by replaying all earlier draws. Here every stream is
+    derived directly from the seed and its key (the spawn_key of a numpy SeedSequence), so
+        - streams never overlap and can be used from any thread or process at the same time,
+        - the generator of cycle 7 is the same whether cycles 0-6 ran in this process or before a resume.
+"""
+
+import zlib
+from typing import List, Optional, Union
+
+import numpy as np
+
+
+def _key(name: Union[str, int]) -> int:
+    # stable across processes (unlike hash(), which is salted for strings)
+    return name if isinstance(name, int) else zlib.crc32(name.encode())
+
+
+class RNGStreams:
+    """Hands out a reproducible generator per stage, cycle and participant
+
+    Args:
+        seed (int): Seed of the study. Without one, fresh entropy is drawn and kept in `seed`, so it can be saved
+            (e.g. in CycleData.seed) to reproduce the study.
+        study (str): Name of the study, studies with the same seed but different names get different streams
+
+    Examples:
+        >>> streams = RNGStreams(seed=180)
+        >>> rng = streams.generator("experimentalist", cycle=3)
+        >>> rngs = streams.generators("runner", cycle=3, participants=20)   # one per participant
+        >>> cycle = PipelinedCycle(..., streams=streams)    # passes rng= to the experimentalist of every cycle
+    """
+
+    def __init__(self, seed: Optional[int] = None, study: str = "autora"):
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+        self.study = study
+
+    def seed_sequence(self, stage: Union[str, int], cycle: int = 0, participant: int = 0) -> np.random.SeedSequence:
+        """SeedSequence of one stream (to seed another library or a worker process)"""
+        return np.random.SeedSequence(self.seed, spawn_key=(_key(self.study), _key(stage), cycle, participant))
+
+    def generator(self, stage: Union[str, int], cycle: int = 0, participant: int = 0) -> np.random.Generator:
+        """Generator of one stream, always the same for the same seed, study, stage, cycle and participant"""
+        return np.random.Generator(np.random.PCG64(self.seed_sequence(stage, cycle, participant)))
+
+    def generators(self, stage: Union[str, int], cycle: int, participants: int) -> List[np.random.Generator]:
+        """One generator per participant of a cycle, e.g. to sample their conditions in parallel"""
+        return [self.generator(stage, cycle, participant) for participant in range(participants)]
+
+    def __repr__(self):
+        return f"RNGStreams(seed={self.seed}, study={self.study!r})"
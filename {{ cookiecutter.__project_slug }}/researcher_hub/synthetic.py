@@ -0,0 +1,48 @@
+"""
+Synthetic Runner
+    Local stand-in for the firebase runner: synthetic participants from autora-synthetic answer the conditions
+    immediately. Use it to try out or benchmark a workflow without a website or recruitment.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+def synthetic_runner(experiment, added_noise: Optional[float] = None, random_state: Optional[int] = None):
+    """Experiment runner that gets the observations from a synthetic experiment
+
+    Args:
+        experiment: SyntheticExperimentCollection from autora-synthetic (e.g. stevens_power_law())
+        added_noise (float): Optional, noise of the synthetic participants (defaults to the noise of the experiment)
+        random_state (int): Seed for the noise, every call draws a new seed from it so reruns are reproducible
+
+    Returns:
+        Callable: experiment runner that takes the conditions and returns the observations
+
+    Examples:
+        >>> from autora.experiment_runner.synthetic.psychophysics.stevens_power_law import stevens_power_law
+        >>> experiment_runner = synthetic_runner(stevens_power_law(), random_state=180)
+        >>> experiment_runner(np.array([1., 2.])).shape
+        (2,)
+    """
+    rng = np.random.default_rng(random_state)
+    dvs = [v.name for v in experiment.variables.dependent_variables]
+    kwargs = {} if added_noise is None else {"added_noise": added_noise}
+
+    def run(conditions):
+        x = np.asarray(conditions, dtype=float).reshape(len(conditions), -1)
+        result = experiment.run(x, random_state=int(rng.integers(2**31)), **kwargs)
+        y = dependent_variables(result, dvs, len(x))
+        # the firebase runner returns one observation per condition
+        return y.ravel() if y.shape[1] == 1 else y
+
+    return run
+
+
+def dependent_variables(result, dvs, n) -> np.ndarray:
+    """The observations (one row per condition) of what an autora-synthetic experiment returned"""
+    # depending on the version, autora-synthetic returns a DataFrame with conditions and observations or an array
+    if hasattr(result, "columns"):
+        return result[dvs].to_numpy()
+    return np.asarray(result).reshape(n, -1)[:, -len(dvs):]
@@ -0,0 +1,197 @@
+"""
+Telemetry
+    Monitor for a PipelinedCycle that records where the time of every cycle goes.
+
+    After every cycle one JSON line is appended to a file (durations of the stages, conditions issued, observations
+    received, participants that timed out, score of the new model and memory of the process). The same metrics can
+    be scraped from an HTTP endpoint in the OpenMetrics text format (Prometheus, Grafana agent, or just curl):
+        curl http://127.0.0.1:9100/metrics
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+STAGES = ["experimentalist", "waiting", "finalize", "runner", "theorist"]
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def memory_usage() -> Optional[int]:
+    """Resident memory of the process in bytes (peak resident memory where the current one is not available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def cycle_record(data) -> Dict[str, Any]:
+    """Metrics of the last cycle of the CycleData as a json serializable dict"""
+    cycle = len(data.timings) - 1
+    received = len(data.conditions[-1])
+    timeouts = len(data.stragglers)
+    summaries = getattr(data.models, "summaries", None)
+    score = summaries[-1].get("score") if summaries else None
+    return {
+        "cycle": cycle,
+        "time": time.time(),
+        "durations": dict(data.timings[-1]),
+        "conditions_issued": received + timeouts,
+        "observations_received": received,
+        "participant_timeouts": timeouts,
+        "models": len(data.models),
+        "model_score": score,
+        "memory_bytes": memory_usage(),
+    }
+
+
+def _sample(name: str, value, **labels) -> str:
+    # a sample line of the text format: name{label="value",...} value
+    if labels:
+        name += "{" + ",".join('%s="%s"' % item for item in labels.items()) + "}"
+    return f"{name} {value}"
+
+
+class TelemetryMonitor:
+    """Record the metrics of every cycle to a JSON lines file and optionally serve them over HTTP
+
+    Args:
+        path (str): Optional, JSON lines file the records are appended to
+        port (int): Optional, port of the OpenMetrics endpoint (`/metrics`), 0 picks a free port
+        host (str): Interface the endpoint listens on (only the local machine by default)
+        verbose (bool): Print the number of models after every cycle (like the default monitor)
+
+    Examples:
+        >>> telemetry = TelemetryMonitor("telemetry.jsonl", port=9100)
+        >>> cycle = PipelinedCycle(..., monitor=telemetry)
+        >>> cycle.run(num_cycles=3)
+        >>> telemetry.close()
+    """
+
+    def __init__(self, path: Optional[str] = "telemetry.jsonl", port: Optional[int] = None, host: str = "127.0.0.1",
+                 verbose: bool = True):
+        self.path = path
+        self.verbose = verbose
+        self.records = []
+        self._created = time.time()
+        self._totals = {"cycles": 0, "conditions_issued": 0, "observations_received": 0, "participant_timeouts": 0}
+        self._stage_seconds = {stage: 0.0 for stage in STAGES}
+        self._lock = threading.Lock()
+        self._server = None
+        if port is not None:
+            self.serve(port, host)
+
+    def __call__(self, data):
+        record = cycle_record(data)
+        with self._lock:
+            self.records.append(record)
+            self._totals["cycles"] += 1
+            for key in ("conditions_issued", "observations_received", "participant_timeouts"):
+                self._totals[key] += record[key]
+            for stage, seconds in record["durations"].items():
+                self._stage_seconds[stage] = self._stage_seconds.get(stage, 0.0) + seconds
+        if self.path is not None:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        if self.verbose:
+            print(f"Generated {record['models']} models")
+
+    # *** OpenMetrics endpoint *** #
+
+    def metrics(self) -> str:
+        """The metrics in the OpenMetrics text format"""
+        with self._lock:
+            totals = dict(self._totals)
+            stage_seconds = dict(self._stage_seconds)
+            last = self.records[-1] if self.records else None
+
+        lines = []
+
+        def counter(name, help, value):
+            lines.extend([
+                f"# TYPE {name} counter", f"# HELP {name} {help}",
+                f"{name}_total {value}", f"{name}_created {self._created}",
+            ])
+
+        counter("autora_cycles", "Cycles completed.", totals["cycles"])
+        counter("autora_conditions_issued", "Conditions sent to the experiment runner.", totals["conditions_issued"])
+        counter("autora_observations_received", "Conditions that were observed.", totals["observations_received"])
+        counter("autora_participant_timeouts", "Conditions that were not observed in time and re-queued.",
+                totals["participant_timeouts"])
+
+        lines.extend(["# TYPE autora_stage_seconds counter", "# HELP autora_stage_seconds Seconds spent per stage."])
+        for stage, seconds in stage_seconds.items():
+            # the samples of one label set must not be interleaved with those of another one
+            lines.append(_sample("autora_stage_seconds_total", seconds, stage=stage))
+            lines.append(_sample("autora_stage_seconds_created", self._created, stage=stage))
+
+        if last is not None:
+            lines.extend(["# TYPE autora_last_cycle_stage_seconds gauge",
+                          "# HELP autora_last_cycle_stage_seconds Seconds spent per stage in the last cycle."])
+            lines.extend(_sample("autora_last_cycle_stage_seconds", v, stage=s) for s, v in last["durations"].items())
+            lines.extend(["# TYPE autora_models gauge", "# HELP autora_models Models in the history.",
+                          f"autora_models {last['models']}"])
+            if last["model_score"] is not None:
+                lines.extend(["# TYPE autora_model_score gauge",
+                              "# HELP autora_model_score Score of the latest model on the data it was fitted on.",
+                              f"autora_model_score {last['model_score']}"])
+        memory = memory_usage()
+        if memory is not None:
+            lines.extend(["# TYPE autora_process_memory_bytes gauge",
+                          "# HELP autora_process_memory_bytes Resident memory of the workflow process.",
+                          f"autora_process_memory_bytes {memory}"])
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9100, host: str = "127.0.0.1"):
+        """Serve the metrics at http://host:port/metrics on a background thread, returns the bound address"""
+        monitor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = monitor.metrics().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                # scrapes every few seconds would drown the output of the workflow
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="telemetry-server", daemon=True).start()
+        return self._server.server_address
+
+    @property
+    def address(self):
+        return self._server.server_address if self._server is not None else None
+
+    def close(self):
+        """Stop the HTTP endpoint"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()